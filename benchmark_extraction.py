@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of content extraction strategies over saved job pages
+
+Runs every WebScraper extraction strategy with every text backend (plus
+trafilatura / readability if installed) over the HTML saved in data/raw, and
+writes per-page and aggregate latency, peak memory and output size to JSON.
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+import config
+from src.artifact_store import get_artifact_store
+from src.scraper import WebScraper
+from src.utils import setup_logging, clean_text, estimate_tokens, percentile, save_json_file
+
+
+MIN_CONTENT_LENGTH = 100  # Same threshold the scraper uses to accept a strategy's output
+
+
+def load_corpus(corpus_dir: Optional[Path] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """Load saved pages from a directory of *.html files or from the artifact store"""
+    pages = []
+
+    if corpus_dir:
+        for path in sorted(Path(corpus_dir).glob("*.html")):
+            pages.append({"key": path.stem, "url": "", "html": path.read_text(encoding="utf-8", errors="replace")})
+    else:
+        store = get_artifact_store()
+        html_by_key = store.get_many("html")
+        results = store.get_many_json("result", list(html_by_key))
+        for key in sorted(html_by_key):
+            url = results.get(key, {}).get("url", "")
+            pages.append({"key": key, "url": url, "html": html_by_key[key]})
+
+    return pages[:limit] if limit else pages
+
+
+def get_page_extractors(scraper: WebScraper) -> Dict[str, Callable[[str], Optional[str]]]:
+    """Whole-page extractors from optional dependencies"""
+    extractors = {}
+
+    try:
+        import trafilatura
+        extractors["trafilatura"] = lambda html: trafilatura.extract(html)
+    except ImportError:
+        pass
+
+    try:
+        from readability import Document
+        extractors["readability"] = lambda html: scraper._html_to_text(Document(html).summary())
+    except ImportError:
+        pass
+
+    return extractors
+
+
+def measure(func: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    """Time a call (median of repeats) and measure its peak Python memory separately"""
+    timings = []
+    output = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # tracemalloc slows execution, so memory gets its own run
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "latency_ms": round(statistics.median(timings), 3),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "output": output,
+    }
+
+
+def benchmark_page(scraper: WebScraper, page: Dict[str, str], repeats: int) -> Dict[str, Any]:
+    """Run every strategy/backend on one page"""
+    html, url = page["html"], page["url"]
+
+    parse = measure(lambda: scraper._prepare_soup(html), repeats)
+    soup = parse["output"]
+
+    variants = {}
+
+    def record(name: str, measurement: Dict[str, Any]):
+        text = clean_text(measurement["output"] or "")
+        variants[name] = {
+            "latency_ms": measurement["latency_ms"],
+            "peak_memory_kb": measurement["peak_memory_kb"],
+            "output_length": len(text),
+            "token_estimate": estimate_tokens(text),
+            "success": len(text) > MIN_CONTENT_LENGTH,
+        }
+
+    # Strategies share the parsed soup (they don't modify it), so parse cost is reported once
+    for strategy in WebScraper.EXTRACTION_STRATEGIES:
+        for backend in WebScraper.TEXT_BACKENDS:
+            record(f"{strategy}/{backend}", measure(
+                lambda: scraper.run_extraction_strategy(strategy, soup, url, backend), repeats
+            ))
+
+    # Whole-page extractors parse the HTML themselves
+    for name, extractor in get_page_extractors(scraper).items():
+        record(name, measure(lambda: extractor(html), repeats))
+
+    # The pipeline takes the first strategy that produces enough text, falling back to full_body
+    winner = "full_body"
+    for strategy in WebScraper.EXTRACTION_STRATEGIES[:-1]:
+        if scraper.run_extraction_strategy(strategy, soup, url):
+            winner = strategy
+            break
+
+    return {
+        "key": page["key"],
+        "url": url,
+        "html_length": len(html),
+        "parse_latency_ms": parse["latency_ms"],
+        "parse_peak_memory_kb": parse["peak_memory_kb"],
+        "pipeline_strategy": winner,
+        "variants": variants,
+    }
+
+
+def aggregate(page_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Roll per-page measurements up per strategy/backend"""
+    rows = [
+        dict(variant=name, **stats)
+        for page in page_results
+        for name, stats in page["variants"].items()
+    ]
+    if not rows:
+        return {}
+
+    df = pd.DataFrame(rows)
+    summary = {}
+    for name, group in df.groupby("variant", sort=False):
+        latencies = group["latency_ms"].tolist()
+        summary[name] = {
+            "pages": len(group),
+            "success_rate": round(group["success"].mean(), 3),
+            "latency_ms_mean": round(group["latency_ms"].mean(), 3),
+            "latency_ms_p50": round(percentile(latencies, 50), 3),
+            "latency_ms_p95": round(percentile(latencies, 95), 3),
+            "latency_ms_total": round(group["latency_ms"].sum(), 3),
+            "peak_memory_kb_mean": round(group["peak_memory_kb"].mean(), 1),
+            "peak_memory_kb_max": round(group["peak_memory_kb"].max(), 1),
+            "output_length_mean": round(group["output_length"].mean(), 1),
+            "token_estimate_mean": round(group["token_estimate"].mean(), 1),
+            "token_estimate_total": int(group["token_estimate"].sum()),
+        }
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark content extraction over saved job pages")
+    parser.add_argument("--corpus", type=Path, help="Directory of *.html files (default: saved pages in data/raw)")
+    parser.add_argument("--limit", type=int, help="Only benchmark the first N pages")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repeats per page (median is reported)")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    setup_logging()
+
+    pages = load_corpus(args.corpus, args.limit)
+    if not pages:
+        print("❌ No saved pages found. Run the pipeline with SAVE_RAW_HTML = True first, or pass --corpus.")
+        return
+
+    print(f"⏱️  Benchmarking {len(pages)} pages...")
+    scraper = WebScraper()
+    page_results = [benchmark_page(scraper, page, args.repeats) for page in pages]
+    summary = aggregate(page_results)
+    wins = Counter(page["pipeline_strategy"] for page in page_results)
+
+    report = {
+        "metadata": {
+            "timestamp": pd.Timestamp.now().isoformat(),
+            "pages": len(pages),
+            "repeats": args.repeats,
+            "parse_latency_ms_mean": round(statistics.mean(p["parse_latency_ms"] for p in page_results), 3),
+        },
+        "pipeline_strategy_wins": dict(wins.most_common()),
+        "summary": summary,
+        "pages": page_results,
+    }
+
+    timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+    output_file = args.output or config.OUTPUT_DIR / f"extraction_benchmark_{timestamp}.json"
+    save_json_file(report, output_file)
+
+    print(f"\n{'variant':<32} {'success':>8} {'p50 ms':>9} {'p95 ms':>9} {'peak KB':>9} {'tokens':>8}")
+    for name, stats in summary.items():
+        print(f"{name:<32} {stats['success_rate']:>8.0%} {stats['latency_ms_p50']:>9.2f} "
+              f"{stats['latency_ms_p95']:>9.2f} {stats['peak_memory_kb_mean']:>9.1f} {stats['token_estimate_mean']:>8.0f}")
+
+    print("\n🏆 Strategy chosen by the pipeline:")
+    for strategy, count in wins.most_common():
+        print(f"  {strategy:<20} {count} pages")
+
+    print(f"\n✅ Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
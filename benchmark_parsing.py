@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of LLM response parsing over saved responses
+
+Times the single-pass salvage scanner (src.response_parser) against the
+regex cascade it replaced, over the saved *_failed_response.txt corpus
+(optionally plus the raw responses that parsed), and reports per-parser
+latency and recovery rate.
+"""
+
+import argparse
+import json
+import re
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import config
+from src.artifact_store import get_artifact_store
+from src.response_parser import clean_parsed_data, parse_json_response
+from src.utils import setup_logging, percentile, save_json_file
+
+
+FAILED_RESPONSE_SEPARATOR = "\n" + "=" * 50 + "\n"  # Between the header and the raw text of a failed response
+
+
+def legacy_parse_json_response(response_text: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """The regex cascade response parsing used before the salvage scanner, for comparison"""
+    try:
+        response_text = response_text.strip()
+
+        try:
+            return clean_parsed_data(json.loads(response_text)), "json"
+        except json.JSONDecodeError:
+            pass
+
+        json_patterns = [
+            (r'\{.*\}', 0),
+            (r'```json\s*(\{.*?\})\s*```', 1),
+            (r'```\s*(\{.*?\})\s*```', 1),
+        ]
+        for pattern, group in json_patterns:
+            match = re.search(pattern, response_text, re.DOTALL)
+            if match:
+                json_text = match.group(group) if group else match.group(0)
+                try:
+                    return clean_parsed_data(json.loads(json_text)), "pattern"
+                except json.JSONDecodeError:
+                    continue
+
+        json_start = response_text.find('{')
+        if json_start != -1:
+            brace_count = 0
+            json_end = json_start
+            for i, char in enumerate(response_text[json_start:], json_start):
+                if char == '{':
+                    brace_count += 1
+                elif char == '}':
+                    brace_count -= 1
+                    if brace_count == 0:
+                        json_end = i
+                        break
+            if brace_count == 0:
+                try:
+                    return clean_parsed_data(json.loads(response_text[json_start:json_end + 1])), "brace_matching"
+                except json.JSONDecodeError:
+                    pass
+
+        return None, None
+    except Exception:
+        return None, None
+
+
+PARSERS = {
+    "legacy_regex_cascade": legacy_parse_json_response,
+    "salvage_scanner": parse_json_response,
+}
+
+
+def load_corpus(corpus_dir: Optional[Path] = None, include_stored: bool = False) -> List[Dict[str, str]]:
+    """Load saved failed responses (and, with include_stored, the raw responses that parsed)"""
+    responses = []
+
+    if corpus_dir:
+        for path in sorted(Path(corpus_dir).glob("*.txt")):
+            text = path.read_text(encoding="utf-8", errors="replace")
+            responses.append({"key": path.stem, "source": "failed", "text": text.split(FAILED_RESPONSE_SEPARATOR, 1)[-1]})
+        return responses
+
+    store = get_artifact_store()
+    for key, text in sorted(store.get_many("failed_response").items()):
+        responses.append({"key": key, "source": "failed", "text": text.split(FAILED_RESPONSE_SEPARATOR, 1)[-1]})
+    if include_stored:
+        for key, record in sorted(store.get_many_json("llm_response").items()):
+            if record.get("raw_response"):
+                responses.append({"key": key, "source": "stored", "text": record["raw_response"]})
+    return responses
+
+
+def time_parser(parse: Callable[[str], Tuple[Optional[Dict[str, Any]], Optional[str]]], text: str,
+                repeats: int) -> Tuple[float, Optional[str]]:
+    """Median latency in microseconds and the method that parsed the text (None if it failed)"""
+    timings = []
+    method = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        parsed, method = parse(text)
+        timings.append((time.perf_counter() - start) * 1e6)
+        if parsed is None:
+            method = None
+    return statistics.median(timings), method
+
+
+def aggregate(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Recovery rate and latency percentiles per parser and corpus source"""
+    summary = {}
+    for name in PARSERS:
+        for source in sorted({row["source"] for row in rows}) + ["all"]:
+            selected = [row for row in rows if source in ("all", row["source"])]
+            if not selected:
+                continue
+            latencies = [row[name]["latency_us"] for row in selected]
+            recovered = sum(1 for row in selected if row[name]["method"])
+            methods = {}
+            for row in selected:
+                method = row[name]["method"] or "failed"
+                methods[method] = methods.get(method, 0) + 1
+            summary[f"{name}/{source}"] = {
+                "responses": len(selected),
+                "recovered": recovered,
+                "recovery_rate": round(recovered / len(selected), 3),
+                "latency_us_p50": round(percentile(latencies, 50), 2),
+                "latency_us_p95": round(percentile(latencies, 95), 2),
+                "latency_us_total": round(sum(latencies), 2),
+                "methods": methods,
+            }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM response parsing over saved responses")
+    parser.add_argument("--corpus", type=Path, help="Directory of saved responses as *.txt (default: data/processed)")
+    parser.add_argument("--include-stored", action="store_true",
+                        help="Also time the raw responses that parsed (the common case)")
+    parser.add_argument("--repeats", type=int, default=20, help="Timing repeats per response (median is reported)")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    setup_logging()
+
+    responses = load_corpus(args.corpus, args.include_stored)
+    if not responses:
+        print("❌ No saved responses found. Failed responses are saved as data/processed/*_failed_response.txt, "
+              "or pass --corpus.")
+        return
+
+    print(f"⏱️  Benchmarking {len(responses)} responses...")
+    rows = []
+    for response in responses:
+        row = {"key": response["key"], "source": response["source"], "length": len(response["text"])}
+        for name, parse in PARSERS.items():
+            latency, method = time_parser(parse, response["text"], args.repeats)
+            row[name] = {"latency_us": round(latency, 2), "method": method}
+        rows.append(row)
+    summary = aggregate(rows)
+
+    report = {
+        "metadata": {
+            "timestamp": pd.Timestamp.now().isoformat(),
+            "responses": len(responses),
+            "repeats": args.repeats,
+        },
+        "summary": summary,
+        "responses": rows,
+    }
+
+    timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+    output_file = args.output or config.OUTPUT_DIR / f"parsing_benchmark_{timestamp}.json"
+    save_json_file(report, output_file)
+
+    print(f"\n{'parser/corpus':<32} {'recovered':>10} {'rate':>6} {'p50 µs':>9} {'p95 µs':>9}")
+    for name, stats in summary.items():
+        print(f"{name:<32} {stats['recovered']:>4}/{stats['responses']:<5} {stats['recovery_rate']:>6.0%} "
+              f"{stats['latency_us_p50']:>9.1f} {stats['latency_us_p95']:>9.1f}")
+
+    newly_recovered = [row["key"] for row in rows
+                       if row["salvage_scanner"]["method"] and not row["legacy_regex_cascade"]["method"]]
+    lost = [row["key"] for row in rows
+            if row["legacy_regex_cascade"]["method"] and not row["salvage_scanner"]["method"]]
+    print(f"\n🩹 Recovered only by the salvage scanner: {len(newly_recovered)}")
+    if lost:
+        print(f"⚠️  Recovered only by the legacy cascade: {', '.join(lost)}")
+
+    print(f"\n✅ Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -120,6 +120,7 @@
 Configuration settings for Job Ad Analyzer
 """
 
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv 
@@ -138,17 +139,79 @@ LLM_BASE_URL = os.getenv("LLM_BASE_URL")  # Optional: for custom endpoints
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
 RATE_LIMIT_DELAY = 1  # seconds between requests
+LLM_RETRY_ATTEMPTS = {  # Max attempts per error class; auth and other client errors are never retried
+    "rate_limit": 6,
+    "server": MAX_RETRIES,
+    "timeout": MAX_RETRIES,
+    "connection": MAX_RETRIES,
+    "parse": 2,
+}
+LLM_RETRY_MAX_DELAY = 60  # Cap on a single backoff wait (seconds); a server's Retry-After is not capped
+LLM_RETRY_BUDGET = 50  # Retries shared by all LLM calls in one run
+LLM_RETRY_WAIT_BUDGET = 900  # Seconds of retry waits shared by all LLM calls in one run
 
 # LLM Request Settings
 MAX_TOKENS = 2000
 TEMPERATURE = 0.1  # Low temperature for more consistent structured output
 TIMEOUT = 120  # seconds
+LLM_CACHE_MEMORY_ENTRIES = 256  # Parsed responses kept in the in-memory LRU in front of the disk cache
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "False").lower() == "true"  # Constrain answers to a JSON schema derived from the master prompt
+LLM_STREAMING = os.getenv("LLM_STREAMING", "False").lower() == "true"  # Stream answers and abort early when they aren't JSON
+LLM_STREAM_ABORT_RETRIES = 1  # Re-requests after an aborted stream; the last attempt always runs to completion
+# Hedged requests: a call still running after the LLM_HEDGE_PERCENTILE of its model's recent latencies
+# is sent again and the first answer wins. Applies to non-streamed calls only.
+LLM_HEDGE_REQUESTS = os.getenv("LLM_HEDGE_REQUESTS", "False").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MAX_FRACTION = float(os.getenv("LLM_HEDGE_MAX_FRACTION", "0.05"))  # Duplicate requests per call, at most
+LLM_HEDGE_MIN_SAMPLES = 20  # Latencies seen for a model before its calls are hedged
+LLM_HEDGE_WINDOW = 200  # Recent latencies per model the percentile is taken over
+
+# Analysis Mode
+# "single": one call per ad with the whole master prompt.
+# "two_phase": a profile-independent extraction call per ad (cached for good), then a small
+# scoring call that sends the candidate profile and the extracted facts. Editing the profile
+# only re-runs scoring.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "single")
+EXTRACTION_SECTIONS = ["standard_extraction", "payment_analysis"]  # Template sections that depend only on the ad (growth is judged for the candidate)
+
+# Model Cascade Settings
+# Models ordered cheapest/fastest first, e.g. "gpt-4o-mini,gpt-4o,gpt-4". Each ad goes to the
+# first model and moves on to the next only when the answer can't be parsed, lacks a required
+# field or puts the candidate in a borderline tier. Empty means every ad goes to LLM_MODEL.
+LLM_CASCADE_MODELS = [model.strip() for model in os.getenv("LLM_CASCADE_MODELS", "").split(",") if model.strip()]
+LLM_CASCADE_REQUIRED_FIELDS = ["job_title", "fit_tier", "fit_summary", "is_overqualified"]  # Flattened names, see EXPECTED_DATA_TYPES
+LLM_CASCADE_ESCALATE_TIERS = ["C"]  # Fit tiers too close to call to accept from a cheaper model
+LLM_MODEL_PRICES = {  # USD per 1M tokens, for cost in the run report; looked up by longest matching prefix
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    "gpt-4-turbo": {"input": 10.00, "output": 30.00},
+    "gpt-4": {"input": 30.00, "output": 60.00},
+    "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
+}
+# Extra or corrected prices as JSON, e.g. '{"my-model": {"input": 0.2, "output": 0.8}}'
+LLM_MODEL_PRICES.update(json.loads(os.getenv("LLM_MODEL_PRICES", "{}")))
+LLM_BATCH_PRICE_FACTOR = float(os.getenv("LLM_BATCH_PRICE_FACTOR", "0.5"))  # Batch API discount on list prices
 
 # Scraping Settings
 REQUEST_TIMEOUT = 30
 USER_AGENT = "Mozilla/5.0 (JobAdAnalyzer/1.0)"
 MAX_CONTENT_LENGTH = 50000  # characters
-SCRAPING_DELAY = 1  # seconds between requests
+SCRAPING_DELAY = 1  # Minimum seconds between requests to the same host
+HOST_MIN_DELAYS = {  # Per-host overrides of SCRAPING_DELAY (matches the domain and its subdomains)
+    "linkedin.com": 5,
+    "indeed.com": 3,
+    "glassdoor.com": 3,
+}
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))  # URLs processed concurrently
+
+# Content Trimming Settings
+TRIM_CONTENT = True  # Trim boilerplate and fit LLM_INPUT_TOKEN_BUDGET instead of cutting at MAX_CONTENT_LENGTH
+LLM_INPUT_TOKEN_BUDGET = 6000  # Max tokens of job ad content sent to the LLM
+TRIM_BOILERPLATE_MIN_DOCS = 5  # Pages seen on a site before its repeated lines count as boilerplate
+TRIM_BOILERPLATE_MIN_RATIO = 0.5  # Fraction of a site's pages a line must appear on to be boilerplate
 
 # Processing Settings
 MIN_FIELD_FREQUENCY = 0 #0.1  # Include field if present in >10% of ads
@@ -163,10 +226,44 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed"
 OUTPUT_DIR = DATA_DIR / "output"
 LOG_FILE = LOGS_DIR / "app.log"
 
+# Batch API Settings (python main.py --batch)
+BATCH_DIR = DATA_DIR / "batch"  # Request/output JSONL files and manifests of submitted batches
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = int(os.getenv("BATCH_POLL_INTERVAL", "60"))  # Seconds between batch status checks
+BATCH_MAX_WAIT = 26 * 3600  # Stop polling after this many seconds; the next --batch run picks the batch up again
+BATCH_MAX_REQUESTS = 50000  # Requests per batch file (API limit); larger runs are split
+
+# Multi-Ad Packing Settings (python main.py --pack)
+LLM_PACK_ADS = False  # Analyze several short ads per request, sending the master prompt once
+LLM_PACK_MAX_ADS = 4  # Ads per packed request (each needs up to MAX_TOKENS of output)
+LLM_PACK_TOKEN_BUDGET = 8000  # Max tokens of ad content in one packed request
+LLM_PACK_MAX_AD_TOKENS = 2000  # Longer ads are always analyzed on their own
+
+# Artifact Storage Settings
+ARTIFACT_BACKEND = os.getenv("ARTIFACT_BACKEND", "files")  # "files" (data/raw + data/processed) or "sqlite"
+ARTIFACT_DB_FILE = DATA_DIR / "artifacts.sqlite3"  # Single-file store used by the sqlite backend
+
 # Output Settings
-OUTPUT_FORMATS = ["csv", "json"]  # Supported output formats
+OUTPUT_FORMATS = [  # Any of "csv", "xlsx", "json" (full data) and "parquet" (typed columns, needs pyarrow)
+    fmt.strip().lower() for fmt in os.getenv("OUTPUT_FORMATS", "csv,xlsx,json").split(",") if fmt.strip()
+]
+PARQUET_DTYPES = {  # Declared Parquet column types: "float", "boolean", "category", "list" or "string"; others are inferred
+    "salary_min": "float",
+    "salary_max": "float",
+    "experience_years": "float",
+    "remote_work": "boolean",
+    "is_overqualified": "boolean",
+    "fit_tier": "category",
+    "employment_type": "category",
+    "education_level": "category",
+    "currency": "category",
+    "required_skills": "list",
+    "fit_strengths": "list",
+    "fit_gaps": "list",
+}
 CSV_ENCODING = "utf-8-sig"  # UTF-8 with BOM for better Farsi/Unicode support
 EXCEL_SHEET_NAME = "Job_Ads"
+COMBINE_PROFILE_OUTPUTS = False  # With --profiles: one table with a profile column instead of one per profile
 
 # Logging Settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -208,6 +305,21 @@ EXPECTED_DATA_TYPES = {
     # Growth potential
     "growth_potential": str,
 }
+# Answers with fields missing or of the wrong type get one short follow-up request for just those fields
+LLM_REASK_INVALID_FIELDS = os.getenv("LLM_REASK_INVALID_FIELDS", "True").lower() == "true"
+# When the prompt's JSON template gains fields, cached answers get a follow-up for just the new ones
+LLM_DELTA_ANALYSIS = os.getenv("LLM_DELTA_ANALYSIS", "True").lower() == "true"
+
+# Relevance pre-filter: a local TF-IDF score of each scraped ad against the candidate profile and past fit tiers.
+# "report" only scores, "skip" leaves ads below the threshold out, "downgrade" sends them to the cheapest cascade model.
+RELEVANCE_FILTER = os.getenv("RELEVANCE_FILTER", "off")  # "off", "report", "skip" or "downgrade"
+RELEVANCE_TARGET_RECALL = float(os.getenv("RELEVANCE_TARGET_RECALL", "0.98"))  # Share of past relevant ads kept
+RELEVANCE_MIN_LABELS = 30  # Past analyzed ads (with relevant and F ones among them) needed before any ad is filtered
+RELEVANCE_RELEVANT_TIERS = ["A", "B", "C"]  # fit_tier values that count as relevant; F is irrelevant
+
+# Repost Settings
+REUSE_REPOSTS = os.getenv("REUSE_REPOSTS", "True").lower() == "true"  # Reuse the analysis of an earlier URL with the same ad text
+
 # Development/Debug Settings
 SAVE_RAW_HTML = True  # Save raw HTML for debugging
 SAVE_CLEANED_TEXT = True  # Save cleaned text for debugging
@@ -218,6 +330,21 @@ SAMPLE_SIZE = None  # Set to int to process only first N URLs (for testing)
 REQUESTS_PER_MINUTE = 60
 REQUESTS_PER_HOUR = 1000
 
+# Cache Management Settings
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_MB", "2048")) * 1024 * 1024  # Disk quota for data/raw + data/processed
+CACHE_TTLS = {  # Seconds since last access before an artifact expires (None = never)
+    "html": 7 * 24 * 3600,
+    "cleaned": 30 * 24 * 3600,
+    "failed_response": None,
+    "result": None,
+    "llm_response": None,
+    "llm_cache": None,
+    "fingerprint": None,
+}
+CACHE_EVICTION_ORDER = ["html", "cleaned"]  # Evicted first to last when over quota
+CACHE_PROTECTED_KINDS = ["llm_response", "llm_cache", "failed_response", "result"]  # Paid-for LLM output is never evicted (failed answers are re-parsed by replay_responses.py; the relevance history and repost index are rebuilt from results)
+CACHE_CHECK_INTERVAL = 25  # Enforce the disk quota every N URLs during a run
+
 def validate_config():
     """Validate configuration settings"""
     errors = []
@@ -231,9 +358,62 @@ def validate_config():
     if MAX_RETRIES < 0:
         errors.append("MAX_RETRIES must be non-negative")
     
+    if LLM_RETRY_BUDGET < 0 or any(attempts < 1 for attempts in LLM_RETRY_ATTEMPTS.values()):
+        errors.append("LLM_RETRY_BUDGET must be non-negative and LLM_RETRY_ATTEMPTS values at least 1")
+    
+    if LLM_RETRY_WAIT_BUDGET < 0:
+        errors.append("LLM_RETRY_WAIT_BUDGET must be non-negative")
+    
     if REQUEST_TIMEOUT <= 0:
         errors.append("REQUEST_TIMEOUT must be positive")
     
+    if LLM_INPUT_TOKEN_BUDGET <= 0:
+        errors.append("LLM_INPUT_TOKEN_BUDGET must be positive")
+    
+    if MAX_WORKERS < 1:
+        errors.append("MAX_WORKERS must be at least 1")
+    
+    if ARTIFACT_BACKEND not in ("files", "sqlite"):
+        errors.append("ARTIFACT_BACKEND must be 'files' or 'sqlite'")
+    
+    if CACHE_MAX_BYTES <= 0:
+        errors.append("CACHE_MAX_BYTES must be positive")
+    
+    if LLM_PACK_MAX_ADS < 2 or LLM_PACK_MAX_AD_TOKENS > LLM_PACK_TOKEN_BUDGET:
+        errors.append("LLM_PACK_MAX_ADS must be at least 2 and LLM_PACK_MAX_AD_TOKENS at most LLM_PACK_TOKEN_BUDGET")
+    
+    if BATCH_POLL_INTERVAL <= 0 or BATCH_MAX_REQUESTS <= 0:
+        errors.append("BATCH_POLL_INTERVAL and BATCH_MAX_REQUESTS must be positive")
+    
+    if not 0 < LLM_HEDGE_PERCENTILE < 100 or not 0 <= LLM_HEDGE_MAX_FRACTION <= 1:
+        errors.append("LLM_HEDGE_PERCENTILE must be between 0 and 100 and LLM_HEDGE_MAX_FRACTION between 0 and 1")
+    
+    if RELEVANCE_FILTER not in ("off", "report", "skip", "downgrade") or not 0 < RELEVANCE_TARGET_RECALL <= 1:
+        errors.append("RELEVANCE_FILTER must be 'off', 'report', 'skip' or 'downgrade' and RELEVANCE_TARGET_RECALL in (0, 1]")
+    
+    unknown_formats = set(OUTPUT_FORMATS) - {"csv", "xlsx", "json", "parquet"}
+    unknown_dtypes = set(PARQUET_DTYPES.values()) - {"float", "boolean", "category", "list", "string"}
+    if not OUTPUT_FORMATS or unknown_formats or unknown_dtypes:
+        errors.append("OUTPUT_FORMATS must list some of 'csv', 'xlsx', 'json', 'parquet' and PARQUET_DTYPES values "
+                      "be 'float', 'boolean', 'category', 'list' or 'string'")
+    
+    unpriced = [model for model, prices in LLM_MODEL_PRICES.items() if not {"input", "output"} <= set(prices)]
+    if unpriced or LLM_BATCH_PRICE_FACTOR < 0:
+        errors.append(f"LLM_MODEL_PRICES entries need input and output prices ({', '.join(unpriced)}) "
+                      "and LLM_BATCH_PRICE_FACTOR must be non-negative")
+    
+    if ANALYSIS_MODE not in ("single", "two_phase"):
+        errors.append("ANALYSIS_MODE must be 'single' or 'two_phase'")
+    
+    if len(LLM_CASCADE_MODELS) == 1:
+        errors.append("LLM_CASCADE_MODELS needs at least two models (use LLM_MODEL for a single one)")
+    
+    if set(LLM_CASCADE_REQUIRED_FIELDS) - set(EXPECTED_DATA_TYPES):
+        errors.append("LLM_CASCADE_REQUIRED_FIELDS must be keys of EXPECTED_DATA_TYPES")
+    
+    if set(CACHE_EVICTION_ORDER) & set(CACHE_PROTECTED_KINDS):
+        errors.append("CACHE_EVICTION_ORDER must not contain protected kinds")
+    
     if errors:
         raise ValueError("Configuration errors:\n" + "\n".join(f"- {e}" for e in errors))
 
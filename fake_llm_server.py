@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI Chat Completions, Files and Batches APIs, for testing Job Ad Analyzer offline
+
+Point the pipeline at it and run without an API key or network access:
+
+    python fake_llm_server.py --port 8765 --batch-delay 5
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake BATCH_POLL_INTERVAL=2 python main.py --batch
+
+Chat completions (streamed or not) wait for a latency drawn from --latency and
+can fail with 429 or 5xx at the given rates, so retries and tail latency can
+be exercised. Every request is answered with --reply-file if given, otherwise
+with the JSON template found in the prompt (so answers always have the master
+prompt's shape); packed requests get one template per ad id. With --site-port
+it also serves job pages (saved HTML from --pages-dir, or generated ones) at
+/jobs/<name>. load_test.py drives the pipeline against both.
+Uses only the standard library.
+"""
+
+import argparse
+import email.parser
+import email.policy
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+PACKED_AD_HEADER = re.compile(r"^=== (ad_\d+) ===$", re.MULTILINE)  # How LLMClient introduces each ad of a pack
+
+LATENCY_DISTRIBUTIONS = {  # name -> (parameters, sampler given a Random and the parameters)
+    "fixed": (1, lambda rng, seconds: seconds),
+    "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+    "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean) if mean > 0 else 0.0),
+    # Median and sigma of the underlying normal; heavy right tail like real LLM latencies
+    "lognormal": (2, lambda rng, median, sigma: rng.lognormvariate(0, sigma) * median),
+}
+
+
+def parse_latency(spec: str, seed: Optional[int] = None) -> Callable[[], float]:
+    """
+    Sampler for a latency spec: "fixed:0.2", "uniform:0.1,0.5", "exponential:0.3" or "lognormal:0.8,0.5"
+
+    A bare number means fixed. Samples are in seconds and never negative.
+    """
+    name, _, params = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution '{name}' (use {', '.join(LATENCY_DISTRIBUTIONS)})")
+    arity, sample = LATENCY_DISTRIBUTIONS[name]
+    values = [float(value) for value in params.split(",") if value.strip()]
+    if len(values) != arity:
+        raise ValueError(f"Latency distribution '{name}' takes {arity} parameter(s), got '{spec}'")
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def sampler() -> float:
+        with lock:
+            return max(0.0, sample(rng, *values))
+    return sampler
+
+
+class FakeOpenAIState:
+    """Uploaded files and batches, shared by all request handler threads"""
+
+    def __init__(self, reply_text: Optional[str] = None, batch_delay: float = 0.0,
+                 batch_fail_ids: Optional[List[str]] = None, latency: Optional[Callable[[], float]] = None,
+                 chunk_delay: float = 0.0, rate_limit_rate: float = 0.0, server_error_rate: float = 0.0,
+                 retry_after: Optional[float] = None, seed: Optional[int] = None):
+        self.reply_text = reply_text
+        self.batch_delay = batch_delay
+        self.batch_fail_ids = set(batch_fail_ids or [])  # custom_ids answered with an error
+        self.latency = latency or (lambda: 0.0)  # Seconds before a chat completion starts answering
+        self.chunk_delay = chunk_delay  # Seconds between streamed chunks
+        self.rate_limit_rate = rate_limit_rate  # Share of chat completions answered with 429
+        self.server_error_rate = server_error_rate  # Share answered with a random 5xx
+        self.retry_after = retry_after  # Retry-After header sent with 429s
+        self.files = {}  # id -> {"meta": {...}, "content": bytes}
+        self.batches = {}  # id -> batch object
+        self.stats = {"chat_completions": 0, "streamed": 0, "packed": 0, "rate_limited": 0, "server_errors": 0}
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def count(self, stat: str) -> None:
+        with self.lock:
+            self.stats[stat] += 1
+
+    def draw_fault(self) -> Optional[int]:
+        """Status code to fail a chat completion with, if one is injected"""
+        with self.lock:
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return 429
+            if roll < self.rate_limit_rate + self.server_error_rate:
+                self.stats["server_errors"] += 1
+                return self._rng.choice([500, 502, 503])
+        return None
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        meta = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        with self.lock:
+            self.files[file_id] = {"meta": meta, "content": content}
+        return meta
+
+    def make_reply(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Canned reply, or the first JSON object in the prompt (the master prompt's template)
+
+        A packed request (ads introduced by "=== ad_N ===") gets {"ad_N": reply} for each ad.
+        """
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        ad_ids = PACKED_AD_HEADER.findall(prompt)
+        if ad_ids:
+            self.count("packed")
+
+        if self.reply_text is not None:
+            reply = self.reply_text
+        else:
+            reply = "{}"
+            decoder = json.JSONDecoder()
+            position = prompt.find("{")
+            while position != -1:
+                try:
+                    template, _ = decoder.raw_decode(prompt, position)
+                    reply = json.dumps(template, ensure_ascii=False)
+                    break
+                except json.JSONDecodeError:
+                    position = prompt.find("{", position + 1)
+
+        if not ad_ids:
+            return reply
+        return "{" + ", ".join(f'"{ad_id}": {reply}' for ad_id in ad_ids) + "}"
+
+    def chat_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """A chat.completion response body for a request body"""
+        messages = body.get("messages", [])
+        reply = self.make_reply(messages)
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+        completion_tokens = len(reply) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def stream_chunks(self, completion: Dict[str, Any], include_usage: bool, chunk_size: int = 24):
+        """chat.completion.chunk objects for a completion, as a streamed response sends them"""
+        reply = completion["choices"][0]["message"]["content"]
+        base = {"id": completion["id"], "object": "chat.completion.chunk",
+                "created": completion["created"], "model": completion["model"]}
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+
+        yield chunk({"role": "assistant", "content": ""})
+        for start in range(0, len(reply), chunk_size):
+            yield chunk({"content": reply[start:start + chunk_size]})
+        yield chunk({}, "stop")
+        if include_usage:
+            yield dict(base, choices=[], usage=completion["usage"])
+
+    def create_batch(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        input_file = self.files.get(params.get("input_file_id"))
+        if input_file is None:
+            return 404, error_body(f"No such file: {params.get('input_file_id')}")
+
+        now = int(time.time())
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}",
+            "object": "batch",
+            "endpoint": params.get("endpoint", "/v1/chat/completions"),
+            "errors": None,
+            "input_file_id": params["input_file_id"],
+            "completion_window": params.get("completion_window", "24h"),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": now,
+            "in_progress_at": now,
+            "expires_at": now + 24 * 3600,
+            "completed_at": None,
+            "cancelled_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": params.get("metadata"),
+        }
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        return 200, batch
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Return a batch, finishing it once batch_delay has passed since creation"""
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch and batch["status"] == "in_progress" and time.time() - batch["created_at"] >= self.batch_delay:
+            self._finish_batch(batch)
+        return batch
+
+    def cancel_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch and batch["status"] == "in_progress":
+                batch["status"] = "cancelled"
+                batch["cancelled_at"] = int(time.time())
+        return batch
+
+    def _finish_batch(self, batch: Dict[str, Any]) -> None:
+        """Answer every request line and write the output and error files"""
+        outputs, errors = [], []
+        content = self.files[batch["input_file_id"]]["content"].decode("utf-8")
+
+        for line_number, line in enumerate(content.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                errors.append({"id": f"batch_req_{uuid.uuid4().hex[:16]}", "custom_id": None, "response": None,
+                               "error": {"code": "invalid_json", "message": f"Line {line_number} is not valid JSON"}})
+                continue
+
+            custom_id = request.get("custom_id")
+            line_id = f"batch_req_{uuid.uuid4().hex[:16]}"
+            if request.get("url") != batch["endpoint"] or custom_id in self.batch_fail_ids:
+                errors.append({"id": line_id, "custom_id": custom_id, "response": None,
+                               "error": {"code": "request_failed", "message": "Request failed in fake server"}})
+                continue
+
+            outputs.append({
+                "id": line_id,
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": self.chat_completion(request.get("body", {})),
+                },
+                "error": None,
+            })
+
+        def to_file(rows: List[Dict[str, Any]], suffix: str) -> Optional[str]:
+            if not rows:
+                return None
+            data = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+            return self.add_file(data, f"{batch['id']}_{suffix}.jsonl", "batch_output")["id"]
+
+        output_file_id = to_file(outputs, "output")
+        error_file_id = to_file(errors, "errors")
+        with self.lock:
+            batch["output_file_id"] = output_file_id
+            batch["error_file_id"] = error_file_id
+            batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+            batch["status"] = "completed"
+            batch["completed_at"] = int(time.time())
+
+
+def error_body(message: str, error_type: str = "invalid_request_error") -> Dict[str, Any]:
+    return {"error": {"message": message, "type": error_type}}
+
+
+def synthetic_job_page(name: str) -> str:
+    """A job ad page that differs per name, for when no saved page exists"""
+    rng = random.Random(name)
+    title = rng.choice(["Backend Engineer", "Data Scientist", "Platform Engineer", "ML Engineer", "Site Reliability Engineer"])
+    skills = rng.sample(["Python", "Go", "Kubernetes", "PostgreSQL", "Kafka", "AWS", "Terraform", "PyTorch", "Spark", "Rust"], 5)
+    city = rng.choice(["Berlin", "Amsterdam", "Toronto", "Remote", "Vienna"])
+    duties = "".join(
+        f"<li>Own the {rng.choice(['ingestion', 'billing', 'search', 'scoring', 'reporting'])} service "
+        f"end to end, from design to on-call ({index}).</li>"
+        for index in range(1, rng.randint(6, 12))
+    )
+    return (
+        f"<html><head><title>{title} - {name}</title></head><body>"
+        f"<nav>Home | Jobs | About</nav><main class=\"job-description\">"
+        f"<h1>{title}</h1><p>Location: {city}. Posting {name}.</p>"
+        f"<h2>Responsibilities</h2><ul>{duties}</ul>"
+        f"<h2>Requirements</h2><ul>{''.join(f'<li>{rng.randint(2, 8)}+ years of {skill}</li>' for skill in skills)}</ul>"
+        f"<p>Salary: {rng.randint(60, 140)}k EUR per year. We offer flexible hours and a learning budget.</p>"
+        f"</main><footer>Privacy | Imprint</footer></body></html>"
+    )
+
+
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """Parse a multipart/form-data body into {field: (filename, data)}"""
+    message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+    return fields
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Routes /v1/files and /v1/batches requests to the shared FakeOpenAIState"""
+
+    state: FakeOpenAIState = None
+    quiet = False
+
+    def do_GET(self):
+        parts = self._path_parts()
+
+        if parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+            stored = self.state.files.get(parts[2])
+            if stored is None:
+                return self._send_json(404, error_body(f"No such file: {parts[2]}"))
+            return self._send_bytes(200, stored["content"], "application/octet-stream")
+
+        if parts[:2] == ["v1", "files"] and len(parts) == 3:
+            stored = self.state.files.get(parts[2])
+            if stored is None:
+                return self._send_json(404, error_body(f"No such file: {parts[2]}"))
+            return self._send_json(200, stored["meta"])
+
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+            batch = self.state.get_batch(parts[2])
+            if batch is None:
+                return self._send_json(404, error_body(f"No such batch: {parts[2]}"))
+            return self._send_json(200, batch)
+
+        self._send_json(404, error_body(f"Unknown endpoint: GET {self.path}"))
+
+    def do_POST(self):
+        parts = self._path_parts()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if parts == ["v1", "files"]:
+            fields = parse_multipart(self.headers.get("Content-Type", ""), body)
+            if "file" not in fields:
+                return self._send_json(400, error_body("Missing 'file' field"))
+            filename, data = fields["file"]
+            purpose = fields.get("purpose", (None, b"batch"))[1].decode("utf-8")
+            return self._send_json(200, self.state.add_file(data, filename or "upload.jsonl", purpose))
+
+        if parts == ["v1", "batches"]:
+            status, payload = self.state.create_batch(json.loads(body or b"{}"))
+            return self._send_json(status, payload)
+
+        if parts[:2] == ["v1", "batches"] and len(parts) == 4 and parts[3] == "cancel":
+            batch = self.state.cancel_batch(parts[2])
+            if batch is None:
+                return self._send_json(404, error_body(f"No such batch: {parts[2]}"))
+            return self._send_json(200, batch)
+
+        if parts == ["v1", "chat", "completions"]:
+            return self._chat_completion(json.loads(body or b"{}"))
+
+        self._send_json(404, error_body(f"Unknown endpoint: POST {self.path}"))
+
+    def _chat_completion(self, request: Dict[str, Any]):
+        self.state.count("chat_completions")
+        time.sleep(self.state.latency())
+
+        status = self.state.draw_fault()
+        if status == 429:
+            headers = {"Retry-After": f"{self.state.retry_after:g}"} if self.state.retry_after is not None else {}
+            return self._send_json(429, error_body("Rate limit reached (injected)", "rate_limit_error"), headers)
+        if status:
+            return self._send_json(status, error_body("Server error (injected)", "server_error"))
+
+        completion = self.state.chat_completion(request)
+        if not request.get("stream"):
+            return self._send_json(200, completion)
+
+        self.state.count("streamed")
+        include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            for index, chunk in enumerate(self.state.stream_chunks(completion, include_usage)):
+                if index and self.state.chunk_delay:
+                    time.sleep(self.state.chunk_delay)
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client aborted the stream (e.g. LLMClient on malformed JSON)
+        self.close_connection = True
+
+    def _path_parts(self) -> List[str]:
+        return [part for part in self.path.split("?", 1)[0].split("/") if part]
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        self._send_bytes(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json", headers)
+
+    def _send_bytes(self, status: int, data: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class FakeJobSiteHandler(BaseHTTPRequestHandler):
+    """Serves job pages at /jobs/<name>: <name>.html from pages_dir if it exists, else a generated page"""
+
+    pages_dir: Optional[Path] = None
+    latency: Callable[[], float] = staticmethod(lambda: 0.0)
+    quiet = False
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+        if len(parts) != 2 or parts[0] != "jobs":
+            self.send_error(404)
+            return
+
+        time.sleep(self.latency())
+        name = Path(parts[1]).stem
+        saved = self.pages_dir / f"{name}.html" if self.pages_dir else None
+        if saved and saved.is_file():
+            page = saved.read_text(encoding="utf-8", errors="replace")
+        else:
+            page = synthetic_job_page(name)
+
+        data = page.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, state: Optional[FakeOpenAIState] = None,
+                quiet: bool = False) -> ThreadingHTTPServer:
+    """Create (but don't start) a fake server; port 0 picks a free port"""
+    handler = type("Handler", (FakeOpenAIHandler,), {"state": state or FakeOpenAIState(), "quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def make_job_site(host: str = "127.0.0.1", port: int = 8766, pages_dir: Optional[Path] = None,
+                  latency: Optional[Callable[[], float]] = None, quiet: bool = False) -> ThreadingHTTPServer:
+    """Create (but don't start) a fake job site; port 0 picks a free port"""
+    handler = type("Handler", (FakeJobSiteHandler,), {
+        "pages_dir": Path(pages_dir) if pages_dir else None,
+        "latency": staticmethod(latency or (lambda: 0.0)),
+        "quiet": quiet,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI Chat/Files/Batches API and job site for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply-file", help="File whose text is returned as every completion")
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="Seconds before a batch completes")
+    parser.add_argument("--fail", nargs="*", default=[], metavar="CUSTOM_ID",
+                        help="custom_ids to answer with an error (to test fallback)")
+    parser.add_argument("--latency", default="fixed:0",
+                        help="Chat completion latency, e.g. fixed:0.2, uniform:0.1,0.5, exponential:0.3, lognormal:0.8,0.5")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of chat completions answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share answered with a 5xx")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, help="Seed for latencies and injected errors")
+    parser.add_argument("--site-port", type=int, help="Also serve job pages at http://HOST:SITE_PORT/jobs/<name>")
+    parser.add_argument("--pages-dir", type=Path, help="Saved pages to serve as <name>.html (default: generated pages)")
+    parser.add_argument("--page-latency", default="fixed:0", help="Job page latency, same format as --latency")
+    parser.add_argument("--quiet", action="store_true", help="Don't log every request")
+    args = parser.parse_args()
+
+    reply_text = None
+    if args.reply_file:
+        with open(args.reply_file, "r", encoding="utf-8") as f:
+            reply_text = f.read()
+
+    state = FakeOpenAIState(
+        reply_text=reply_text, batch_delay=args.batch_delay, batch_fail_ids=args.fail,
+        latency=parse_latency(args.latency, args.seed), chunk_delay=args.chunk_delay,
+        rate_limit_rate=args.rate_limit_rate, server_error_rate=args.server_error_rate,
+        retry_after=args.retry_after, seed=args.seed
+    )
+    server = make_server(args.host, args.port, state, quiet=args.quiet)
+    print(f"🧪 Fake LLM server listening on http://{args.host}:{server.server_address[1]}/v1")
+
+    site = None
+    if args.site_port is not None:
+        site = make_job_site(args.host, args.site_port, args.pages_dir, parse_latency(args.page_latency, args.seed),
+                             quiet=args.quiet)
+        threading.Thread(target=site.serve_forever, daemon=True).start()
+        print(f"🌐 Fake job site listening on http://{args.host}:{site.server_address[1]}/jobs/<name>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+        if site:
+            site.shutdown()
+            site.server_close()
+
+
+if __name__ == "__main__":
+    main()
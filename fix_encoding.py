@@ -58,21 +58,13 @@ def regenerate_table_from_json():
         
         # Load all processed JSON files
         processor = DataProcessor()
-        processed_files = list(config.PROCESSED_DATA_DIR.glob("url_*.json"))
+        processed_results = processor.load_processed_data()
         
-        if not processed_files:
+        if not processed_results:
             print("❌ No processed JSON files found")
             return False
         
-        results = []
-        for file_path in processed_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if data.get("data"):
-                        results.append(data)
-            except Exception as e:
-                print(f"⚠️ Error loading {file_path}: {e}")
+        results = [data for data in processed_results if data.get("data")]
         
         if not results:
             print("❌ No valid results found in JSON files")
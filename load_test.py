@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Load test of the Job Ad Analyzer pipeline against local fake servers
+
+Starts fake_llm_server's chat completions endpoint and job site in this
+process, then runs main() once per concurrency level (MAX_WORKERS), each in
+a fresh data directory so nothing is served from cache, and reports URLs per
+second and p50/p95/p99 latencies per URL, LLM call and scrape from the run
+ledger. No API key, network access or money needed:
+
+    python load_test.py --urls 40 --workers 1 4 8 16 --latency lognormal:0.8,0.5 --rate-limit-rate 0.05
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+os.environ.setdefault("OPENAI_API_KEY", "fake")  # config refuses to load without one; the fake server ignores it
+import config
+import main as pipeline
+from fake_llm_server import FakeOpenAIState, make_job_site, make_server, parse_latency
+from src.ledger import get_ledger
+from src.utils import percentile, save_json_file
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    """Count and p50/p95/p99/max of a list of seconds"""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def url_latencies(entries: List[Dict[str, Any]]) -> List[float]:
+    """Seconds from the start of each URL's first ledger entry to the end of its last one"""
+    spans = {}
+    for entry in entries:
+        if not entry.get("url_id"):
+            continue
+        start = entry["timestamp"] - entry.get("wall_seconds", 0.0)
+        first, last = spans.get(entry["url_id"], (start, entry["timestamp"]))
+        spans[entry["url_id"]] = (min(first, start), max(last, entry["timestamp"]))
+    return [last - first for first, last in spans.values()]
+
+
+def use_data_dir(data_dir: Path, urls: List[str], prompt_file: Path) -> None:
+    """Point every data path in config at a fresh directory holding the URL list"""
+    config.DATA_DIR = data_dir
+    config.RAW_DATA_DIR = data_dir / "raw"
+    config.PROCESSED_DATA_DIR = data_dir / "processed"
+    config.OUTPUT_DIR = data_dir / "output"
+    config.BATCH_DIR = data_dir / "batch"
+    config.ARTIFACT_DB_FILE = data_dir / "artifacts.sqlite3"
+    config.LOGS_DIR = data_dir / "logs"
+    config.LOG_FILE = config.LOGS_DIR / "app.log"
+    config.URLS_FILE = data_dir / "input" / "urls.txt"
+    config.PROMPT_FILE = prompt_file
+    config.URLS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    config.URLS_FILE.write_text("\n".join(urls) + "\n", encoding="utf-8")
+
+
+def run_level(workers: int, urls: List[str], prompt_file: Path, state: FakeOpenAIState,
+              work_dir: Path, pipeline_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the pipeline once with MAX_WORKERS = workers and measure it"""
+    use_data_dir(work_dir / f"workers_{workers}", urls, prompt_file)
+    config.MAX_WORKERS = workers
+    with state.lock:
+        state.stats = dict.fromkeys(state.stats, 0)
+
+    start = time.perf_counter()
+    try:
+        pipeline.main(**pipeline_options)
+    except SystemExit:
+        logging.error(f"Pipeline failed with {workers} workers, see {config.LOG_FILE}")
+    elapsed = time.perf_counter() - start
+
+    ledger = get_ledger()
+    entries = list(ledger.entries)
+    report_file = config.OUTPUT_DIR / "processing_report.json"
+    report = json.loads(report_file.read_text()) if report_file.exists() else {}
+    totals = ledger.get_summary()["totals"]
+
+    return {
+        "workers": workers,
+        "urls": len(urls),
+        "successful": report.get("successful"),
+        "seconds": round(elapsed, 3),
+        "urls_per_second": round(len(urls) / elapsed, 3) if elapsed else None,
+        "url_latency": latency_summary(url_latencies(entries)),
+        "llm_latency": latency_summary([entry["wall_seconds"] for entry in entries if entry["kind"] == "llm"]),
+        "scrape_latency": latency_summary([entry["wall_seconds"] for entry in entries if entry["kind"] == "scrape"]),
+        "llm_calls": totals["llm_calls"],
+        "retries": totals["retries"],
+        "hedging": report.get("hedging"),
+        "server": dict(state.stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pipeline throughput against local fake LLM and job site servers")
+    parser.add_argument("--urls", type=int, default=40, help="Number of job pages to analyze per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="MAX_WORKERS values to try")
+    parser.add_argument("--latency", default="lognormal:0.5,0.4", help="LLM latency (see fake_llm_server.py --latency)")
+    parser.add_argument("--page-latency", default="uniform:0.05,0.2", help="Job page latency, same format")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of LLM calls answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share of LLM calls answered with a 5xx")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--reply-file", type=Path, help="Canned completion text (default: the prompt's JSON template)")
+    parser.add_argument("--pages-dir", type=Path, help="Saved pages to serve as <name>.html (default: generated pages)")
+    parser.add_argument("--prompt", type=Path, default=config.PROMPT_FILE, help="Master prompt file")
+    parser.add_argument("--hosts", type=int, default=4, help="Spread the pages over this many job sites")
+    parser.add_argument("--scraping-delay", type=float, default=0.0, help="SCRAPING_DELAY during the runs")
+    parser.add_argument("--stream", action="store_true", help="Stream completions (LLM_STREAMING)")
+    parser.add_argument("--pack", action="store_true", help="Run with --pack")
+    parser.add_argument("--hedge", action="store_true", help="Hedge slow LLM calls (LLM_HEDGE_REQUESTS)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latencies and injected errors")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    state = FakeOpenAIState(
+        reply_text=args.reply_file.read_text(encoding="utf-8") if args.reply_file else None,
+        latency=parse_latency(args.latency, args.seed), chunk_delay=args.chunk_delay,
+        rate_limit_rate=args.rate_limit_rate, server_error_rate=args.server_error_rate,
+        retry_after=args.retry_after, seed=args.seed
+    )
+    llm_server = make_server(port=0, state=state, quiet=True)
+    # One site per host: the scraper's per-host politeness delay applies to each separately, as with real job boards
+    page_latency = parse_latency(args.page_latency, args.seed)
+    sites = [make_job_site(port=0, pages_dir=args.pages_dir, latency=page_latency, quiet=True) for _ in range(args.hosts)]
+    servers = [llm_server] + sites
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    saved = sorted(path.stem for path in args.pages_dir.glob("*.html")) if args.pages_dir else []
+    names = [saved[i % len(saved)] if saved else f"job-{i:04d}" for i in range(args.urls)]
+    urls = [
+        f"http://127.0.0.1:{sites[i % len(sites)].server_address[1]}/jobs/{name}?n={i}" for i, name in enumerate(names)
+    ]
+
+    prompt_file = args.prompt.resolve()
+    output_dir = config.OUTPUT_DIR  # The runs' own data directories are temporary
+    config.LLM_BASE_URL = f"http://127.0.0.1:{llm_server.server_address[1]}/v1"
+    config.LLM_API_KEY = "fake"
+    config.LLM_STREAMING = args.stream
+    config.LLM_HEDGE_REQUESTS = args.hedge
+    config.SCRAPING_DELAY = args.scraping_delay
+    config.HOST_MIN_DELAYS = {}
+    config.LOG_LEVEL = "WARNING"
+
+    print(f"🧪 Fake LLM at {config.LLM_BASE_URL}, {len(sites)} fake job sites; "
+          f"{args.urls} URLs per run, LLM latency {args.latency}")
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="job_ad_load_test_") as work_dir:
+            for workers in args.workers:
+                print(f"\n⏱️  MAX_WORKERS={workers}...")
+                results.append(run_level(workers, urls, prompt_file, state, Path(work_dir), {"pack": args.pack}))
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    print(f"\n{'workers':>7} {'URLs/s':>8} {'URL p50':>8} {'p95':>7} {'p99':>7} {'LLM p50':>8} {'p95':>7} "
+          f"{'p99':>7} {'retries':>8} {'429/5xx':>8}")
+    for row in results:
+        url, llm = row["url_latency"], row["llm_latency"]
+        print(f"{row['workers']:>7} {row['urls_per_second'] or 0:>8.2f} {url.get('p50', 0):>8.2f} {url.get('p95', 0):>7.2f} "
+              f"{url.get('p99', 0):>7.2f} {llm.get('p50', 0):>8.2f} {llm.get('p95', 0):>7.2f} {llm.get('p99', 0):>7.2f} "
+              f"{row['retries']:>8} {row['server']['rate_limited']:>4}/{row['server']['server_errors']:<3}")
+
+    timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+    output_file = args.output or output_dir / f"load_test_{timestamp}.json"
+    save_json_file({"metadata": {"timestamp": pd.Timestamp.now().isoformat(), **{
+        key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()
+    }}, "results": results}, output_file)
+    print(f"\n✅ Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,19 +4,31 @@ Job Ad Analyzer - Main Pipeline
 Orchestrates the complete pipeline from URLs to structured output
 """
 
+import argparse
 import logging
 import os
+import re
 import sys
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 import json
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
 from src.scraper import WebScraper
 from src.llm_client import LLMClient
 from src.processor import DataProcessor
-from src.utils import setup_logging, load_text_file, ensure_directories
+from src.cache_manager import CacheManager
+from src.artifact_store import get_artifact_store
+from src.scheduler import HostScheduler
+from src.trimmer import ContentTrimmer
+from src.prompts import profile_hash
+from src.ledger import get_ledger
+from src.relevance import RelevanceFilter
+from src.fingerprint import RepostIndex, content_fingerprint
+from src.utils import setup_logging, load_text_file, ensure_directories, extract_domain
 import config
 
 
@@ -48,6 +60,18 @@ def load_master_prompt(file_path: str) -> str:
         raise
 
 
+def load_profiles(file_paths: List[str]) -> Dict[str, str]:
+    """Load one master prompt per candidate profile, named after its file (alice.txt -> "alice")"""
+    profiles = {}
+    for file_path in file_paths:
+        name = re.sub(r"[^\w.-]", "_", Path(file_path).stem)
+        if name in profiles:
+            raise ValueError(f"Two profile files are named '{name}'; profile names must be unique")
+        profiles[name] = load_master_prompt(file_path)
+    logging.info(f"Loaded {len(profiles)} profiles: {', '.join(profiles)}")
+    return profiles
+
+
 # def process_single_url(url: str, url_id: str, scraper: WebScraper, 
 #                       llm_client: LLMClient, master_prompt: str) -> Dict[str, Any]:
 #     """Process a single URL through the complete pipeline"""
@@ -67,113 +91,408 @@ def load_master_prompt(file_path: str) -> str:
 #         logging.debug(f"Sending to LLM for analysis: {url_id}")
 #         llm_response = llm_client.analyze_job_ad(content, master_prompt, url_id)
 
-def check_existing_result(url_id: str) -> Optional[Dict[str, Any]]:
+def is_fresh_result(cached_data: Optional[Dict[str, Any]], analysis_signature: Optional[str]) -> bool:
+    """
+    A cached result is reusable if it succeeded and came from the current prompt/model/parameters
+
+    A result the relevance filter sent to the cheapest model only carries that
+    model's signature, and the one it was downgraded from in "downgraded_from".
+    """
+    if not cached_data or cached_data.get("data") is None:
+        return False
+    return analysis_signature is None or analysis_signature in (
+        cached_data.get("analysis_signature"), cached_data.get("downgraded_from")
+    )
+
+def result_key(url_id: str, profile: Optional[str] = None) -> str:
+    """Artifact key of a URL's result; each extra profile gets its own namespace"""
+    return url_id if profile is None else f"{url_id}@{profile}"
+
+def check_existing_result(url_id: str, analysis_signature: Optional[str] = None,
+                          profile: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Check if we already have a processed result for this URL"""
-    result_file = Path(config.PROCESSED_DATA_DIR) / f"{url_id}.json"
+    key = result_key(url_id, profile)
+    try:
+        cached_data = get_artifact_store().get_json("result", key)
+    except Exception as e:
+        logging.warning(f"Error reading cached result for {key}: {e}")
+        return None
     
-    if result_file.exists():
-        try:
-            with open(result_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                
-            # Check if it's a successful result (has data)
-            if cached_data.get("data") is not None:
-                logging.info(f"Found cached successful result for {url_id}")
-                return cached_data
-            else:
-                logging.info(f"Found cached failed result for {url_id}, will retry")
-                return None
-                
-        except Exception as e:
-            logging.warning(f"Error reading cached result for {url_id}: {e}")
-            return None
+    if cached_data is None:
+        return None
     
-    return None
+    if is_fresh_result(cached_data, analysis_signature):
+        logging.info(f"Found cached successful result for {key}")
+        return cached_data
+    elif cached_data.get("data") is not None:
+        logging.info(f"Found cached result for {key} from a different prompt or model, will re-analyze")
+        return None
+    else:
+        logging.info(f"Found cached failed result for {key}, will retry")
+        return None
+
+def error_result(url: str, url_id: str, error: str, profile: Optional[str] = None) -> Dict[str, Any]:
+    result = {
+        "url": url,
+        "url_id": url_id,
+        "error": error,
+        "data": None
+    }
+    if profile is not None:
+        result["profile"] = profile
+    return result
 
 def process_single_url(url: str, url_id: str, scraper: WebScraper, 
-                      llm_client: LLMClient, master_prompt: str, force: bool = False) -> Dict[str, Any]:
+                      llm_client: LLMClient, master_prompt: str, force: bool = False,
+                      trimmer: Optional[ContentTrimmer] = None) -> Dict[str, Any]:
     """Process a single URL through the complete pipeline"""
+    return process_url_profiles(url, url_id, scraper, llm_client, {None: master_prompt},
+                                force=force, trimmer=trimmer)[None]
+
+def process_url_profiles(url: str, url_id: str, scraper: WebScraper, llm_client: LLMClient,
+                         profiles: Dict[Optional[str], str], force: bool = False,
+                         trimmer: Optional[ContentTrimmer] = None,
+                         relevance: Optional[Dict[Optional[str], RelevanceFilter]] = None,
+                         reposts: Optional[RepostIndex] = None) -> Dict[Optional[str], Dict[str, Any]]:
+    """
+    Process a single URL through the complete pipeline for one or more candidate profiles
+    
+    The page is scraped and trimmed once, and every profile without a fresh
+    result is analyzed against the same text. In two-phase mode the
+    extraction is therefore shared, and only scoring runs per profile.
+    
+    Args:
+        profiles: Profile name -> master prompt; the None profile is the
+            default one, whose results are stored under the bare url_id
+        relevance: Profile name -> relevance pre-filter, which may skip the
+            LLM for an ad or send it to the cheapest cascade model only
+        reposts: Index of analyzed ad texts; an ad whose text matches one
+            (a repost under a new URL) gets a copy of that analysis
+    
+    Returns:
+        Profile name -> result
+    """
     
     logging.info(f"Processing {url_id}: {url}")
     
-    # CHECK CACHE FIRST (unless force=True)
-    if not force:
-        cached_result = check_existing_result(url_id)
+    results, pending = {}, {}
+    for profile, master_prompt in profiles.items():
+        analysis_signature = llm_client.analysis_signature(master_prompt)
+        cached_result = None if force else check_existing_result(url_id, analysis_signature, profile)
         if cached_result:
-            logging.info(f"Using cached result for {url_id}")
-            return cached_result
+            logging.info(f"Using cached result for {result_key(url_id, profile)}")
+            results[profile] = cached_result
+        else:
+            pending[profile] = (master_prompt, analysis_signature)
+    
+    if not pending:
+        return results
     
     try:
-        # Step 1: Scrape content (check cache first)
         logging.debug(f"Scraping content for {url_id}")
         content = scraper.scrape_url(url, url_id, force=force)  # Pass force to scraper
         
         if not content:
             logging.warning(f"No content extracted from {url_id}")
-            return {"url": url, "url_id": url_id, "error": "No content extracted", "data": None}
-        
-        # Step 2: Send to LLM (check cache first)
-        logging.debug(f"Sending to LLM for analysis: {url_id}")
-        llm_response = llm_client.analyze_job_ad(content, master_prompt, url_id, force=force)
-        
-        if not llm_response:
-            logging.warning(f"No response from LLM for {url_id}")
-            return {"url": url, "url_id": url_id, "error": "No LLM response", "data": None}
-        
-        # Step 3: Save individual result
-        result = {
-            "url": url,
-            "url_id": url_id,
-            "timestamp": time.time(),
-            "content_length": len(content),
-            "data": llm_response,
-            "error": None
-        }
+            for profile in pending:
+                results[profile] = error_result(url, url_id, "No content extracted", profile)
+            return results
         
-        # Save individual JSON
-        output_file = Path(config.PROCESSED_DATA_DIR) / f"{url_id}.json"
-        with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
-        
-        logging.info(f"Successfully processed {url_id}")
-        return result
+        llm_content = trimmer.trim(content, url, url_id) if trimmer else content
+        fingerprint = content_fingerprint(content) if reposts else None
         
     except Exception as e:
         logging.error(f"Error processing {url_id}: {str(e)}")
-        error_result = {
-            "url": url,
-            "url_id": url_id,
-            "error": str(e),
-            "data": None
-        }
+        for profile in pending:
+            results[profile] = error_result(url, url_id, str(e), profile)
+            get_artifact_store().put_json("result", result_key(url_id, profile), results[profile])
+        return results
+    
+    for profile, (master_prompt, analysis_signature) in pending.items():
+        key = result_key(url_id, profile)
+        try:
+            source = reposts.lookup(fingerprint, analysis_signature, exclude_key=key) if reposts and not force else None
+            if source:
+                logging.info(f"Reusing the analysis of {source['url_id']} for {key}: same ad text")
+                results[profile] = dict(
+                    url=url, url_id=url_id, timestamp=time.time(), content_length=len(content),
+                    trimmed_length=len(llm_content), analysis_signature=analysis_signature, data=source["data"],
+                    error=None, reused_from=source.get("reused_from") or source["url_id"],
+                    **({"profile": profile} if profile is not None else {})
+                )
+                get_artifact_store().put_json("result", key, results[profile])
+                continue
+            
+            decision, models, downgraded_from = None, None, None
+            if relevance:
+                decision = relevance[profile].decide(content)  # The untrimmed text, as in its training history
+                if decision.action == "skip":
+                    logging.info(f"Skipping {key}: relevance {decision.score:.3f} below {decision.threshold:.3f}")
+                    results[profile] = dict(
+                        error_result(url, url_id, "Skipped by relevance filter", profile),
+                        skipped=True, relevance=decision._asdict()
+                    )
+                    get_artifact_store().put_json("result", key, results[profile])
+                    continue
+                if decision.action == "downgrade":
+                    logging.info(f"Analyzing {key} with {llm_client.entry_model} only: relevance {decision.score:.3f}")
+                    models = [llm_client.entry_model]
+                    downgraded_from = analysis_signature
+                    analysis_signature = llm_client.analysis_signature(master_prompt, models)
+            
+            logging.debug(f"Sending to LLM for analysis: {key}")
+            llm_response = llm_client.analyze_job_ad(llm_content, master_prompt, key, force=force, models=models)
+            
+            if not llm_response:
+                logging.warning(f"No response from LLM for {key}")
+                results[profile] = error_result(url, url_id, "No LLM response", profile)
+                continue
+            
+            result = {
+                "url": url,
+                "url_id": url_id,
+                "timestamp": time.time(),
+                "content_length": len(content),
+                "trimmed_length": len(llm_content),
+                "analysis_signature": analysis_signature,
+                "data": llm_response,
+                "error": None
+            }
+            if profile is not None:
+                result["profile"] = profile
+            if decision is not None:
+                result["relevance"] = decision._asdict()
+            if downgraded_from is not None:
+                result["downgraded_from"] = downgraded_from
+            
+            get_artifact_store().put_json("result", key, result)
+            if reposts:
+                reposts.remember(fingerprint, analysis_signature, key)
+            
+            logging.info(f"Successfully processed {key}")
+            results[profile] = result
+            
+        except Exception as e:
+            logging.error(f"Error processing {key}: {str(e)}")
+            results[profile] = error_result(url, url_id, str(e), profile)
+            get_artifact_store().put_json("result", key, results[profile])
+    
+    return results
+
+
+def add_counts(total: Optional[Dict[str, Any]], counts: Dict[str, Any]) -> Dict[str, Any]:
+    """Sum two stats dicts of numeric counts (total may be None)"""
+    if total is None:
+        return dict(counts)
+    return {key: total.get(key, 0) + value for key, value in counts.items()}
+
+
+def run_scheduled(scheduler: HostScheduler, handle: Callable[[Any], None], total: int, desc: str) -> None:
+    """Drain a scheduler with MAX_WORKERS threads, calling handle(item) for every item"""
+    progress = tqdm(total=total, desc=desc, unit="url")
+    
+    def worker():
+        while True:
+            item = scheduler.next()
+            if item is None:
+                return
+            handle(item)
+            progress.update(1)
+    
+    with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as pool:
+        workers = [pool.submit(worker) for _ in range(config.MAX_WORKERS)]
+        for future in workers:
+            future.result()  # Surface unexpected worker errors
+    progress.close()
+
+
+def has_fresh_results(url_id: str, signatures: Dict[Optional[str], str]) -> bool:
+    """True if every profile (name -> analysis signature) has a reusable result for this URL"""
+    store = get_artifact_store()
+    return all(
+        is_fresh_result(store.get_json("result", result_key(url_id, profile)), signature)
+        for profile, signature in signatures.items()
+    )
+
+
+def process_urls(urls: List[str], scraper: WebScraper, llm_client: LLMClient,
+                 profiles: Dict[Optional[str], str], cache_manager: CacheManager, force: bool = False,
+                 trimmer: Optional[ContentTrimmer] = None,
+                 relevance: Optional[Dict[Optional[str], RelevanceFilter]] = None,
+                 reposts: Optional[RepostIndex] = None) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """
+    Process URLs concurrently, interleaving hosts to honor per-host politeness delays
+    
+    URLs that are already cached never touch the network, so they bypass the
+    per-host spacing and keep workers busy while other hosts cool down.
+    
+    Args:
+        profiles: Profile name -> master prompt ({None: prompt} for a single-profile run)
+    
+    Returns:
+        Profile name -> results in input order
+    """
+    scheduler = HostScheduler()
+    signatures = {profile: llm_client.analysis_signature(prompt) for profile, prompt in profiles.items()}
+    for i, url in enumerate(urls, 1):
+        url_id = f"url_{i:03d}"
+        is_cached = has_fresh_results(url_id, signatures) or scraper.has_cached_content(url_id)
+        scheduler.add((i - 1, url, url_id), extract_domain(url) if force or not is_cached else None)
+    
+    results = {profile: [None] * len(urls) for profile in profiles}
+    completed = 0
+    lock = threading.Lock()
+    
+    def handle(item):
+        nonlocal completed
+        index, url, url_id = item
         
-        # Save error result
-        output_file = Path(config.PROCESSED_DATA_DIR) / f"{url_id}.json"
-        with open(output_file, 'w') as f:
-            json.dump(error_result, f, indent=2)
+        with get_ledger().context(domain=extract_domain(url), url_id=url_id):
+            url_results = process_url_profiles(url, url_id, scraper, llm_client, profiles,
+                                               force=force, trimmer=trimmer, relevance=relevance,
+                                               reposts=reposts)
         
-        return error_result
+        with lock:
+            for profile, result in url_results.items():
+                results[profile][index] = result  # Keep input order regardless of completion order
+            completed += 1
+            if completed % config.CACHE_CHECK_INTERVAL == 0:
+                cache_manager.enforce_quota()
+    
+    run_scheduled(scheduler, handle, len(urls), "Processing URLs")
+    return results
 
 
-def main(force: bool = False):
-    """Main pipeline execution"""
+def collect_pending_ads(urls: List[str], scraper: WebScraper, llm_client: LLMClient,
+                        profiles: Dict[Optional[str], str], force: bool = False,
+                        trimmer: Optional[ContentTrimmer] = None) -> List[Dict[str, str]]:
+    """
+    Scrape every URL that still needs analysis and return the text the LLM would get
+    
+    Used by batch and pack mode, which analyze many ads at once and put the
+    answers in the LLM cache, so the normal pass that follows only collects them
+    (and analyzes on its own whatever they failed on). Pages are trimmed by the
+    run's trimmer, against the same boilerplate indexes as in the normal pass,
+    so the trimmed text, and with it the cache key, matches. A URL is pending if any
+    profile (name -> master prompt) lacks a fresh result for it. Each item
+    also carries the untrimmed text ("cleaned") for the relevance filter and
+    its fingerprint, for repost lookups.
+    """
+    store = get_artifact_store()
+    scheduler = HostScheduler()
+    signatures = {profile: llm_client.analysis_signature(prompt) for profile, prompt in profiles.items()}
+    for i, url in enumerate(urls, 1):
+        url_id = f"url_{i:03d}"
+        if not force and has_fresh_results(url_id, signatures):
+            continue
+        if force:
+            for profile in profiles:
+                store.delete("result", result_key(url_id, profile))  # The normal pass must pick up the new answer
+        host = extract_domain(url) if force or not scraper.has_cached_content(url_id) else None
+        scheduler.add((url, url_id), host)
+    
+    pages = []
+    lock = threading.Lock()
+    
+    def handle(item):
+        url, url_id = item
+        try:
+            content = scraper.scrape_url(url, url_id, force=force)
+        except Exception as e:
+            logging.error(f"Error scraping {url_id}: {e}")
+            return
+        if content:
+            with lock:
+                pages.append((url, url_id, content))
+    
+    run_scheduled(scheduler, handle, len(scheduler), "Scraping pending URLs")
+    pages.sort(key=lambda page: page[1])
+    
+    return [
+        {"url_id": url_id, "content": trimmer.trim(content, url, url_id) if trimmer else content,
+         "cleaned": content, "fingerprint": content_fingerprint(content)}
+        for url, url_id, content in pages
+    ]
+
+
+def main(force: bool = False, batch: bool = False, pack: bool = False,
+         profile_files: Optional[List[str]] = None, combine_profiles: bool = False):
+    """
+    Main pipeline execution
+    
+    With profile_files, every ad is scored for each profile (a master prompt
+    file per candidate) against one shared scrape and, in two-phase mode,
+    extraction. Outputs are written per profile, or as one table with a
+    profile column if combine_profiles is set.
+    """
     
     # Setup logging
     setup_logging()
     logging.info("Starting Job Ad Analyzer Pipeline")
+    ledger = get_ledger()
+    ledger.reset()
     
     try:
         # Ensure directory structure exists
         ensure_directories()
         
+        # Make room before the run rather than running out of disk mid-run
+        cache_manager = CacheManager()
+        cache_manager.enforce_quota()
+        
         # Load inputs
         urls = load_urls(config.URLS_FILE)
-        master_prompt = load_master_prompt(config.PROMPT_FILE)
+        if profile_files:
+            profiles = load_profiles(profile_files)
+        else:
+            profiles = {None: load_master_prompt(config.PROMPT_FILE)}
         
         # Initialize components
         scraper = WebScraper()
         llm_client = LLMClient()
         processor = DataProcessor()
+        trimmer = ContentTrimmer() if config.TRIM_CONTENT else None
+        
+        # Built from the results so far, before this run adds to them
+        relevance = None
+        if config.RELEVANCE_FILTER != "off":
+            relevance = {profile: RelevanceFilter.from_history(prompt, profile) for profile, prompt in profiles.items()}
+        
+        reposts = None
+        if config.REUSE_REPOSTS:
+            reposts = RepostIndex()
+            if not reposts.store.keys("fingerprint"):
+                reposts.backfill()  # First run with the index: cover the ads analyzed before it
+        
+        # Batch/pack mode: analyze pending ads in bulk first, then collect the answers below
+        batch_stats, pack_stats = None, None
+        if batch or pack:
+            items = collect_pending_ads(urls, scraper, llm_client, profiles, force=force, trimmer=trimmer)
+            if batch and pack:
+                logging.info("Batch mode sends one request per ad; --pack is ignored")
+            for profile, master_prompt in profiles.items():
+                # Requests shared by profiles (two-phase extractions) are cached by the first one
+                profile_items = [dict(item, url_id=result_key(item["url_id"], profile)) for item in items]
+                if reposts and not force:
+                    # Reposts of an analyzed ad, or of another pending one, are copied in the normal pass instead
+                    signature, originals, fingerprints = llm_client.analysis_signature(master_prompt), [], set()
+                    for item in profile_items:
+                        if item["fingerprint"] in fingerprints or reposts.lookup(
+                                item["fingerprint"], signature, item["url_id"], record=False):
+                            continue
+                        fingerprints.add(item["fingerprint"])
+                        originals.append(item)
+                    profile_items = originals
+                if relevance and relevance[profile].mode == "skip":
+                    profile_items = [item for item in profile_items
+                                     if relevance[profile].decide(item["cleaned"], record=False).action != "skip"]
+                if config.LLM_DELTA_ANALYSIS and not force:
+                    llm_client.analyze_delta(profile_items, master_prompt)  # Cached answers that only lack new fields
+                if batch:
+                    batch_stats = add_counts(batch_stats, llm_client.run_batch(profile_items, master_prompt, force=force))
+                else:
+                    pack_stats = add_counts(pack_stats, llm_client.analyze_packed(profile_items, master_prompt, force=force))
+            force = False  # Pages and answers were just refreshed; the pass below reuses them
         
         # Process all URLs
         results = []
@@ -189,34 +508,75 @@ def main(force: bool = False):
         #     # Add delay between requests to be respectful
         #     if i < total_urls:  # Don't delay after last URL
         #         time.sleep(config.RATE_LIMIT_DELAY)
-        for i, url in enumerate(tqdm(urls, desc="Processing URLs", unit="url"), 1):
-            url_id = f"url_{i:03d}"
-            
-            result = process_single_url(url, url_id, scraper, llm_client, master_prompt, force=force)
-            results.append(result)
-            
-            # Respectful delay
-            if i < total_urls:
-                time.sleep(config.RATE_LIMIT_DELAY)
+        results_by_profile = process_urls(urls, scraper, llm_client, profiles, cache_manager,
+                                          force=force, trimmer=trimmer, relevance=relevance, reposts=reposts)
+        if trimmer:
+            trimmer.save()  # Pages of this run count as boilerplate evidence from the next run on
         
         # Generate summary
+        results = [result for profile_results in results_by_profile.values() for result in profile_results]
         successful = [r for r in results if r["error"] is None]
-        failed = [r for r in results if r["error"] is not None]
+        skipped = [r for r in results if r.get("skipped")]
+        reused = [r for r in results if r.get("reused_from")]
+        failed = [r for r in results if r["error"] is not None and not r.get("skipped")]
         
-        logging.info(f"Pipeline completed: {len(successful)} successful, {len(failed)} failed")
+        logging.info(f"Pipeline completed: {len(successful)} successful, {len(failed)} failed"
+                     + (f", {len(skipped)} skipped as irrelevant" if skipped else "")
+                     + (f", {len(reused)} reused from earlier posts of the same ad" if reused else ""))
+        llm_client.cache.log_stats()
+        llm_client.log_usage_stats()
+        llm_client.log_cascade_stats()
         
-        # Process results into final table
-        if successful:
-            logging.info("Creating final structured output...")
-            processor.create_final_table(successful)
-            logging.info("Final table created successfully")
+        # Process results into final table(s)
+        if combine_profiles or None in profiles:
+            if successful:
+                logging.info("Creating final structured output...")
+                processor.create_final_table(successful)
+                logging.info("Final table created successfully")
+        else:
+            for profile, profile_results in results_by_profile.items():
+                profile_successful = [r for r in profile_results if r["error"] is None]
+                if profile_successful:
+                    logging.info(f"Creating final structured output for profile '{profile}'...")
+                    processor.create_final_table(profile_successful, output_name=profile)
         
         # Generate processing report
         report = {
             "total_urls": total_urls,
             "successful": len(successful),
             "failed": len(failed),
-            "failed_urls": [{"url_id": r["url_id"], "error": r["error"]} for r in failed],
+            "skipped": len(skipped),
+            "failed_urls": [
+                dict({"url_id": r["url_id"], "error": r["error"]}, **({"profile": r["profile"]} if "profile" in r else {}))
+                for r in failed
+            ],
+            "profiles": {
+                profile: {
+                    "successful": sum(1 for r in profile_results if r["error"] is None),
+                    "failed": sum(1 for r in profile_results if r["error"] is not None),
+                    "profile_hash": profile_hash(profiles[profile])
+                }
+                for profile, profile_results in results_by_profile.items()
+            } if None not in profiles else None,
+            "cache": cache_manager.get_stats(),
+            "trimming": trimmer.get_stats() if trimmer else None,
+            "llm_cache": llm_client.cache.get_stats(),
+            "llm_usage": llm_client.get_usage_stats(),
+            "parsing": llm_client.get_parse_stats(),
+            "retries": llm_client.retry_policy.get_stats(),
+            "cascade": llm_client.get_cascade_stats(),
+            "two_phase": llm_client.get_phase_stats(),
+            "reask": llm_client.get_reask_stats(),
+            "delta": llm_client.get_delta_stats(),
+            "hedging": llm_client.get_hedge_stats(),
+            "relevance": {
+                profile if profile is not None else "default": relevance_filter.get_stats()
+                for profile, relevance_filter in relevance.items()
+            } if relevance else None,
+            "reposts": reposts.get_stats() if reposts else None,
+            "batch": batch_stats,
+            "packing": pack_stats,
+            "ledger": ledger.get_summary(),
             "timestamp": time.time()
         }
         
@@ -225,6 +585,10 @@ def main(force: bool = False):
             json.dump(report, f, indent=2)
         
         logging.info(f"Processing report saved to {report_file}")
+        
+        # Every LLM call and scrape of the run, one JSON line each
+        ledger.save(Path(config.OUTPUT_DIR) / "run_ledger.jsonl")
+        ledger.log_summary()
         logging.info("Pipeline execution completed successfully")
         
     except KeyboardInterrupt:
@@ -236,5 +600,16 @@ def main(force: bool = False):
 
 
 if __name__ == "__main__":
-    force = False
-    main(force)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyze job ads from data/input/urls.txt")
+    parser.add_argument("--force", action="store_true", help="Ignore cached pages, LLM responses and results")
+    parser.add_argument("--batch", action="store_true",
+                        help="Send LLM requests through the Batch API (cheaper, may take up to 24h)")
+    parser.add_argument("--pack", action="store_true",
+                        help="Analyze several short ads per LLM request (see LLM_PACK_* in config.py)")
+    parser.add_argument("--profiles", nargs="+", metavar="PROMPT_FILE",
+                        help="Score every ad for each of these master prompt files (one per candidate profile)")
+    parser.add_argument("--combine-profiles", action="store_true",
+                        help="With --profiles, write one table with a profile column instead of one per profile")
+    args = parser.parse_args()
+    main(force=args.force, batch=args.batch, pack=args.pack or config.LLM_PACK_ADS,
+         profile_files=args.profiles, combine_profiles=args.combine_profiles or config.COMBINE_PROFILE_OUTPUTS)
\ No newline at end of file
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Inspect, prune, import and export cached pipeline artifacts
+"""
+
+import argparse
+import json
+import sys
+
+import config
+from src.artifact_store import FileArtifactStore, SQLiteArtifactStore, copy_artifacts
+from src.cache_manager import CacheManager
+from src.utils import setup_logging
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Format a byte count in human readable form"""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def cmd_stats(manager: CacheManager, args) -> int:
+    """Print cache usage per artifact type"""
+    stats = manager.get_stats()
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    print(f"📦 Cache usage: {format_bytes(stats['total_bytes'])} of {format_bytes(stats['quota_bytes'])} "
+          f"({stats['quota_used']:.0%}) in {stats['total_files']} files\n")
+    for kind, kind_stats in sorted(stats["by_kind"].items()):
+        protected = " (protected)" if kind in config.CACHE_PROTECTED_KINDS else ""
+        print(f"  {kind:<16} {kind_stats['count']:>6} files  {format_bytes(kind_stats['bytes']):>10}  "
+              f"oldest access {kind_stats['oldest_access_age_days']:.1f} days ago{protected}")
+    return 0
+
+
+def cmd_prune(manager: CacheManager, args) -> int:
+    """Evict expired and over-quota artifacts"""
+    summary = manager.prune(dry_run=args.dry_run)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    action = "Would evict" if args.dry_run else "Evicted"
+    print(f"🧹 {action} {summary['removed_files']} files, freeing {format_bytes(summary['freed_bytes'])}")
+    for entry in summary["removed"]:
+        print(f"  - {entry['kind']:<16} {entry['key']:<20} {format_bytes(entry['size']):>10}  ({entry['reason']})")
+    print(f"\nRemaining: {format_bytes(summary['remaining_bytes'])} of {format_bytes(manager.max_bytes)}")
+    return 0
+
+
+def cmd_verify(manager: CacheManager, args) -> int:
+    """Report corrupt artifacts"""
+    report = manager.verify()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif report["issues"]:
+        print(f"❌ Found {len(report['issues'])} problems in {report['checked_files']} files:")
+        for issue in report["issues"]:
+            print(f"  - {issue['path']}: {issue['problem']}")
+    else:
+        print(f"✅ All {report['checked_files']} cached files look valid")
+
+    return 1 if report["issues"] else 0
+
+
+def cmd_import(manager: CacheManager, args) -> int:
+    """Load the data/raw + data/processed directory tree into the SQLite store"""
+    target = SQLiteArtifactStore(args.db)
+    counts = copy_artifacts(FileArtifactStore(), target)
+    print(f"📥 Imported {sum(counts.values())} artifacts into {target.db_path}")
+    for kind, count in counts.items():
+        print(f"  {kind:<16} {count:>6}")
+    return 0
+
+
+def cmd_export(manager: CacheManager, args) -> int:
+    """Recreate the data/raw + data/processed directory tree from the SQLite store"""
+    source = SQLiteArtifactStore(args.db)
+    counts = copy_artifacts(source, FileArtifactStore())
+    print(f"📤 Exported {sum(counts.values())} artifacts to {config.RAW_DATA_DIR} and {config.PROCESSED_DATA_DIR}")
+    for kind, count in counts.items():
+        print(f"  {kind:<16} {count:>6}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the Job Ad Analyzer artifact cache")
+    parser.add_argument("--max-mb", type=int, help="Override the disk quota (CACHE_MAX_MB)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Show cache usage per artifact type")
+    prune_parser = subparsers.add_parser("prune", help="Evict expired and over-quota artifacts")
+    prune_parser.add_argument("--dry-run", action="store_true", help="Only report what would be evicted")
+    subparsers.add_parser("verify", help="Check cached artifacts for corruption")
+    for name, help_text in [
+        ("import", "Copy the data/raw + data/processed files into the SQLite store"),
+        ("export", "Recreate the data/raw + data/processed files from the SQLite store"),
+    ]:
+        copy_parser = subparsers.add_parser(name, help=help_text)
+        copy_parser.add_argument("--db", default=config.ARTIFACT_DB_FILE, help="SQLite store path")
+
+    args = parser.parse_args()
+
+    setup_logging()
+    max_bytes = args.max_mb * 1024 * 1024 if args.max_mb else None
+    manager = CacheManager(max_bytes=max_bytes)
+
+    commands = {
+        "stats": cmd_stats,
+        "prune": cmd_prune,
+        "verify": cmd_verify,
+        "import": cmd_import,
+        "export": cmd_export,
+    }
+    sys.exit(commands[args.command](manager, args))
+
+
+if __name__ == "__main__":
+    main()
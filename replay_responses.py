@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Re-parse stored LLM responses offline
+
+After a fix to response parsing or normalization, this runs the parser again
+over every raw response kept in the LLM cache and the per-URL response copies
+(in a process pool), updates their parsed_response and the per-URL results
+built from them, and reports which fields changed. Failed responses are parsed
+again too and listed if they now parse. No LLM or network calls are made.
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.artifact_store import ArtifactStore, get_artifact_store
+from src.response_parser import parse_json_response, reparse_record
+from src.utils import setup_logging
+from src.validation import get_path, leaf_paths
+
+
+FAILED_RESPONSE_SEPARATOR = "\n" + "=" * 50 + "\n"  # Between the header and the raw text of a failed response
+
+
+def parse_failed_response(text: str) -> Optional[Dict[str, Any]]:
+    """Parse the raw response saved in a failed_response artifact"""
+    return parse_json_response(text.split(FAILED_RESPONSE_SEPARATOR, 1)[-1])[0]
+
+
+def changed_fields(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> List[str]:
+    """Dotted paths of the leaves that differ between two parsed responses"""
+    paths = dict.fromkeys(leaf_paths(old or {}) + leaf_paths(new or {}))
+    return [".".join(path) for path in paths if get_path(old, path) != get_path(new, path)]
+
+
+def load_records(store: ArtifactStore) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Stored responses by cache key, and the per-URL response copies by url_id
+
+    Per-URL copies whose cache entry has been evicted are replayed on their own.
+    """
+    records = store.get_many_json("llm_cache")
+    responses = store.get_many_json("llm_response")
+    for url_id, record in responses.items():
+        records.setdefault(record.get("cache_key") or f"llm_response:{url_id}", record)
+    return records, responses
+
+
+def replay(store: ArtifactStore, workers: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Re-parse every stored response and write back what changed (unless dry_run)"""
+    records, responses = load_records(store)
+    failed = store.get_many("failed_response")
+
+    keys = list(records)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        reparsed = dict(zip(keys, pool.map(reparse_record, [records[key] for key in keys], chunksize=16)))
+        recovered = dict(zip(failed, pool.map(parse_failed_response, list(failed.values()), chunksize=16)))
+
+    report = {
+        "dry_run": dry_run,
+        "responses": len(records),
+        "unchanged": 0,
+        "changed": [],
+        "unparseable": [],  # Stored responses the parser now rejects; their parsed_response is kept
+        "results_updated": [],
+        "failed_responses": len(failed),
+        "recovered": sorted(url_id for url_id, parsed in recovered.items() if parsed),
+    }
+
+    # LLM cache records
+    updated = {}  # cache key -> (parsed response, parse method)
+    for key, (parsed, method) in reparsed.items():
+        record = records[key]
+        if parsed is None:
+            report["unparseable"].append(record.get("url_id") or key)
+            continue
+        fields = changed_fields(record.get("parsed_response"), parsed)
+        if not fields:
+            report["unchanged"] += 1
+            continue
+        updated[key] = (parsed, method)
+        report["changed"].append({"url_id": record.get("url_id"), "cache_key": key, "fields": fields})
+        if not dry_run and not key.startswith("llm_response:"):
+            store.put_json("llm_cache", key, dict(record, parsed_response=parsed, parse_method=method))
+
+    # Per-URL response copies
+    changed_responses = set()
+    for url_id, record in responses.items():
+        key = record.get("cache_key") or f"llm_response:{url_id}"
+        if key not in updated:
+            continue
+        parsed, method = updated[key]
+        responses[url_id] = dict(record, parsed_response=parsed, parse_method=method)
+        changed_responses.add(url_id)
+        if not dry_run:
+            store.put_json("llm_response", url_id, responses[url_id])
+
+    # Per-URL results: one response, or the extraction and scoring responses in two-phase mode
+    for result_key, result in store.get_many_json("result").items():
+        if result.get("error") is not None or not isinstance(result.get("data"), dict):
+            continue
+        sources = [result_key] if result_key in responses else [f"{result_key}_extraction", f"{result_key}_scoring"]
+        if not all(source in responses for source in sources) or not changed_responses.intersection(sources):
+            continue
+
+        merged = {}
+        for source in sources:
+            merged.update(responses[source].get("parsed_response") or {})
+        data = {key: merged[key] for key in result["data"] if key in merged}
+        data.update((key, value) for key, value in merged.items() if key not in data)
+        if data == result["data"]:
+            continue
+        report["results_updated"].append(result_key)
+        if not dry_run:
+            store.put_json("result", result_key, dict(result, data=data))
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse stored LLM responses without calling the LLM")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: one per CPU)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+
+    setup_logging()
+    report = replay(get_artifact_store(), args.workers, args.dry_run)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    action = "Would update" if args.dry_run else "Updated"
+    print(f"🔁 Re-parsed {report['responses']} stored responses: {len(report['changed'])} changed, "
+          f"{report['unchanged']} unchanged, {len(report['unparseable'])} no longer parseable (kept as stored)")
+    for change in report["changed"]:
+        print(f"  - {change['url_id'] or change['cache_key'][:12]}: {', '.join(change['fields'])}")
+    print(f"\n📝 {action} {len(report['results_updated'])} per-URL results")
+    if report["recovered"]:
+        print(f"\n🩹 {len(report['recovered'])} of {report['failed_responses']} failed responses now parse "
+              f"(listed only: the requests that produced them aren't stored):")
+        for url_id in report["recovered"]:
+            print(f"  - {url_id}")
+    if report["results_updated"] and not args.dry_run:
+        print("\n✅ Run main.py to rebuild the output tables from the updated results (no LLM calls needed)")
+
+
+if __name__ == "__main__":
+    main()
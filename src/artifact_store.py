@@ -0,0 +1,412 @@
+"""
+Artifact storage for Job Ad Analyzer
+
+Cached pages, cleaned text, LLM responses and per-URL results are stored either
+as individual files in data/raw and data/processed (the original layout) or in a
+single content-addressed SQLite file.
+"""
+
+import logging
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import config
+from src.utils import save_text_file, touch_file
+
+
+# Where each artifact type lives in the directory layout: (directory setting, filename pattern)
+FILE_LAYOUT = {
+    "html": ("RAW_DATA_DIR", "{key}.html"),
+    "cleaned": ("RAW_DATA_DIR", "{key}_cleaned.txt"),
+    "result": ("PROCESSED_DATA_DIR", "{key}.json"),
+    "llm_response": ("PROCESSED_DATA_DIR", "{key}_llm_response.json"),
+    "failed_response": ("PROCESSED_DATA_DIR", "{key}_failed_response.txt"),
+    "boilerplate": ("PROCESSED_DATA_DIR", "{key}_boilerplate.json"),
+    "llm_cache": ("PROCESSED_DATA_DIR", "llm_cache/{key}.json"),
+    "fingerprint": ("PROCESSED_DATA_DIR", "fingerprints/{key}.json"),
+}
+
+# Filename patterns for recognising artifacts on disk, checked in order per (directory, subdirectory)
+FILE_PATTERNS = {
+    ("RAW_DATA_DIR", ""): [
+        ("cleaned", re.compile(r"^(?P<key>.+)_cleaned\.txt$")),
+        ("html", re.compile(r"^(?P<key>.+)\.html$")),
+    ],
+    ("PROCESSED_DATA_DIR", ""): [
+        ("llm_response", re.compile(r"^(?P<key>.+)_llm_response\.json$")),
+        ("failed_response", re.compile(r"^(?P<key>.+)_failed_response\.txt$")),
+        ("boilerplate", re.compile(r"^(?P<key>.+)_boilerplate\.json$")),
+        ("result", re.compile(r"^(?P<key>url_.+)\.json$")),
+    ],
+    ("PROCESSED_DATA_DIR", "llm_cache"): [
+        ("llm_cache", re.compile(r"^(?P<key>[0-9a-f]+)\.json$")),
+    ],
+    ("PROCESSED_DATA_DIR", "fingerprints"): [
+        ("fingerprint", re.compile(r"^(?P<key>[0-9a-f]+)\.json$")),
+    ],
+}
+
+ARTIFACT_KINDS = list(FILE_LAYOUT)
+
+COPY_CHUNK_SIZE = 500  # Artifacts read and written at a time by copy_artifacts()
+
+
+class ArtifactStore:
+    """Common interface for artifact backends"""
+
+    def get(self, kind: str, key: str, touch: bool = True) -> Optional[str]:
+        raise NotImplementedError
+
+    def put(self, kind: str, key: str, content: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, kind: str, key: str) -> bool:
+        raise NotImplementedError
+
+    def keys(self, kind: str) -> List[str]:
+        raise NotImplementedError
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """List all artifacts as dicts with kind, key, size and last_access"""
+        raise NotImplementedError
+
+    def exists(self, kind: str, key: str) -> bool:
+        return self.get(kind, key, touch=False) is not None
+
+    def get_many(self, kind: str, keys: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Read many artifacts of one kind; all of them if keys is None"""
+        keys = self.keys(kind) if keys is None else keys
+        contents = {}
+        for key in keys:
+            content = self.get(kind, key)
+            if content is not None:
+                contents[key] = content
+        return contents
+
+    def put_many(self, kind: str, items: Dict[str, str]) -> None:
+        """Write many artifacts of one kind"""
+        for key, content in items.items():
+            self.put(kind, key, content)
+
+    def get_json(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """Read a JSON artifact, returning None if missing or corrupt"""
+        content = self.get(kind, key)
+        if content is None:
+            return None
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            logging.warning(f"Corrupt {kind} artifact for {key}: {e}")
+            return None
+
+    def put_json(self, kind: str, key: str, data: Any) -> None:
+        self.put(kind, key, json.dumps(data, indent=2, ensure_ascii=False))
+
+    def get_many_json(self, kind: str, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Bulk version of get_json; corrupt artifacts are skipped"""
+        parsed = {}
+        for key, content in self.get_many(kind, keys).items():
+            try:
+                parsed[key] = json.loads(content)
+            except json.JSONDecodeError as e:
+                logging.warning(f"Corrupt {kind} artifact for {key}: {e}")
+        return parsed
+
+    def close(self) -> None:
+        pass
+
+
+class FileArtifactStore(ArtifactStore):
+    """Artifacts as individual files in data/raw and data/processed"""
+
+    def __init__(self, raw_dir: Optional[Path] = None, processed_dir: Optional[Path] = None):
+        # Directories default to the live config values so they follow overrides at runtime
+        self._dirs = {"RAW_DATA_DIR": raw_dir, "PROCESSED_DATA_DIR": processed_dir}
+
+    def _directory(self, setting: str) -> Path:
+        return Path(self._dirs[setting] or getattr(config, setting))
+
+    def path_for(self, kind: str, key: str) -> Path:
+        setting, pattern = FILE_LAYOUT[kind]
+        return self._directory(setting) / pattern.format(key=key)
+
+    def get(self, kind: str, key: str, touch: bool = True) -> Optional[str]:
+        path = self.path_for(kind, key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(f"Error reading {path}: {e}")
+            return None
+
+        if touch:
+            touch_file(path)  # Keep it warm for LRU eviction
+        return content
+
+    def put(self, kind: str, key: str, content: str) -> None:
+        save_text_file(content, self.path_for(kind, key))
+
+    def delete(self, kind: str, key: str) -> bool:
+        try:
+            self.path_for(kind, key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def keys(self, kind: str) -> List[str]:
+        return [entry["key"] for entry in self.entries() if entry["kind"] == kind]
+
+    def entries(self) -> List[Dict[str, Any]]:
+        entries = []
+
+        for (setting, subdirectory), patterns in FILE_PATTERNS.items():
+            directory = self._directory(setting) / subdirectory
+            if not directory.exists():
+                continue
+
+            for path in directory.iterdir():
+                if not path.is_file():
+                    continue
+
+                kind, key = "other", path.name
+                for candidate_kind, pattern in patterns:
+                    match = pattern.match(path.name)
+                    if match:
+                        kind, key = candidate_kind, match.group("key")
+                        break
+
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue  # Removed while scanning
+
+                entries.append({
+                    "kind": kind,
+                    "key": key,
+                    "path": path,
+                    "size": stat.st_size,
+                    # atime is unreliable on noatime mounts, so reads also touch files explicitly
+                    "last_access": max(stat.st_atime, stat.st_mtime),
+                })
+
+        return entries
+
+
+class SQLiteArtifactStore(ArtifactStore):
+    """
+    Artifacts in a single SQLite file
+
+    Contents are stored once per SHA-256 digest (zlib-compressed) and referenced
+    by (kind, key), so identical pages and responses are deduplicated.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            digest TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS artifacts (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            digest TEXT NOT NULL REFERENCES blobs(digest),
+            created REAL NOT NULL,
+            accessed REAL NOT NULL,
+            PRIMARY KEY (kind, key)
+        );
+        CREATE INDEX IF NOT EXISTS artifacts_digest ON artifacts(digest);
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or config.ARTIFACT_DB_FILE)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection shared across pipeline threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        logging.debug(f"SQLiteArtifactStore opened: {self.db_path}")
+
+    @staticmethod
+    def _encode(content: str) -> tuple:
+        raw = content.encode('utf-8')
+        return hashlib.sha256(raw).hexdigest(), zlib.compress(raw), len(raw)
+
+    def get(self, kind: str, key: str, touch: bool = True) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.data FROM artifacts a JOIN blobs b ON a.digest = b.digest "
+                "WHERE a.kind = ? AND a.key = ?",
+                (kind, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if touch:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE artifacts SET accessed = ? WHERE kind = ? AND key = ?",
+                        (time.time(), kind, key)
+                    )
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def get_many(self, kind: str, keys: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        query = (
+            "SELECT a.key, b.data FROM artifacts a JOIN blobs b ON a.digest = b.digest "
+            "WHERE a.kind = ?"
+        )
+        with self._lock:
+            if keys is None:
+                rows = self._conn.execute(query, (kind,)).fetchall()
+            else:
+                wanted = list(keys)
+                rows = []
+                # Stay below SQLite's bound-parameter limit
+                for start in range(0, len(wanted), 500):
+                    chunk = wanted[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(self._conn.execute(
+                        f"{query} AND a.key IN ({placeholders})", (kind, *chunk)
+                    ).fetchall())
+
+            now = time.time()
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE artifacts SET accessed = ? WHERE kind = ? AND key = ?",
+                    [(now, kind, key) for key, _ in rows]
+                )
+
+        return {key: zlib.decompress(data).decode('utf-8') for key, data in rows}
+
+    def put(self, kind: str, key: str, content: str) -> None:
+        self.put_many(kind, {key: content})
+
+    def put_many(self, kind: str, items: Dict[str, str]) -> None:
+        if not items:
+            return
+
+        now = time.time()
+        blobs = {}
+        rows = []
+        for key, content in items.items():
+            digest, data, size = self._encode(content)
+            blobs[digest] = (digest, data, size)
+            rows.append((kind, key, digest, now, now))
+
+        with self._lock, self._conn:
+            old_digests = self._digests_for(kind, list(items))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs (digest, data, size) VALUES (?, ?, ?)",
+                list(blobs.values())
+            )
+            self._conn.executemany(
+                "INSERT INTO artifacts (kind, key, digest, created, accessed) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(kind, key) DO UPDATE SET digest = excluded.digest, accessed = excluded.accessed",
+                rows
+            )
+            self._collect_garbage(old_digests)
+
+    def delete(self, kind: str, key: str) -> bool:
+        with self._lock, self._conn:
+            old_digests = self._digests_for(kind, [key])
+            cursor = self._conn.execute(
+                "DELETE FROM artifacts WHERE kind = ? AND key = ?", (kind, key)
+            )
+            self._collect_garbage(old_digests)
+            return cursor.rowcount > 0
+
+    def _digests_for(self, kind: str, keys: List[str]) -> set:
+        digests = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            digests.update(row[0] for row in self._conn.execute(
+                f"SELECT digest FROM artifacts WHERE kind = ? AND key IN ({placeholders})",
+                (kind, *chunk)
+            ))
+        return digests
+
+    def _collect_garbage(self, digests: set) -> None:
+        """Drop blobs that are no longer referenced by any artifact"""
+        self._conn.executemany(
+            "DELETE FROM blobs WHERE digest = ? AND NOT EXISTS "
+            "(SELECT 1 FROM artifacts WHERE digest = ?)",
+            [(digest, digest) for digest in digests]
+        )
+
+    def keys(self, kind: str) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT key FROM artifacts WHERE kind = ? ORDER BY key", (kind,)
+            )]
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.kind, a.key, b.size, a.accessed FROM artifacts a "
+                "JOIN blobs b ON a.digest = b.digest"
+            ).fetchall()
+        # Sizes are uncompressed, so the quota is conservative for deduplicated content
+        return [
+            {"kind": kind, "key": key, "path": None, "size": size, "last_access": accessed}
+            for kind, key, size, accessed in rows
+        ]
+
+    def vacuum(self) -> None:
+        """Return space freed by evictions to the filesystem"""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def _open_store(backend: str, location: str) -> ArtifactStore:
+    if backend == "sqlite":
+        return SQLiteArtifactStore(Path(location))
+    if backend == "files":
+        return FileArtifactStore()
+    raise ValueError(f"Unsupported artifact backend: {backend}")
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the shared artifact store for the configured backend"""
+    location = str(config.ARTIFACT_DB_FILE) if config.ARTIFACT_BACKEND == "sqlite" else ""
+    return _open_store(config.ARTIFACT_BACKEND, location)
+
+
+def copy_artifacts(source: ArtifactStore, target: ArtifactStore,
+                   kinds: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Bulk-copy artifacts between stores
+
+    Used both to import an existing directory tree into SQLite and to export
+    SQLite back to the original data/raw + data/processed layout. Artifacts
+    are copied COPY_CHUNK_SIZE at a time, so only one chunk of contents is in
+    memory however large the store is.
+
+    Returns:
+        Number of artifacts copied per kind
+    """
+    counts = {}
+    for kind in kinds or ARTIFACT_KINDS:
+        keys = source.keys(kind)
+        counts[kind] = 0
+        for start in range(0, len(keys), COPY_CHUNK_SIZE):
+            contents = source.get_many(kind, keys[start:start + COPY_CHUNK_SIZE])
+            target.put_many(kind, contents)
+            counts[kind] += len(contents)
+        logging.info(f"Copied {counts[kind]} {kind} artifacts")
+    return counts
@@ -0,0 +1,198 @@
+"""
+Cache management for Job Ad Analyzer artifacts
+"""
+
+import logging
+import json
+import time
+from typing import List, Dict, Any, Optional
+import config
+from src.artifact_store import ArtifactStore, SQLiteArtifactStore, get_artifact_store
+
+
+class CacheManager:
+    """Enforce disk quota and TTLs on cached scraping and LLM artifacts"""
+
+    def __init__(self, max_bytes: Optional[int] = None, store: Optional[ArtifactStore] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else config.CACHE_MAX_BYTES
+        self.store = store or get_artifact_store()
+        logging.debug(f"CacheManager initialized with quota: {self.max_bytes} bytes")
+
+    def scan(self) -> List[Dict[str, Any]]:
+        """List all known artifacts with their size and last access time"""
+        return self.store.entries()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summarize cache usage per artifact type"""
+        entries = self.scan()
+        now = time.time()
+
+        by_kind = {}
+        for entry in entries:
+            stats = by_kind.setdefault(entry["kind"], {
+                "count": 0,
+                "bytes": 0,
+                "oldest_access_age_days": 0.0,
+            })
+            stats["count"] += 1
+            stats["bytes"] += entry["size"]
+            age_days = (now - entry["last_access"]) / 86400
+            stats["oldest_access_age_days"] = round(max(stats["oldest_access_age_days"], age_days), 2)
+
+        total_bytes = sum(entry["size"] for entry in entries)
+        return {
+            "total_files": len(entries),
+            "total_bytes": total_bytes,
+            "quota_bytes": self.max_bytes,
+            "quota_used": total_bytes / self.max_bytes if self.max_bytes else 0.0,
+            "by_kind": by_kind,
+        }
+
+    def prune(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Evict expired artifacts, then evict by type order and LRU until under quota
+
+        Args:
+            dry_run: If True, report what would be removed without deleting
+
+        Returns:
+            Summary of evicted artifacts
+        """
+        entries = self.scan()
+        now = time.time()
+        removed = []
+
+        # Pass 1: TTL expiry
+        remaining = []
+        for entry in entries:
+            ttl = config.CACHE_TTLS.get(entry["kind"])
+            if (
+                ttl is not None
+                and entry["kind"] not in config.CACHE_PROTECTED_KINDS
+                and now - entry["last_access"] > ttl
+            ):
+                removed.append(dict(entry, reason="ttl"))
+            else:
+                remaining.append(entry)
+
+        # Pass 2: quota, evicting cheapest-to-rebuild types first, least recently used first
+        total_bytes = sum(entry["size"] for entry in remaining)
+        if total_bytes > self.max_bytes:
+            for kind in config.CACHE_EVICTION_ORDER:
+                candidates = sorted(
+                    (e for e in remaining if e["kind"] == kind),
+                    key=lambda e: e["last_access"]
+                )
+                for entry in candidates:
+                    if total_bytes <= self.max_bytes:
+                        break
+                    removed.append(dict(entry, reason="quota"))
+                    remaining.remove(entry)
+                    total_bytes -= entry["size"]
+
+                if total_bytes <= self.max_bytes:
+                    break
+
+            if total_bytes > self.max_bytes:
+                logging.warning(
+                    f"Cache still over quota after eviction ({total_bytes} > {self.max_bytes} bytes); "
+                    f"remaining data is protected"
+                )
+
+        freed_bytes = 0
+        for entry in removed:
+            if not dry_run:
+                try:
+                    if not self.store.delete(entry["kind"], entry["key"]):
+                        continue
+                except OSError as e:
+                    logging.warning(f"Could not evict {entry['kind']} {entry['key']}: {e}")
+                    continue
+            freed_bytes += entry["size"]
+            logging.debug(f"Evicted {entry['kind']} {entry['key']} ({entry['reason']})")
+
+        if removed and not dry_run and isinstance(self.store, SQLiteArtifactStore):
+            self.store.vacuum()
+
+        summary = {
+            "dry_run": dry_run,
+            "removed_files": len(removed),
+            "freed_bytes": freed_bytes,
+            "remaining_bytes": total_bytes,
+            "removed": [
+                {"kind": e["kind"], "key": e["key"], "size": e["size"], "reason": e["reason"]}
+                for e in removed
+            ],
+        }
+
+        if removed:
+            action = "Would evict" if dry_run else "Evicted"
+            logging.info(f"{action} {len(removed)} cached artifacts ({freed_bytes} bytes)")
+
+        return summary
+
+    def enforce_quota(self) -> Optional[Dict[str, Any]]:
+        """Prune only if the cache is over quota, so it is cheap to call during a run"""
+        total_bytes = sum(entry["size"] for entry in self.scan())
+        if total_bytes <= self.max_bytes:
+            return None
+
+        logging.info(f"Cache over quota ({total_bytes} > {self.max_bytes} bytes), pruning")
+        return self.prune()
+
+    def verify(self) -> Dict[str, Any]:
+        """Check cached artifacts for corruption"""
+        issues = []
+        entries = self.scan()
+
+        for entry in entries:
+            problem = self._verify_entry(entry)
+            if problem:
+                issues.append({
+                    "kind": entry["kind"],
+                    "key": entry["key"],
+                    "path": str(entry["path"] or f"{entry['kind']}:{entry['key']}"),
+                    "problem": problem,
+                })
+
+        return {
+            "checked_files": len(entries),
+            "issues": issues,
+        }
+
+    def _verify_entry(self, entry: Dict[str, Any]) -> Optional[str]:
+        """Return a description of what is wrong with an artifact, or None"""
+        kind = entry["kind"]
+        if kind == "other":
+            return None
+
+        if entry["size"] == 0:
+            return "empty file"
+
+        try:
+            text = self.store.get(kind, entry["key"], touch=False)
+        except UnicodeDecodeError:
+            return "not valid UTF-8"
+        except Exception as e:
+            return f"unreadable: {e}"
+
+        if text is None:
+            return "missing"
+
+        if kind in ("result", "llm_response"):
+            try:
+                data = json.loads(text)
+            except json.JSONDecodeError as e:
+                return f"invalid JSON: {e}"
+
+            if not isinstance(data, dict):
+                return "JSON root is not an object"
+            if kind == "result" and not {"url", "url_id"} <= data.keys():
+                return "result is missing url/url_id"
+            if kind == "llm_response" and not data.get("parsed_response"):
+                return "LLM response has no parsed_response"
+
+        elif kind == "cleaned" and not text.strip():
+            return "cleaned text is blank"
+
+        return None
@@ -0,0 +1,115 @@
+"""
+Repost detection for Job Ad Analyzer
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from src.artifact_store import ArtifactStore, get_artifact_store
+
+
+MONTH = (r"(?:january|february|march|april|may|june|july|august|september|october|november|december"
+         r"|jan|feb|mar|apr|jun|jul|aug|sept|sep|oct|nov|dec)\b\.?")
+
+# Text that changes when a board reposts an unchanged ad, removed before hashing (applied in order, on lowercased text)
+VOLATILE_PATTERNS = [
+    re.compile(r"(?:https?://|www\.)\S+"),  # Links carry utm_*/ref/session parameters
+    # "Job ID: REQ-20931", "ref #4471": a label is required and number ranges are left alone, so "job 15000000-20000000" stays
+    re.compile(r"\b(?:job|ad|posting|vacancy|requisition|req|reference|ref)\.?\s*(?:(?:id|no|number)\.?\s*[:#]?|[:#])\s*"
+               r"(?!\d+-\d+\b)[a-z0-9-]*\d[a-z0-9-]*"),
+    # Hashes, UUIDs and tracking ids: letters and digits mixed, never plain digit runs such as salary ranges
+    re.compile(r"\b(?=[a-z]*\d)(?=\d*[a-z])[a-z0-9]{12,}\b"
+               r"|\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+               r"|\b(?=[0-9-]*[a-f])[0-9a-f-]{16,}\b"),
+    re.compile(r"\b\d{4}[-/.]\d{1,2}[-/.]\d{1,2}(?:[t ]\d{1,2}:\d{2}(?::\d{2})?\S*)?"),  # 2024-05-01, ISO timestamps
+    re.compile(r"\b\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}\b"),  # 01/05/2024, 1.5.24
+    re.compile(rf"\b\d{{1,2}}(?:st|nd|rd|th)?\s+{MONTH}(?:\s+\d{{4}})?\b"),  # 1 May 2024
+    re.compile(rf"\b{MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?\b"),  # May 1, 2024
+    re.compile(r"\b(?:posted|updated|published|listed|active)\s+(?:today|yesterday|just now|\d+\+?\s+\w+\s+ago)\b"),
+    re.compile(r"\b\d+\+?\s+(?:applicants?|applications?|views?)\b"),
+]
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_content(text: str) -> str:
+    """Lowercased ad text without links, ids, dates, posting age and whitespace"""
+    text = text.lower()
+    for pattern in VOLATILE_PATTERNS:
+        text = pattern.sub(" ", text)
+    return WHITESPACE.sub("", text)
+
+
+def content_fingerprint(text: str) -> str:
+    """SHA-256 of the normalized text: equal for reposts of the same ad under another URL"""
+    return hashlib.sha256(normalize_content(text).encode("utf-8")).hexdigest()
+
+
+class RepostIndex:
+    """
+    Fingerprint of an ad's cleaned text -> the stored result analyzing it
+
+    Entries are "fingerprint" artifacts keyed by fingerprint and analysis
+    signature, so a lookup is one store read and survives across runs. An
+    entry only points at a result; if that result was re-analyzed with
+    another prompt, failed or was evicted since, the lookup misses and the ad
+    is analyzed as usual.
+    """
+
+    def __init__(self, store: Optional[ArtifactStore] = None):
+        self.store = store or get_artifact_store()
+        self.stats = {"lookups": 0, "reused": 0, "indexed": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def index_key(fingerprint: str, analysis_signature: str) -> str:
+        return hashlib.sha256(f"{analysis_signature}\n{fingerprint}".encode("utf-8")).hexdigest()
+
+    def lookup(self, fingerprint: str, analysis_signature: str, exclude_key: Optional[str] = None,
+               record: bool = True) -> Optional[Dict[str, Any]]:
+        """The successful result for this text and signature from another URL, or None; record=False leaves the counts alone"""
+        entry = self.store.get_json("fingerprint", self.index_key(fingerprint, analysis_signature))
+        result = None
+        if entry and entry.get("result_key") != exclude_key:
+            result = self.store.get_json("result", entry["result_key"])
+            if not result or result.get("data") is None or result.get("analysis_signature") != analysis_signature:
+                result = None
+        if record:
+            with self._lock:
+                self.stats["lookups"] += 1
+                self.stats["reused"] += 1 if result else 0
+        return result
+
+    def remember(self, fingerprint: str, analysis_signature: str, result_key: str) -> None:
+        """Point the fingerprint at a freshly stored result (the latest one wins)"""
+        self.store.put_json("fingerprint", self.index_key(fingerprint, analysis_signature), {
+            "fingerprint": fingerprint,
+            "analysis_signature": analysis_signature,
+            "result_key": result_key,
+            "timestamp": time.time()
+        })
+        with self._lock:
+            self.stats["indexed"] += 1
+
+    def backfill(self) -> int:
+        """Index the stored results that have their cleaned text, for stores written before the index existed"""
+        results = {
+            key: result for key, result in self.store.get_many_json("result").items()
+            if result.get("data") is not None and result.get("analysis_signature") and not result.get("reused_from")
+        }
+        texts = self.store.get_many("cleaned", {result["url_id"] for result in results.values()})
+        indexed = 0
+        for key, result in sorted(results.items()):
+            if texts.get(result["url_id"]):
+                self.remember(content_fingerprint(texts[result["url_id"]]), result["analysis_signature"], key)
+                indexed += 1
+        logging.info(f"Repost index: indexed {indexed} stored results")
+        return indexed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["reuse_rate"] = round(stats["reused"] / stats["lookups"], 3) if stats["lookups"] else 0.0
+        return stats
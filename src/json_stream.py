@@ -0,0 +1,135 @@
+"""
+Incremental JSON parsing of streamed LLM output for Job Ad Analyzer
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class MalformedStreamError(ValueError):
+    """Raised when streamed output can no longer become the expected JSON object"""
+
+
+class IncrementalJSONParser:
+    """
+    Scan a JSON object as it streams in, emitting top-level fields as soon as they close
+
+    The scanner tracks string/escape state and nesting depth, so braces and
+    commas inside strings don't confuse it. Output that can't be a JSON object
+    (prose before the opening brace, a field that isn't valid JSON) marks the
+    stream as malformed, so the caller can abort instead of waiting for the
+    whole completion. A leading ``` or ```json fence is allowed, and anything
+    after the closing brace is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}  # Top-level fields completed so far
+        self.error = None
+        self.done = False
+
+        self._position = 0  # Next character of buffer to scan
+        self._object_start = None  # Index of the opening brace
+        self._object_end = None  # Index just past the closing brace
+        self._field_start = None  # Index where the current top-level field begins
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Add streamed text
+
+        Returns:
+            (key, value) for every top-level field completed by this chunk
+
+        Raises:
+            MalformedStreamError: If the output has gone off the rails
+        """
+        if self.error:
+            raise MalformedStreamError(self.error)
+
+        self.buffer += chunk
+        completed = []
+
+        if self._object_start is None and not self._find_object_start():
+            return completed
+
+        while self._position < len(self.buffer) and not self.done:
+            char = self.buffer[self._position]
+            index = self._position
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._close_field(index))
+                    self._object_end = index + 1
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                completed.extend(self._close_field(index))
+                self._field_start = index + 1
+
+        return completed
+
+    def _find_object_start(self) -> bool:
+        """Locate the opening brace, failing fast on anything but whitespace or a code fence"""
+        text = self.buffer.lstrip()
+        if not text:
+            return False
+
+        offset = len(self.buffer) - len(text)
+        if text.startswith("`"):
+            if not "```".startswith(text[:3]):
+                self._fail(f"Response starts with {text[:40]!r} instead of a JSON object")
+            newline = text.find("\n")
+            if newline == -1:
+                return False  # Still inside the fence line (```json)
+            rest = text[newline + 1:]
+            if not rest.lstrip():
+                return False
+            offset += newline + 1 + len(rest) - len(rest.lstrip())
+            text = rest.lstrip()
+
+        if text[0] != "{":
+            self._fail(f"Response starts with {text[:40]!r} instead of a JSON object")
+
+        self._object_start = offset
+        self._field_start = offset + 1
+        self._position = offset
+        return True
+
+    def _close_field(self, end: int) -> List[Tuple[str, Any]]:
+        """Parse the top-level `"key": value` text between the last separator and end"""
+        text = self.buffer[self._field_start:end].strip()
+        if not text:
+            return []
+        try:
+            field = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            self._fail(f"Malformed field: {text[:60]!r}")
+        self.fields.update(field)
+        return list(field.items())
+
+    def _fail(self, message: str) -> None:
+        self.error = message
+        raise MalformedStreamError(message)
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The complete object once the closing brace has arrived, else None"""
+        if not self.done:
+            return None
+        return json.loads(self.buffer[self._object_start:self._object_end])
@@ -0,0 +1,178 @@
+"""
+Run ledger for Job Ad Analyzer
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from src.utils import estimate_cost, extract_domain
+
+
+class RunLedger:
+    """
+    Tokens, wall time, retries and estimated cost of every LLM call and scrape in a run
+
+    Call sites only say what happened. The domain, URL and stage it belongs to
+    come from context() blocks opened further up on the same thread: main.py
+    opens one per URL and LLMClient one per kind of request. So deep call sites
+    such as RetryPolicy need no extra arguments. Entries roll up by stage,
+    domain and model for the run report; costs use config.LLM_MODEL_PRICES.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.entries = []
+        self.started = time.time()
+
+    def reset(self) -> None:
+        """Start a new run"""
+        with self._lock:
+            self.entries = []
+            self.started = time.time()
+
+    def current_context(self) -> Dict[str, Any]:
+        """This thread's context, to carry over to work handed to another thread"""
+        return getattr(self._local, "context", {})
+
+    @contextmanager
+    def context(self, **fields):
+        """Attach domain, url_id or stage to everything recorded on this thread inside the block"""
+        previous = self.current_context()
+        self._local.context = dict(previous, **{key: value for key, value in fields.items() if value is not None})
+        try:
+            yield
+        finally:
+            self._local.context = previous
+
+    def _record(self, kind: str, stage: Optional[str], **fields) -> None:
+        context = self.current_context()
+        entry = {"kind": kind, "stage": stage or context.get("stage", "analysis"), "timestamp": round(time.time(), 3)}
+        entry.update((key, value) for key, value in context.items() if key != "stage")
+        entry.update((key, value) for key, value in fields.items() if value is not None)
+        with self._lock:
+            self.entries.append(entry)
+
+    def record_llm_call(self, model: str, usage: Optional[Dict[str, Any]], latency: float,
+                        stage: Optional[str] = None, price_factor: float = 1.0) -> None:
+        """
+        Record one completed LLM request
+
+        Args:
+            usage: LangChain usage_metadata (input/output tokens, input_token_details.cache_read)
+            stage: Overrides the stage from context(), e.g. "batch"
+            price_factor: Multiplier on the list price (Batch API discount)
+        """
+        usage = usage or {}
+        cost = estimate_cost(model, usage)
+        self._record(
+            "llm", stage,
+            model=model,
+            input_tokens=usage.get("input_tokens") or 0,
+            cached_input_tokens=(usage.get("input_token_details") or {}).get("cache_read") or 0,
+            output_tokens=usage.get("output_tokens") or 0,
+            wall_seconds=round(latency, 4),
+            cost_usd=round(cost * price_factor, 8) if cost is not None else None
+        )
+
+    def record_scrape(self, url: str, url_id: str, seconds: float, cached: bool, ok: bool) -> None:
+        """Record one page fetch (or cache read) and extraction"""
+        self._record("scrape", "scrape", domain=extract_domain(url), url_id=url_id,
+                     wall_seconds=round(seconds, 4), cached=cached, ok=ok)
+
+    def record_retry(self, error_class: str) -> None:
+        """Record a failed LLM attempt that is about to be retried"""
+        self._record("retry", None, error=error_class)
+
+    @staticmethod
+    def _empty_bucket() -> Dict[str, Any]:
+        return {
+            "llm_calls": 0, "scrapes": 0, "scrape_cache_hits": 0, "retries": 0,
+            "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0,
+            "wall_seconds": 0.0, "cost_usd": 0.0, "unpriced_calls": 0
+        }
+
+    def _rollup(self, entries: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], str]) -> Dict[str, Dict[str, Any]]:
+        buckets = {}
+        for entry in entries:
+            bucket = buckets.setdefault(key(entry), self._empty_bucket())
+            if entry["kind"] == "llm":
+                bucket["llm_calls"] += 1
+                for field in ("input_tokens", "cached_input_tokens", "output_tokens"):
+                    bucket[field] += entry.get(field, 0)
+                if entry.get("cost_usd") is None:
+                    bucket["unpriced_calls"] += 1
+                else:
+                    bucket["cost_usd"] += entry["cost_usd"]
+            elif entry["kind"] == "scrape":
+                bucket["scrapes"] += 1
+                bucket["scrape_cache_hits"] += 1 if entry.get("cached") else 0
+            elif entry["kind"] == "retry":
+                bucket["retries"] += 1
+            bucket["wall_seconds"] += entry.get("wall_seconds", 0.0)
+
+        for bucket in buckets.values():
+            bucket["wall_seconds"] = round(bucket["wall_seconds"], 3)
+            bucket["cost_usd"] = round(bucket["cost_usd"], 6)
+        return buckets
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Totals and breakdowns by stage, domain (with its stages) and model, for the run report"""
+        with self._lock:
+            entries = list(self.entries)
+
+        by_domain = self._rollup(entries, lambda entry: entry.get("domain") or "unknown")
+        for domain, bucket in by_domain.items():
+            bucket["stages"] = self._rollup(
+                [entry for entry in entries if (entry.get("domain") or "unknown") == domain],
+                lambda entry: entry["stage"]
+            )
+
+        return {
+            "entries": len(entries),
+            "run_seconds": round(time.time() - self.started, 3),
+            "totals": self._rollup(entries, lambda entry: "all").get("all") or self._empty_bucket(),
+            "by_stage": self._rollup(entries, lambda entry: entry["stage"]),
+            "by_domain": dict(sorted(by_domain.items(), key=lambda item: -item[1]["cost_usd"])),
+            "by_model": self._rollup([entry for entry in entries if entry["kind"] == "llm"], lambda entry: entry["model"]),
+        }
+
+    def log_summary(self) -> None:
+        summary = self.get_summary()
+        totals = summary["totals"]
+        if not summary["entries"]:
+            return
+        costliest = ", ".join(
+            f"{domain} ${bucket['cost_usd']:.4f}" for domain, bucket in list(summary["by_domain"].items())[:3]
+        )
+        logging.info(
+            f"Run ledger: {totals['llm_calls']} LLM calls, {totals['scrapes']} scrapes, {totals['retries']} retries, "
+            f"{totals['input_tokens'] + totals['output_tokens']} tokens, est. ${totals['cost_usd']:.4f}"
+            + (f" (costliest domains: {costliest})" if costliest else "")
+        )
+
+    def save(self, file_path: Path) -> None:
+        """Write every entry as one JSON line"""
+        with self._lock:
+            entries = list(self.entries)
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> RunLedger:
+    """The process-wide ledger"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = RunLedger()
+        return _ledger
@@ -0,0 +1,101 @@
+"""
+Content-addressed cache of LLM responses for Job Ad Analyzer
+"""
+
+import copy
+import logging
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import config
+from src.artifact_store import get_artifact_store
+
+
+class LLMResponseCache:
+    """
+    Two-level cache of LLM responses keyed by everything that shapes the answer
+
+    The key is a hash of the rendered messages (system message, master prompt and
+    job ad content), the model and the generation parameters. Identical inputs hit
+    across URLs and runs; editing the prompt, switching model or changing
+    temperature misses. An in-memory LRU sits in front of the artifact store.
+    Records go in and come out as copies, so callers that merge follow-up
+    answers into one can't change what later hits see.
+    """
+
+    def __init__(self, max_memory_entries: Optional[int] = None):
+        self.max_memory_entries = (
+            config.LLM_CACHE_MEMORY_ENTRIES if max_memory_entries is None else max_memory_entries
+        )
+        self.store = get_artifact_store()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def make_key(messages: List[Tuple[str, str]], model: str, params: Dict[str, Any]) -> str:
+        """
+        Hash the inputs of an LLM call
+
+        Args:
+            messages: (role, content) pairs in the order they are sent
+            model: Model name
+            params: Generation parameters (temperature, max_tokens, ...)
+        """
+        payload = json.dumps(
+            {"messages": messages, "model": model, "params": params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached record for a key, or None"""
+        with self._lock:
+            record = self._memory.get(key)
+            if record is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return copy.deepcopy(record)
+
+        record = self.store.get_json("llm_cache", key)
+
+        with self._lock:
+            if record is None or not record.get("parsed_response"):
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, copy.deepcopy(record))
+        return record
+
+    def put(self, key: str, record: Dict[str, Any]) -> None:
+        """Store a record in both cache levels"""
+        self.store.put_json("llm_cache", key, record)
+        with self._lock:
+            self.stats["writes"] += 1
+            self._remember(key, copy.deepcopy(record))
+
+    def _remember(self, key: str, record: Dict[str, Any]) -> None:
+        if self.max_memory_entries <= 0:
+            return
+        self._memory[key] = record
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts for the run report"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logging.info(
+            f"LLM cache: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+            f"{stats['misses']} misses (hit rate {stats['hit_rate']:.0%})"
+        )
@@ -238,20 +238,38 @@
 LLM client for Job Ad Analyzer
 """
 
+import copy
+import hashlib
 import logging
 import json
+import threading
 import time
-from typing import Optional, Dict, Any
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Callable, Collection
+from openai import OpenAI, BadRequestError
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import config
-from src.utils import save_json_file, validate_json_structure
+from src.utils import (
+    validate_json_structure, estimate_tokens, load_json_file, save_json_file, save_text_file, percentile,
+    flatten_analysis, estimate_cost
+)
+from src.artifact_store import get_artifact_store
+from src.llm_cache import LLMResponseCache
+from src.prompts import build_response_format, build_phase_prompts, template_fields, profile_hash
+from src.validation import get_validator, get_path, set_path, leaf_paths
+from src.response_parser import parse_json_response, clean_parsed_data
+from src.json_stream import IncrementalJSONParser, MalformedStreamError
+from src.retry_policy import RetryPolicy, ResponseParseError
+from src.ledger import get_ledger
 
 
 class LLMClient:
     """Client for interacting with Language Models"""
     
+    SYSTEM_MESSAGE = "You are a job advertisement analyzer. Extract structured information from job postings and return valid JSON only."
+    
     def __init__(self):
         # if config.LLM_MODEL.startswith("gpt"):
         self.client = ChatOpenAI(
@@ -260,20 +278,72 @@ class LLMClient:
             model=config.LLM_MODEL,
             temperature=config.TEMPERATURE,
             max_tokens=config.MAX_TOKENS,
-            timeout=config.TIMEOUT
+            timeout=config.TIMEOUT,
+            max_retries=0  # Retries are handled by RetryPolicy
         )
         # else:
         #     # Add support for other LLM providers here
         #     raise ValueError(f"Unsupported LLM model: {config.LLM_MODEL}")
         
         self.model = config.LLM_MODEL
+        self.cascade_models = list(config.LLM_CASCADE_MODELS) or [self.model]
+        self._cascade_clients = {}  # model -> ChatOpenAI, created on first use
+        self.store = get_artifact_store()
+        self.cache = LLMResponseCache()
+        self._openai_client = None  # Created on first batch call
+        self.streaming = config.LLM_STREAMING
+        self.retry_policy = RetryPolicy()
+        self.ledger = get_ledger()
+        self.call_stats = {
+            "calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0,
+            "prefix_hits": 0, "stream_aborts": 0
+        }
+        self._latencies = {"total": [], "ttft": [], "prefix_hit": [], "prefix_miss": []}
+        self.structured_output = config.LLM_STRUCTURED_OUTPUT
+        self.parse_stats = {
+            mode: {"responses": 0, "methods": {}} for mode in ("structured", "prompt_only")
+        }
+        self.model_stats = {}  # model -> calls, tokens, cost, latencies and cascade outcomes
+        self.analysis_mode = config.ANALYSIS_MODE
+        self.phase_stats = {phase: {"cache_hits": 0, "requests": 0, "failed": 0} for phase in ("extraction", "scoring")}
+        self._warned_unsplittable = False
+        self._forced_keys = set()  # Requests already re-sent this run despite a cached answer
+        self.reask_stats = {"reasks": 0, "fields_requested": 0, "fields_fixed": 0, "still_invalid": 0}
+        self.delta_stats = {"requests": 0, "analyzed": 0, "failed": 0, "fields_requested": 0, "fields_filled": 0}
+        self.hedging = config.LLM_HEDGE_REQUESTS
+        self.hedge_stats = {"calls": 0, "fired": 0, "won": 0, "capped": 0}
+        self._hedge_pool = None  # Runs hedged calls and their duplicates; created on first use
+        self._stats_lock = threading.Lock()
         logging.debug(f"LLMClient initialized with model: {self.model}")
+        if self.is_cascade:
+            logging.info(f"Model cascade: {' -> '.join(self.cascade_models)}")
+    
+    @property
+    def is_cascade(self) -> bool:
+        return len(self.cascade_models) > 1
+    
+    @property
+    def entry_model(self) -> str:
+        """The model every ad is sent to first"""
+        return self.cascade_models[0]
+    
+    def _chat_client(self, model: Optional[str] = None) -> ChatOpenAI:
+        """Chat model for a model name; LLM_MODEL uses self.client"""
+        if model is None or model == self.model:
+            return self.client
+        with self._stats_lock:
+            if model not in self._cascade_clients:
+                self._cascade_clients[model] = ChatOpenAI(
+                    api_key=config.LLM_API_KEY,
+                    base_url=config.LLM_BASE_URL,
+                    model=model,
+                    temperature=config.TEMPERATURE,
+                    max_tokens=config.MAX_TOKENS,
+                    timeout=config.TIMEOUT,
+                    max_retries=0
+                )
+            return self._cascade_clients[model]
     
-    @retry(
-        stop=stop_after_attempt(config.MAX_RETRIES),
-        wait=wait_exponential(multiplier=config.RETRY_DELAY, min=1, max=60),
-        retry=retry_if_exception_type((Exception,))  # Catch all exceptions for retry
-    )
     # def analyze_job_ad(self, content: str, master_prompt: str, url_id: str) -> Optional[Dict[str, Any]]:
     #     """
     #     Send job ad content to LLM for analysis
@@ -287,212 +357,1296 @@ class LLMClient:
     #         Parsed JSON response or None if failed
     #     """
 
-    def _check_cached_llm_response(self, url_id: str) -> Optional[Dict[str, Any]]:
-        """Check if we have a cached LLM response"""
+    def _check_cached_llm_response(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Check if we have a cached LLM response for these exact inputs"""
+        
+        try:
+            record = self.cache.get(cache_key)
+            if record:
+                logging.debug(f"Found cached LLM response for key {cache_key[:12]}")
+                return record
+                    
+        except Exception as e:
+            logging.warning(f"Error reading cached LLM response for key {cache_key[:12]}: {e}")
+        
+        return None
+
+    def _system_prompt(self, master_prompt: str) -> str:
+        """
+        Instructions shared by every request, sent first so they form a byte-identical prefix
+        
+        Providers cache long repeated prompt prefixes and bill/serve them cheaper
+        and faster; everything that varies per request must come after this.
+        """
+        return f"{self.SYSTEM_MESSAGE}\n\n{master_prompt}"
+
+    def _build_messages(self, content: str, master_prompt: str) -> list:
+        """Build the chat messages for analyzing one job ad"""
+        return [
+            SystemMessage(content=self._system_prompt(master_prompt)),
+            HumanMessage(content=f"Job Advertisement Content:\n{content}")
+        ]
+
+    def _invoke(self, messages: list, model: Optional[str] = None, **kwargs):
+        """Call the chat model and record its latency and (cached) token usage"""
+        if self.hedging:
+            return self._invoke_hedged(messages, model, **kwargs)
+        return self._invoke_once(messages, model, **kwargs)
+    
+    def _invoke_once(self, messages: list, model: Optional[str] = None, **kwargs):
+        start = time.perf_counter()
+        response = self._chat_client(model).invoke(messages, **kwargs)
+        latency = time.perf_counter() - start
+        self._record_call(getattr(response, 'usage_metadata', None), latency, model=model)
+        return response, latency
+    
+    def _hedge_delay(self, model: Optional[str]) -> Optional[float]:
+        """Seconds to wait before duplicating a call to this model; None until enough latencies are known"""
+        with self._stats_lock:
+            latencies = self._model_stats(model or self.model)["latencies"][-config.LLM_HEDGE_WINDOW:]
+        if len(latencies) < config.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(latencies, config.LLM_HEDGE_PERCENTILE)
+    
+    def _may_hedge(self) -> bool:
+        """Take a duplicate request from the LLM_HEDGE_MAX_FRACTION allowance, if any is left"""
+        with self._stats_lock:
+            if self.hedge_stats["fired"] + 1 > config.LLM_HEDGE_MAX_FRACTION * self.hedge_stats["calls"]:
+                self.hedge_stats["capped"] += 1
+                return False
+            self.hedge_stats["fired"] += 1
+            return True
+    
+    def _invoke_hedged(self, messages: list, model: Optional[str] = None, **kwargs):
+        """
+        _invoke_once(), sent a second time if it is slower than usual
+        
+        The call runs on the hedge pool. If it hasn't finished after
+        LLM_HEDGE_PERCENTILE of the model's recent latencies, an identical
+        request follows and the first successful answer is returned. The other
+        one is left to finish in the background; both are paid for and booked,
+        the duplicate under the "hedge" stage of the run ledger. Errors are
+        raised only when both fail.
+        """
+        with self._stats_lock:
+            self.hedge_stats["calls"] += 1
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=2 * config.MAX_WORKERS, thread_name_prefix="hedge")
+        context = self.ledger.current_context()
+        
+        def call(stage=None):
+            with self.ledger.context(**context), self.ledger.context(stage=stage):
+                return self._invoke_once(messages, model, **kwargs)
+        
+        start = time.perf_counter()
+        delay = self._hedge_delay(model)
+        primary = self._hedge_pool.submit(call)
+        pending = {primary}
+        if delay is not None and not wait(pending, timeout=delay).done and self._may_hedge():
+            logging.debug(f"Hedging a call to {model or self.model} still running after {delay:.2f}s")
+            pending.add(self._hedge_pool.submit(call, "hedge"))
+        
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response, _ = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if future is not primary:
+                    with self._stats_lock:
+                        self.hedge_stats["won"] += 1
+                return response, time.perf_counter() - start
+        raise error
+    
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """How often calls were duplicated and how often the duplicate answered first, for the run report"""
+        with self._stats_lock:
+            stats = dict(self.hedge_stats, enabled=self.hedging)
+        stats["fire_rate"] = round(stats["fired"] / stats["calls"], 3) if stats["calls"] else 0.0
+        stats["win_rate"] = round(stats["won"] / stats["fired"], 3) if stats["fired"] else 0.0
+        return stats
+
+    def _complete(self, messages: list, url_id: str,
+                  on_field: Optional[Callable[[str, Any], None]] = None,
+                  model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Get one completion, streamed if LLM_STREAMING is on
+        
+        A streamed answer that starts with prose or contains a malformed field is
+        aborted and requested again, up to LLM_STREAM_ABORT_RETRIES times; the
+        last attempt always runs to the end so the JSON salvage strategies still
+        get a chance.
+        
+        Returns:
+            Dict with text, usage, latency, ttft (None unless streamed) and streamed
+        """
+        if not self.streaming:
+            response, latency = self._invoke(messages, model, **kwargs)
+            return {
+                "text": response.content.strip(),
+                "usage": getattr(response, 'usage_metadata', None),
+                "latency": latency,
+                "ttft": None,
+                "streamed": False
+            }
         
-        response_file = config.PROCESSED_DATA_DIR / f"{url_id}_llm_response.json"
-        if response_file.exists():
+        for attempt in range(config.LLM_STREAM_ABORT_RETRIES + 1):
+            abort_on_malformed = attempt < config.LLM_STREAM_ABORT_RETRIES
             try:
-                with open(response_file, 'r', encoding='utf-8') as f:
-                    debug_data = json.load(f)
+                return self._stream(messages, url_id, abort_on_malformed, on_field, model, **kwargs)
+            except MalformedStreamError as e:
+                logging.warning(f"Aborted streamed response for {url_id} (attempt {attempt + 1}): {e}")
+
+    def _stream(self, messages: list, url_id: str, abort_on_malformed: bool,
+                on_field: Optional[Callable[[str, Any], None]] = None,
+                model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Stream a completion through IncrementalJSONParser, recording time to first token"""
+        parser = IncrementalJSONParser()
+        parts, usage, ttft = [], None, None
+        start = time.perf_counter()
+        
+        try:
+            for chunk in self._chat_client(model).stream(messages, stream_usage=True, **kwargs):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                if text and ttft is None:
+                    ttft = time.perf_counter() - start
+                parts.append(text)
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
                 
-                parsed_response = debug_data.get('parsed_response')
-                if parsed_response:
-                    logging.debug(f"Found cached LLM response for {url_id}")
-                    return parsed_response
-                    
-            except Exception as e:
-                logging.warning(f"Error reading cached LLM response for {url_id}: {e}")
+                if parser.error or not text:
+                    continue
+                try:
+                    for key, value in parser.feed(text):
+                        logging.debug(f"Received field '{key}' for {url_id} after {time.perf_counter() - start:.2f}s")
+                        if on_field:
+                            on_field(key, value)
+                except MalformedStreamError:
+                    if abort_on_malformed:
+                        raise  # Leaving the loop closes the HTTP stream
+        except MalformedStreamError:
+            with self._stats_lock:
+                self.call_stats["stream_aborts"] += 1
+            self._record_call(usage, time.perf_counter() - start, ttft, model)
+            raise
+        
+        latency = time.perf_counter() - start
+        self._record_call(usage, latency, ttft, model)
+        return {"text": "".join(parts).strip(), "usage": usage, "latency": latency, "ttft": ttft, "streamed": True}
+
+    @staticmethod
+    def _cached_tokens(usage: Optional[Dict[str, Any]]) -> int:
+        """Input tokens served from the provider's prompt cache"""
+        details = (usage or {}).get("input_token_details") or {}
+        return details.get("cache_read") or 0
+
+    def _record_call(self, usage: Optional[Dict[str, Any]], latency: float, ttft: Optional[float] = None,
+                     model: Optional[str] = None) -> None:
+        cached = self._cached_tokens(usage)
+        cost = estimate_cost(model or self.model, usage)
+        with self._stats_lock:
+            stats = self._model_stats(model or self.model)
+            stats["calls"] += 1
+            stats["input_tokens"] += (usage or {}).get("input_tokens") or 0
+            stats["cached_input_tokens"] += cached
+            stats["output_tokens"] += (usage or {}).get("output_tokens") or 0
+            stats["cost_usd"] += cost or 0.0
+            stats["latencies"].append(latency)
+            
+            self.call_stats["calls"] += 1
+            self._latencies["total"].append(latency)
+            if ttft is not None:
+                self._latencies["ttft"].append(ttft)
+            self.call_stats["input_tokens"] += (usage or {}).get("input_tokens") or 0
+            self.call_stats["cached_input_tokens"] += cached
+            self.call_stats["output_tokens"] += (usage or {}).get("output_tokens") or 0
+            self.call_stats["prefix_hits"] += 1 if cached else 0
+            self._latencies["prefix_hit" if cached else "prefix_miss"].append(latency)
+        self.ledger.record_llm_call(model or self.model, usage, latency)
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """Token usage and prompt-prefix cache effectiveness for the run report"""
+        with self._stats_lock:
+            stats = dict(self.call_stats)
+            latencies = {name: list(values) for name, values in self._latencies.items()}
+        
+        stats["uncached_input_tokens"] = stats["input_tokens"] - stats["cached_input_tokens"]
+        stats["prefix_hit_rate"] = round(stats["prefix_hits"] / stats["calls"], 3) if stats["calls"] else 0.0
+        stats["cached_token_ratio"] = (
+            round(stats["cached_input_tokens"] / stats["input_tokens"], 3) if stats["input_tokens"] else 0.0
+        )
+        for name in ("total", "ttft"):
+            values = latencies[name]
+            stats[f"{name}_p50"] = round(percentile(values, 50), 3) if values else None
+            stats[f"{name}_p95"] = round(percentile(values, 95), 3) if values else None
+        for name in ("prefix_hit", "prefix_miss"):
+            values = latencies[name]
+            stats[f"latency_p50_{name}"] = round(percentile(values, 50), 3) if values else None
+        if stats["latency_p50_prefix_hit"] is not None and stats["latency_p50_prefix_miss"] is not None:
+            stats["latency_gain_p50"] = round(stats["latency_p50_prefix_miss"] - stats["latency_p50_prefix_hit"], 3)
+        return stats
+
+    def log_usage_stats(self) -> None:
+        stats = self.get_usage_stats()
+        if not stats["calls"]:
+            return
+        logging.info(
+            f"LLM calls: {stats['calls']}, {stats['input_tokens']} input tokens "
+            f"({stats['cached_input_tokens']} from prompt cache, {stats['cached_token_ratio']:.0%}), "
+            f"prefix hit rate {stats['prefix_hit_rate']:.0%}, p50 latency {stats['total_p50']}s"
+            + (f", p50 time to first token {stats['ttft_p50']}s, {stats['stream_aborts']} aborted streams"
+               if stats["ttft_p50"] is not None else "")
+        )
+
+    def _model_stats(self, model: str) -> Dict[str, Any]:
+        """Per-model counters (call with _stats_lock held)"""
+        if model not in self.model_stats:
+            self.model_stats[model] = {
+                "calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0,
+                "cost_usd": 0.0, "latencies": [], "accepted": 0, "failed": 0, "escalated": {}
+            }
+        return self.model_stats[model]
+
+    def _record_outcome(self, model: str, outcome: str) -> None:
+        """Count a model's answer as "accepted", "failed" or escalated for a reason"""
+        with self._stats_lock:
+            stats = self._model_stats(model)
+            if outcome in ("accepted", "failed"):
+                stats[outcome] += 1
+            else:
+                stats["escalated"][outcome] = stats["escalated"].get(outcome, 0) + 1
+
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """Calls, latency, cost and escalations per model (cascade tier) for the run report"""
+        with self._stats_lock:
+            models = {
+                model: dict(values, latencies=list(values["latencies"]), escalated=dict(values["escalated"]))
+                for model, values in self.model_stats.items()
+            }
+        
+        tiers = {}
+        for model, values in models.items():
+            latencies = values.pop("latencies")
+            escalated = sum(values["escalated"].values())
+            values["tier"] = self.cascade_models.index(model) + 1 if model in self.cascade_models else None
+            values["cost_usd"] = round(values["cost_usd"], 6)
+            values["latency_p50"] = round(percentile(latencies, 50), 3) if latencies else None
+            values["latency_p95"] = round(percentile(latencies, 95), 3) if latencies else None
+            answered = values["accepted"] + values["failed"] + escalated
+            values["escalation_rate"] = round(escalated / answered, 3) if answered else None
+            tiers[model] = values
+        
+        return {
+            "models": self.cascade_models,
+            "tiers": tiers,
+            "total_cost_usd": round(sum(values["cost_usd"] for values in tiers.values()), 6)
+        }
+
+    def log_cascade_stats(self) -> None:
+        stats = self.get_cascade_stats()
+        for model, values in stats["tiers"].items():
+            logging.info(
+                f"Model {model}: {values['calls']} calls, {values['accepted']} answers accepted, "
+                f"{sum(values['escalated'].values())} escalated, p50 latency {values['latency_p50']}s, "
+                f"${values['cost_usd']:.4f}"
+            )
+
+    def _generation_params(self) -> Dict[str, Any]:
+        """Parameters that change the model's answer, for cache keys"""
+        return {
+            "temperature": config.TEMPERATURE,
+            "max_tokens": config.MAX_TOKENS,
+        }
+
+    def _cache_key(self, messages: list, models: Optional[List[str]] = None) -> str:
+        params = self._generation_params()
+        if self.structured_output:
+            params["response_format"] = "json_schema"  # The schema itself is derived from the prompt
+        return LLMResponseCache.make_key(
+            [(message.type, message.content) for message in messages],
+            self._model_key(models),
+            params
+        )
+
+    def _model_key(self, models: Optional[List[str]] = None) -> str:
+        """The model part of cache keys; a cascade's answers depend on all its models and escalation rules"""
+        models = models or self.cascade_models
+        if len(models) == 1:
+            return models[0]
+        return (
+            f"cascade:{'>'.join(models)}"
+            f"|required:{','.join(config.LLM_CASCADE_REQUIRED_FIELDS)}"
+            f"|escalate:{','.join(config.LLM_CASCADE_ESCALATE_TIERS)}"
+        )
+
+    def escalation_reason(self, parsed_response: Dict[str, Any],
+                          fields: Optional[Collection[str]] = None) -> Optional[Tuple[str, str]]:
+        """
+        Why an answer from a cheaper cascade model should be passed up, or None to accept it
+        
+        Args:
+            parsed_response: The model's answer
+            fields: Flattened fields the prompt asks for (see template_fields); required
+                fields outside it are not expected in the answer
+        
+        Returns:
+            ("missing_fields" or "borderline_tier", detail for the log)
+        """
+        flattened = flatten_analysis(parsed_response)
+        missing = [
+            field for field in config.LLM_CASCADE_REQUIRED_FIELDS
+            if (not fields or field in fields) and (flattened.get(field) is None or flattened.get(field) == "")
+        ]
+        if missing:
+            return "missing_fields", f"missing {', '.join(missing)}"
         
+        tier = str(flattened.get("fit_tier")).strip().upper()
+        if tier in config.LLM_CASCADE_ESCALATE_TIERS:
+            return "borderline_tier", f"borderline fit tier {tier}"
         return None
 
-    def analyze_job_ad(self, content: str, master_prompt: str, url_id: str, force: bool = False) -> Optional[Dict[str, Any]]:
+    def _request_kwargs(self, master_prompt: str) -> Dict[str, Any]:
+        """Extra request parameters: the strict response schema in structured-output mode"""
+        if not self.structured_output:
+            return {}
+        response_format = build_response_format(master_prompt)
+        return {"response_format": response_format} if response_format else {}
+
+    def _record_parse(self, structured: bool, method: Optional[str]) -> None:
+        mode = "structured" if structured else "prompt_only"
+        with self._stats_lock:
+            stats = self.parse_stats[mode]
+            stats["responses"] += 1
+            stats["methods"][method or "failed"] = stats["methods"].get(method or "failed", 0) + 1
+
+    def get_parse_stats(self) -> Dict[str, Any]:
+        """Parse-failure rate per mode (schema-constrained vs prompt-only) for the run report"""
+        with self._stats_lock:
+            stats = {mode: dict(values, methods=dict(values["methods"])) for mode, values in self.parse_stats.items()}
+        for values in stats.values():
+            failures = values["methods"].get("failed", 0)
+            values["failure_rate"] = round(failures / values["responses"], 3) if values["responses"] else None
+        return stats
+
+    def analysis_signature(self, master_prompt: str, models: Optional[List[str]] = None) -> str:
+        """
+        Hash of every input except the job ad itself
+        
+        Stored with per-URL results so a cached result is only reused while the
+        prompt, model and generation parameters are unchanged.
+        """
+        phases = self._phase_prompts(master_prompt)
+        if phases:
+            return LLMResponseCache.make_key(
+                [(phase, self._cache_key(self._build_messages("", phases[phase]), models)) for phase in ("extraction", "scoring")],
+                self._model_key(models),
+                {"analysis_mode": "two_phase"}
+            )
+        return self._cache_key(self._build_messages("", master_prompt), models)
+
+    def _phase_prompts(self, master_prompt: str) -> Optional[Dict[str, Any]]:
+        """Extraction/scoring prompts in two-phase mode, None in single mode or if the prompt can't be split"""
+        if self.analysis_mode != "two_phase":
+            return None
+        phases = build_phase_prompts(master_prompt)
+        if phases is None and not self._warned_unsplittable:
+            self._warned_unsplittable = True
+            logging.warning(
+                f"Master prompt has no JSON template with both {config.EXTRACTION_SECTIONS} and other sections; "
+                f"analyzing in a single call"
+            )
+        return phases
+
+    def _bulk_prompt(self, master_prompt: str) -> Tuple[str, str]:
+        """
+        Prompt that batch and pack mode precompute answers for, and the suffix of its per-URL response ids
+        
+        In two-phase mode that is the extraction, which is the part worth
+        sending in bulk: it is the larger call and doesn't depend on the profile.
+        """
+        phases = self._phase_prompts(master_prompt)
+        if phases:
+            return phases["extraction"], "_extraction"
+        return master_prompt, ""
+
+    def _save_url_response(self, url_id: str, cache_key: str, record: Dict[str, Any]) -> None:
+        """Keep the per-URL debug copy of a response in sync with the cache"""
+        existing = self.store.get_json("llm_response", url_id)
+        if existing and existing.get("cache_key") == cache_key:
+            return
+        self.store.put_json("llm_response", url_id, dict(record, url_id=url_id, cache_key=cache_key))
+
+    def analyze_job_ad(self, content: str, master_prompt: str, url_id: str, force: bool = False,
+                       on_field: Optional[Callable[[str, Any], None]] = None,
+                       models: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Send job ad content to LLM for analysis with caching support
+        
+        In streaming mode, on_field(key, value) is called for each top-level
+        field of the answer as soon as it has arrived. In two-phase mode the
+        ad is analyzed in two calls, see _analyze_two_phase(). models replaces
+        the cascade for this ad (e.g. only the cheapest model); its answers
+        are cached separately.
+        """
+        phases = self._phase_prompts(master_prompt)
+        if phases:
+            return self._analyze_two_phase(content, phases, url_id, force, on_field, models)
+        return self._analyze_call(content, master_prompt, url_id, force, on_field, models=models)
+
+    def _analyze_two_phase(self, content: str, phases: Dict[str, Any], url_id: str, force: bool = False,
+                           on_field: Optional[Callable[[str, Any], None]] = None,
+                           models: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
+        Analyze an ad with an extraction call and a scoring call, and merge the answers
+        
+        The extraction prompt doesn't contain the profile, so its cached answer
+        is reused until the ad or the template changes. Scoring is sent the
+        extracted facts instead of the ad, so its cache key covers exactly the
+        profile and the extraction, and a profile edit only re-runs this
+        smaller call.
+        """
+        extraction = self._analyze_call(content, phases["extraction"], f"{url_id}_extraction", force, on_field,
+                                        "extraction", models)
+        if not extraction:
+            return None
+        
+        facts = json.dumps(extraction, ensure_ascii=False, indent=2)
+        scoring = self._analyze_call(facts, phases["scoring"], f"{url_id}_scoring", force, on_field, "scoring", models)
+        if not scoring:
+            return None
+        
+        merged = dict(extraction, **scoring)
+        order = phases["sections"]
+        return dict(sorted(merged.items(), key=lambda item: order.index(item[0]) if item[0] in order else len(order)))
+
+    def _record_phase(self, phase: Optional[str], outcome: str) -> None:
+        if phase is None:
+            return
+        with self._stats_lock:
+            self.phase_stats[phase][outcome] += 1
+
+    def get_phase_stats(self) -> Optional[Dict[str, Any]]:
+        """Cache hits and requests per phase in two-phase mode, for the run report"""
+        if self.analysis_mode != "two_phase":
+            return None
+        with self._stats_lock:
+            return {phase: dict(values) for phase, values in self.phase_stats.items()}
+
+    def _analyze_call(self, content: str, master_prompt: str, url_id: str, force: bool = False,
+                      on_field: Optional[Callable[[str, Any], None]] = None,
+                      phase: Optional[str] = None, models: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """One cached LLM analysis of content with master_prompt (a whole analysis or one phase)"""
+        
+        # Create messages
+        messages = self._build_messages(content, master_prompt)
+        cache_key = self._cache_key(messages, models)
+        
+        # force re-sends each distinct request once per run, so an extraction shared
+        # by several profiles (or identical ads) isn't paid for again
+        if force:
+            with self._stats_lock:
+                force = cache_key not in self._forced_keys
+                self._forced_keys.add(cache_key)
         
         # Check cache first (unless force=True)
         if not force:
-            cached_response = self._check_cached_llm_response(url_id)
-            if cached_response:
+            cached_record = self._check_cached_llm_response(cache_key)
+            if cached_record is None and models is not None:
+                # Pack, batch and full-cascade answers are keyed by the whole cascade; one is as good as a downgraded answer
+                full_cache_key = self._cache_key(messages)
+                cached_record = self._check_cached_llm_response(full_cache_key)
+                if cached_record:
+                    cache_key = full_cache_key
+            if cached_record:
                 logging.info(f"Using cached LLM response for {url_id}")
-                return cached_response
-            
-        try:
-            # Prepare the full prompt
-            full_prompt = f"{master_prompt}\n\nJob Advertisement Content:\n{content}"
-            
-            logging.debug(f"Sending request to LLM for {url_id}")
-            
-            # Create messages
-            messages = [
-                SystemMessage(content="You are a job advertisement analyzer. Extract structured information from job postings and return valid JSON only."),
-                HumanMessage(content=full_prompt)
-            ]
+                self._save_url_response(url_id, cache_key, cached_record)
+                self._record_phase(phase, "cache_hits")
+                return cached_record["parsed_response"]
             
-            # Make API request
-            response = self.client.invoke(messages)
-            
-            # Extract response content
-            response_text = response.content.strip()
-            # print("raw response: " + response_text)
-            
-            # Log the raw response for debugging
-            if config.VERBOSE_LOGGING:
-                logging.debug(f"Raw LLM response for {url_id}: {response_text[:500]}...")
-            
-            # Parse JSON response
-            parsed_response = self._parse_json_response(response_text, url_id)
-            
-            if parsed_response:
-                # Save individual response for debugging
-                response_file = config.PROCESSED_DATA_DIR / f"{url_id}_llm_response.json"
-                debug_data = {
-                    "url_id": url_id,
-                    "model": self.model,
-                    "prompt_length": len(full_prompt),
-                    "response_length": len(response_text),
-                    "raw_response": response_text,
-                    "parsed_response": parsed_response,
-                    "usage": getattr(response, 'usage_metadata', None)  # LangChain usage info if available
-                }
-                save_json_file(debug_data, response_file)
-                
-                logging.info(f"Successfully analyzed {url_id}")
-                return parsed_response
+        # A prompt that only gained fields needs just those from the last answer for this ad
+        if config.LLM_DELTA_ANALYSIS and not force and models is None:
+            delta_response = self._analyze_delta(content, master_prompt, url_id, phase)
+            if delta_response is not None:
+                return delta_response
+        
+        logging.debug(f"Sending request to LLM for {url_id}")
+        self._record_phase(phase, "requests")
+        with self.ledger.context(stage=phase or "analysis"):
+            outcome = self._run_cascade(messages, master_prompt, url_id, on_field, models)
+        if outcome is None:
+            logging.error(f"Failed to parse JSON response for {url_id}")
+            self._record_phase(phase, "failed")
+            return None
+        completion, parsed_response, parse_method, structured, model, escalations = outcome
+        
+        # Fill in missing or mistyped fields with a short follow-up instead of accepting them or redoing it all
+        reask = None
+        if config.LLM_REASK_INVALID_FIELDS:
+            parsed_response, reask = self._reask_invalid_fields(content, master_prompt, parsed_response, url_id, model)
+        
+        # Structured output may have been switched off for this run during the call
+        cache_key = self._cache_key(messages, models)
+        response_text = completion["text"]
+        
+        # Cache the response, and save an individual copy for debugging
+        debug_data = {
+            "url_id": url_id,
+            "phase": phase,
+            "model": model,
+            "escalations": escalations,
+            "prompt_length": sum(len(message.content) for message in messages),
+            "response_length": len(response_text),
+            "raw_response": response_text,
+            "parsed_response": parsed_response,
+            "usage": completion["usage"],  # LangChain usage info if available
+            "cached_input_tokens": self._cached_tokens(completion["usage"]),
+            "latency_seconds": round(completion["latency"], 3),
+            "ttft_seconds": round(completion["ttft"], 3) if completion["ttft"] is not None else None,
+            "streamed": completion["streamed"],
+            "structured_output": structured,
+            "parse_method": parse_method,
+            "reask": reask,
+            "template_shape": leaf_paths(get_validator(master_prompt).template),
+            "content_sha256": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            "profile_hash": profile_hash(master_prompt) if phase != "extraction" else None
+        }
+        self.cache.put(cache_key, debug_data)
+        self._save_url_response(url_id, cache_key, debug_data)
+        
+        logging.info(f"Successfully analyzed {url_id}")
+        return parsed_response
+    
+    def _run_cascade(self, messages: list, master_prompt: str, url_id: str,
+                     on_field: Optional[Callable[[str, Any], None]] = None,
+                     models: Optional[List[str]] = None):
+        """
+        Ask the cascade's models in order until one gives an acceptable answer
+        
+        With a single model this is one request, retried per RetryPolicy. In a
+        cascade, an answer from any model but the last is passed up when it
+        can't be parsed (without spending parse retries on it) or when
+        escalation_reason() objects to it; the last model's answer is final.
+        
+        Returns:
+            (completion, parsed_response, parse_method, structured, model, escalations),
+            or None if no model produced parseable JSON
+        """
+        models = models or self.cascade_models
+        escalations = []
+        for position, model in enumerate(models):
+            last = position == len(models) - 1
+            label = f"{url_id} ({model})" if len(models) > 1 else url_id
+            try:
+                # Transient errors and unparseable answers are retried per RetryPolicy
+                completion, parsed_response, parse_method, structured = self.retry_policy.call(
+                    lambda: self._request_analysis(messages, master_prompt, url_id, on_field, model),
+                    label,
+                    no_retry=() if last else ("parse",)
+                )
+            except ResponseParseError:
+                if last:
+                    self._record_outcome(model, "failed")
+                    return None
+                escalation = ("parse_failure", "no valid JSON")
             else:
-                logging.error(f"Failed to parse JSON response for {url_id}")
-                return None
-                
+                escalation = None if last else self.escalation_reason(parsed_response, template_fields(master_prompt))
+                if escalation is None:
+                    self._record_outcome(model, "accepted")
+                    return completion, parsed_response, parse_method, structured, model, escalations
+            
+            self._record_outcome(model, escalation[0])
+            logging.info(f"Escalating {url_id} from {model} to {models[position + 1]}: {escalation[1]}")
+            escalations.append({"model": model, "reason": escalation[0]})
+        return None
+    
+    REASK_INSTRUCTIONS = (
+        "Your previous answer for the job advertisement below left some fields missing or gave them the wrong type. "
+        "Return a JSON object containing only the fields shown, nested exactly as shown, with values of the "
+        "type shown. Use null only if the advertisement really doesn't say. "
+        "Do not add any text outside this JSON object."
+    )
+    
+    DELTA_INSTRUCTIONS = (
+        "The JSON format above has gained the fields shown below since you analyzed the job advertisement "
+        "that follows. Return a JSON object containing only these new fields, nested exactly as shown. "
+        "Do not add any text outside this JSON object."
+    )
+    
+    def _request_fields(self, content: str, master_prompt: str, parsed_response: Dict[str, Any],
+                        paths: List[Tuple[str, ...]], instructions: str, label: str,
+                        model: Optional[str] = None, notes: Optional[str] = None,
+                        stage: str = "reask") -> Tuple[Dict[str, Any], Dict[str, Any], Any]:
+        """
+        Ask for some fields of an analysis in a short follow-up and merge them into a copy of it
+        
+        The follow-up keeps the master prompt as its system message (so the
+        provider's prompt cache still applies) and sends the requested part of
+        the template, the answer so far and the ad text. Only the requested
+        fields are taken from the reply.
+        
+        Returns:
+            (merged answer, the fields the reply supplied, usage of the follow-up)
+        
+        The call is booked in the run ledger under stage.
+        """
+        template = get_validator(master_prompt).template or {}
+        requested = {}
+        for path in paths:
+            set_path(requested, path, get_path(template, path)[1])
+        prompt = (
+            f"{instructions}\n\n"
+            f"Fields to return:\n{json.dumps(requested, indent=2, ensure_ascii=False)}\n\n"
+            + (f"{notes}\n\n" if notes else "")
+            + f"Previous answer:\n{json.dumps(parsed_response, ensure_ascii=False)}\n\n"
+            f"Job Advertisement Content:\n{content}"
+        )
+        messages = [SystemMessage(content=self._system_prompt(master_prompt)), HumanMessage(content=prompt)]
+        
+        answer, usage = None, None
+        try:
+            with self.ledger.context(stage=stage):
+                response, _ = self.retry_policy.call(lambda: self._invoke(messages, model), label)
+            usage = getattr(response, 'usage_metadata', None)
+            answer = self._parse_json_response(response.content.strip(), label.replace(" ", "_"))
         except Exception as e:
-            logging.error(f"Error analyzing {url_id}: {e}")
-            raise  # Let tenacity handle the retry
+            logging.warning(f"Follow-up request {label} failed: {e}")
+        
+        merged, supplied = copy.deepcopy(parsed_response), {}
+        for path in paths:
+            present, value = get_path(answer, path)
+            if present:
+                set_path(merged, path, value)
+                set_path(supplied, path, value)
+        return merged, supplied, usage
     
-    def _parse_json_response(self, response_text: str, url_id: str) -> Optional[Dict[str, Any]]:
-        """Parse JSON from LLM response with improved extraction"""
+    def _reask_invalid_fields(self, content: str, master_prompt: str, parsed_response: Dict[str, Any],
+                              url_id: str, model: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Ask again for just the fields the validator rejects, and merge the answer in
+        
+        Returns:
+            (answer with whatever the follow-up fixed, re-ask details for the cache record or None)
+        """
+        validator = get_validator(master_prompt)
+        issues = [issue for issue in validator.validate(parsed_response) if issue.path]
+        if not issues:
+            return parsed_response, None
+        
+        problems = "\n".join(
+            f"- {'.'.join(issue.path)}: {issue.problem.replace('_', ' ')} ({issue.detail})" for issue in issues
+        )
+        logging.info(f"Asking again for {len(issues)} invalid field(s) of {url_id}: {', '.join(i.field for i in issues)}")
+        merged, supplied, usage = self._request_fields(
+            content, master_prompt, parsed_response, [issue.path for issue in issues],
+            self.REASK_INSTRUCTIONS, f"{url_id} (re-ask)", model, notes=f"What was wrong:\n{problems}"
+        )
+        
+        remaining = {issue.field for issue in validator.validate(merged) if issue.path}
+        fixed = [issue.field for issue in issues if issue.field not in remaining]
+        with self._stats_lock:
+            self.reask_stats["reasks"] += 1
+            self.reask_stats["fields_requested"] += len(issues)
+            self.reask_stats["fields_fixed"] += len(fixed)
+            self.reask_stats["still_invalid"] += len(issues) - len(fixed)
+        if remaining:
+            logging.warning(f"Fields of {url_id} still invalid after the follow-up: {', '.join(sorted(remaining))}")
+        
+        return merged, {
+            "fields": [issue.field for issue in issues],
+            "fixed": fixed,
+            "answer": supplied,  # Merged over the parsed raw_response
+            "usage": usage
+        }
+    
+    def get_reask_stats(self) -> Dict[str, Any]:
+        """Follow-up requests for invalid fields, for the run report"""
+        with self._stats_lock:
+            return dict(self.reask_stats)
+    
+    def _delta_fields(self, content: str, master_prompt: str, previous: Optional[Dict[str, Any]],
+                      phase: Optional[str] = None) -> List[Tuple[str, ...]]:
+        """
+        Template fields the previous answer for an ad was never asked for
+        
+        Empty unless the previous answer is for the same ad text and (outside
+        the extraction phase) the same candidate profile, and the prompt's
+        JSON template has gained fields while keeping some of the old ones.
+        Answers stored before the template shape was recorded are compared by
+        the keys they contain.
+        """
+        if not previous or not isinstance(previous.get("parsed_response"), dict):
+            return []
+        content_hash = previous.get("content_sha256")
+        if content_hash and content_hash != hashlib.sha256(content.encode("utf-8")).hexdigest():
+            return []
+        if phase != "extraction" and previous.get("profile_hash") not in (None, profile_hash(master_prompt)):
+            return []
+        
+        current = leaf_paths(get_validator(master_prompt).template)
+        old_shape = previous.get("template_shape")
+        old = {tuple(path) for path in old_shape} if old_shape else set(leaf_paths(previous["parsed_response"]))
+        new = [path for path in current if path not in old]
+        if len(new) == len(current):
+            return []  # Nothing in common: a different prompt, not an extended one
+        return new
+    
+    def _analyze_delta(self, content: str, master_prompt: str, url_id: str,
+                       phase: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Extend the last answer for an ad with only the fields the prompt has gained
+        
+        The merged answer is cached under the current prompt's key, so the ad
+        isn't analyzed again in full.
+        
+        Returns:
+            The merged answer, or None if the ad needs a full analysis
+        """
+        previous = self.store.get_json("llm_response", url_id)
+        new_paths = self._delta_fields(content, master_prompt, previous, phase)
+        if not new_paths:
+            return None
+        
+        model = previous.get("model") if previous.get("model") in self.cascade_models else self.cascade_models[-1]
+        logging.info(f"Requesting {len(new_paths)} new field(s) for {url_id} instead of a full analysis")
+        self._record_phase(phase, "requests")
+        merged, supplied, usage = self._request_fields(
+            content, master_prompt, previous["parsed_response"], new_paths,
+            self.DELTA_INSTRUCTIONS, f"{url_id} (new fields)", model, stage="delta"
+        )
+        filled = len(leaf_paths(supplied))
+        with self._stats_lock:
+            self.delta_stats["requests"] += 1
+            self.delta_stats["fields_requested"] += len(new_paths)
+            self.delta_stats["fields_filled"] += filled
+            self.delta_stats["analyzed" if filled else "failed"] += 1
+        if not filled:
+            logging.warning(f"Follow-up for the new fields of {url_id} returned none of them")
+            return None
+        
+        cache_key = self._cache_key(self._build_messages(content, master_prompt))
+        record = dict(
+            previous,
+            parsed_response=merged,
+            template_shape=leaf_paths(get_validator(master_prompt).template),
+            content_sha256=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            profile_hash=profile_hash(master_prompt) if phase != "extraction" else None,
+            # Follow-up answers merged over raw_response in this order (see also "reask")
+            delta=(previous.get("delta") or []) + [{
+                "based_on": previous.get("cache_key"),
+                "fields": [".".join(path) for path in new_paths],
+                "answer": supplied,
+                "usage": usage
+            }]
+        )
+        record.pop("cache_key", None)
+        self.cache.put(cache_key, record)
+        self._save_url_response(url_id, cache_key, record)
+        return merged
+    
+    def analyze_delta(self, items: List[Dict[str, str]], master_prompt: str) -> Dict[str, Any]:
+        """
+        Bring cached answers up to a prompt that has gained fields, many ads at once
+        
+        Runs before packing or batching, so an ad whose last answer only lacks
+        the new fields gets a short follow-up instead of a full analysis in a
+        pack or batch. Items are as for analyze_packed().
+        
+        Returns:
+            Counts for the processing report
+        """
+        master_prompt, response_suffix = self._bulk_prompt(master_prompt)
+        phase = "extraction" if response_suffix else None
+        
+        def run(item):
+            if self.cache.get(self._cache_key(self._build_messages(item["content"], master_prompt))):
+                return False
+            return self._analyze_delta(item["content"], master_prompt, item["url_id"] + response_suffix, phase) is not None
+        
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as pool:
+            extended = sum(pool.map(run, items))
+        
+        logging.info(f"Extended {extended}/{len(items)} cached answers with the prompt's new fields")
+        return {"ads": len(items), "extended": extended}
+    
+    def get_delta_stats(self) -> Dict[str, Any]:
+        """Follow-up requests for fields the prompt gained, for the run report"""
+        with self._stats_lock:
+            return dict(self.delta_stats)
+    
+    def _request_analysis(self, messages: list, master_prompt: str, url_id: str,
+                          on_field: Optional[Callable[[str, Any], None]] = None, model: Optional[str] = None):
+        """
+        One attempt at analyzing an ad: call the model and parse its answer
+        
+        Returns:
+            (completion, parsed_response, parse_method, structured)
+        
+        Raises:
+            ResponseParseError: If no JSON could be extracted, so the attempt is retried
+        """
+        request_kwargs = self._request_kwargs(master_prompt)
+        structured = bool(request_kwargs)
+        try:
+            completion = self._complete(messages, url_id, on_field, model, **request_kwargs)
+        except BadRequestError as e:
+            if not structured:
+                raise
+            # Endpoint doesn't support response schemas: fall back to prompt-only JSON for this run
+            logging.warning(f"Structured output rejected ({e}); falling back to prompt-only JSON")
+            self.structured_output = False
+            structured = False
+            completion = self._complete(messages, url_id, on_field, model)
+        
+        # Extract response content
+        response_text = completion["text"]
+        # print("raw response: " + response_text)
+        
+        # Log the raw response for debugging
+        if config.VERBOSE_LOGGING:
+            logging.debug(f"Raw LLM response for {url_id}: {response_text[:500]}...")
+        
+        # Parse JSON response (schema-constrained output parses directly; the regex strategies are the fallback)
+        parsed_response, parse_method = self._parse_json_response_with_method(response_text, url_id)
+        if structured and parse_method == "json":
+            parse_method = "structured"
+        self._record_parse(structured, parse_method)
+        
+        if not parsed_response:
+            raise ResponseParseError(f"No valid JSON in response for {url_id}")
+        return completion, parsed_response, parse_method, structured
+    
+    PACK_INSTRUCTIONS = (
+        "Several job advertisements follow, each introduced by a line with its id. "
+        "Analyze each one independently, exactly as described above. Return a single JSON object "
+        "whose keys are the ad ids and whose values are the JSON object described above for that ad. "
+        "Do not add any text outside this JSON object."
+    )
+    
+    def pack_items(self, items: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+        """
+        Group ads into packs that fit LLM_PACK_TOKEN_BUDGET (first-fit decreasing)
+        
+        Ads over LLM_PACK_MAX_AD_TOKENS, and ads left alone in a pack, come back as
+        single-item packs.
+        """
+        sized = sorted(
+            ((estimate_tokens(item["content"]), item) for item in items),
+            key=lambda sized_item: sized_item[0],
+            reverse=True
+        )
+        
+        packs = []  # [tokens, [items]]
+        singles = []
+        for tokens, item in sized:
+            if tokens > config.LLM_PACK_MAX_AD_TOKENS:
+                singles.append([item])
+                continue
+            for pack in packs:
+                if pack[0] + tokens <= config.LLM_PACK_TOKEN_BUDGET and len(pack[1]) < config.LLM_PACK_MAX_ADS:
+                    pack[0] += tokens
+                    pack[1].append(item)
+                    break
+            else:
+                packs.append([tokens, [item]])
+        
+        return [pack[1] for pack in packs] + singles
+    
+    def analyze_packed(self, items: List[Dict[str, str]], master_prompt: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Analyze short job ads several per request and store the answers in the LLM cache
+        
+        Each answer is cached under the key a single-ad request would use, so
+        analyze_job_ad() picks it up afterwards. A pack whose response can't be
+        parsed is split in half and retried; ads missing from a response are left
+        for analyze_job_ad() to request on their own.
+        
+        Args:
+            items: Dicts with "url_id" and "content" (the text analyze_job_ad would receive)
+            master_prompt: Master prompt with instructions
+            force: Re-analyze ads that are already cached
+        
+        Returns:
+            Counts for the processing report
+        """
+        master_prompt, response_suffix = self._bulk_prompt(master_prompt)
+        pending = {}  # cache key -> item, so identical ads are only sent once
+        for item in items:
+            cache_key = self._cache_key(self._build_messages(item["content"], master_prompt))
+            if not force and cache_key not in pending and self.cache.get(cache_key):
+                continue
+            pending.setdefault(cache_key, dict(item, cache_key=cache_key, url_ids=[]))["url_ids"].append(
+                item["url_id"] + response_suffix
+            )
+        
+        packs = [pack for pack in self.pack_items(list(pending.values())) if len(pack) > 1]
+        stats = {"ads": len(pending), "packs": len(packs), "requests": 0, "analyzed": 0, "splits": 0}
+        lock = threading.Lock()
+        
+        def run(pack):
+            result = self._analyze_pack(pack, master_prompt)
+            with lock:
+                for key in ("requests", "analyzed", "splits"):
+                    stats[key] += result[key]
+        
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as pool:
+            list(pool.map(run, packs))
+        
+        stats["left_for_single_requests"] = stats["ads"] - stats["analyzed"]
+        logging.info(
+            f"Packed {stats['ads']} ads into {stats['packs']} packs ({stats['requests']} requests): "
+            f"{stats['analyzed']} analyzed, {stats['left_for_single_requests']} left for single requests"
+        )
+        return stats
+    
+    def _build_packed_messages(self, pack: List[Dict[str, Any]], master_prompt: str) -> Tuple[list, Dict[str, Dict[str, Any]]]:
+        """Messages for a packed request, and the ad id -> item mapping"""
+        ads = {f"ad_{i}": item for i, item in enumerate(pack, 1)}
+        sections = [f"=== {ad_id} ===\n{item['content']}" for ad_id, item in ads.items()]
+        packed_prompt = f"{self.PACK_INSTRUCTIONS}\n\nJob Advertisements:\n\n" + "\n\n".join(sections)
+        return [SystemMessage(content=self._system_prompt(master_prompt)), HumanMessage(content=packed_prompt)], ads
+    
+    def _analyze_pack(self, pack: List[Dict[str, Any]], master_prompt: str) -> Dict[str, int]:
+        """Send one pack, cache the answers it contains, and split it if the response is unusable"""
+        counts = {"requests": 1, "analyzed": 0, "splits": 0}
+        label = f"pack_{pack[0]['url_id']}_{len(pack)}"
+        messages, ads = self._build_packed_messages(pack, master_prompt)
+        
         try:
-            # Clean the response text
-            response_text = response_text.strip()
+            with self.ledger.context(stage="pack"):
+                response, latency = self.retry_policy.call(
+                    lambda: self._invoke(messages, self.entry_model, max_tokens=config.MAX_TOKENS * len(pack)), label
+                )
+            response_text = response.content.strip()
+            answers = self._parse_packed_response(response_text, label)
+        except Exception as e:
+            logging.error(f"Error analyzing {label}: {e}")
+            return counts  # Retries are used up; single requests get their own
+        
+        if answers is None:
+            if len(pack) <= 2:
+                return counts  # Halves would be single ads; analyze_job_ad handles those
+            middle = len(pack) // 2
+            logging.warning(f"Could not parse {label}, splitting it into two packs")
+            counts["splits"] += 1
+            for half in (pack[:middle], pack[middle:]):
+                if len(half) < 2:
+                    continue
+                for key, value in self._analyze_pack(half, master_prompt).items():
+                    counts[key] += value
+            return counts
+        
+        usage = getattr(response, 'usage_metadata', None)
+        for ad_id, item in ads.items():
+            answer = answers.get(ad_id)
+            if not isinstance(answer, dict) or not answer:
+                logging.warning(f"{label} has no usable answer for {item['url_id']}")
+                continue
+            escalation = self.escalation_reason(answer, template_fields(master_prompt)) if self.is_cascade else None
+            if escalation:
+                self._record_outcome(self.entry_model, escalation[0])
+                continue  # analyze_job_ad() runs the cascade for it
             
-            # Strategy 1: Try to parse the whole response
+            record = {
+                "url_id": item["url_id"],
+                "model": self.entry_model,
+                "prompt_length": sum(len(message.content) for message in messages),
+                "response_length": len(response_text),
+                "raw_response": json.dumps(answer, ensure_ascii=False),
+                "parsed_response": answer,
+                "usage": None,  # Usage is only known for the whole pack
+                "pack": {"label": label, "size": len(pack), "usage": usage, "latency_seconds": round(latency, 3)}
+            }
+            self.cache.put(item["cache_key"], record)
+            for url_id in item["url_ids"]:
+                self._save_url_response(url_id, item["cache_key"], record)
+            counts["analyzed"] += 1
+        
+        logging.info(f"Analyzed {counts['analyzed']}/{len(pack)} ads in {label}")
+        return counts
+    
+    def _parse_packed_response(self, response_text: str, label: str) -> Optional[Dict[str, Any]]:
+        """Parse a packed response into {ad_id: analysis}; accepts an object keyed by id or an array"""
+        array_start = response_text.find("[")
+        object_start = response_text.find("{")
+        if array_start != -1 and (object_start == -1 or array_start < object_start):
+            # [{"ad_id": "ad_1", ...}, ...]
             try:
-                parsed = json.loads(response_text)
-                logging.debug(f"Parsed entire response as JSON for {url_id}")
-                return self._clean_parsed_data(parsed)
+                rows = json.loads(response_text[array_start:response_text.rfind("]") + 1])
+                answers = {
+                    str(row["ad_id"]): {key: value for key, value in row.items() if key != "ad_id"} for row in rows
+                    if isinstance(row, dict) and "ad_id" in row
+                }
+                if answers:
+                    return self._clean_parsed_data(answers)
             except json.JSONDecodeError:
                 pass
-            
-            # Strategy 2: Find JSON block within the response
-            json_patterns = [
-                (r'\{.*\}', 0),  # Find outermost braces
-                (r'```json\s*(\{.*?\})\s*```', 1),  # JSON code block
-                (r'```\s*(\{.*?\})\s*```', 1),  # Generic code block
-            ]
-            
-            for pattern, group in json_patterns:
-                import re
-                match = re.search(pattern, response_text, re.DOTALL)
-                if match:
-                    json_text = match.group(group) if group else match.group(0)
-                    try:
-                        parsed = json.loads(json_text)
-                        logging.debug(f"Extracted JSON using pattern for {url_id}")
-                        return self._clean_parsed_data(parsed)
-                    except json.JSONDecodeError:
-                        continue
-            
-            # Strategy 3: Manual brace matching for nested JSON
-            json_start = response_text.find('{')
-            if json_start != -1:
-                brace_count = 0
-                json_end = json_start
-                
-                for i, char in enumerate(response_text[json_start:], json_start):
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            json_end = i
-                            break
-                
-                if brace_count == 0:  # Found matching braces
-                    json_text = response_text[json_start:json_end + 1]
-                    try:
-                        parsed = json.loads(json_text)
-                        logging.debug(f"Extracted JSON using brace matching for {url_id}")
-                        return self._clean_parsed_data(parsed)
-                    except json.JSONDecodeError:
-                        pass
-            
-            logging.error(f"No valid JSON found in response for {url_id}")
-            logging.debug(f"Response preview: {response_text[:500]}...")
-            
-            # Save the problematic response for debugging
-            debug_file = config.PROCESSED_DATA_DIR / f"{url_id}_failed_response.txt"
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(f"Failed to parse JSON for {url_id}\n")
-                f.write("="*50 + "\n")
-                f.write(response_text)
-            
-            return None
-            
-        except Exception as e:
-            logging.error(f"Unexpected error parsing response for {url_id}: {e}")
+        
+        parsed = self._parse_json_response(response_text, label)
+        if not parsed or not any(key.startswith("ad_") for key in parsed):
             return None
+        return parsed
+    
+    BATCH_ENDPOINT = "/v1/chat/completions"
+    BATCH_TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
     
-    def _fix_common_json_issues(self, json_text: str) -> str:
-        """Attempt to fix common JSON formatting issues"""
-        import re
+    def _get_openai_client(self) -> OpenAI:
+        """Plain OpenAI client for the Files and Batches APIs (LangChain doesn't wrap them)"""
+        if self._openai_client is None:
+            self._openai_client = OpenAI(
+                api_key=config.LLM_API_KEY,
+                base_url=config.LLM_BASE_URL,
+                timeout=config.TIMEOUT
+            )
+        return self._openai_client
+    
+    def _request_body(self, messages: list) -> Dict[str, Any]:
+        """Chat completions request body for the same call analyze_job_ad makes"""
+        roles = {"system": "system", "human": "user", "ai": "assistant"}
+        return {
+            "model": self.entry_model,
+            "messages": [{"role": roles[message.type], "content": message.content} for message in messages],
+            **self._generation_params()
+        }
+    
+    def run_batch(self, items: List[Dict[str, str]], master_prompt: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Analyze job ads through the Batch API and store the answers in the LLM cache
+        
+        Identical requests are sent once. Afterwards analyze_job_ad() finds every
+        successful answer in the cache, and anything the batch failed on is
+        requested normally. Batches left unfinished by an earlier run are
+        collected first.
+        
+        Args:
+            items: Dicts with "url_id" and "content" (the text analyze_job_ad would receive)
+            master_prompt: Master prompt with instructions
+            force: Resubmit requests that are already cached
         
-        # Remove trailing commas
-        json_text = re.sub(r',(\s*[}\]])', r'\1', json_text)
+        Returns:
+            Counts for the processing report
+        """
+        stats = {"batches": 0, "requests": 0, "succeeded": 0, "failed": 0, "unfinished": 0}
+        
+        for manifest_file in sorted(config.BATCH_DIR.glob("*_manifest.json")):
+            manifest = load_json_file(manifest_file)
+            if manifest.get("status") == "submitted":
+                logging.info(f"Resuming batch {manifest['batch_id']} from an earlier run")
+                self._collect_batch(manifest_file, manifest, stats)
         
-        # Fix unquoted keys (basic attempt)
-        json_text = re.sub(r'(\w+):', r'"\1":', json_text)
+        master_prompt, response_suffix = self._bulk_prompt(master_prompt)
+        pending = {}  # cache key -> {"messages": [...], "url_ids": [...]}
+        for item in items:
+            messages = self._build_messages(item["content"], master_prompt)
+            cache_key = self._cache_key(messages)
+            if not force and cache_key not in pending and self.cache.get(cache_key):
+                continue
+            pending.setdefault(cache_key, {"messages": messages, "url_ids": []})["url_ids"].append(
+                item["url_id"] + response_suffix
+            )
         
-        # Fix single quotes to double quotes
-        json_text = json_text.replace("'", '"')
+        if not pending:
+            logging.info("No uncached analyses to submit as a batch")
+            return stats
         
-        return json_text
+        cache_keys = list(pending)
+        for start in range(0, len(cache_keys), config.BATCH_MAX_REQUESTS):
+            chunk = {key: pending[key] for key in cache_keys[start:start + config.BATCH_MAX_REQUESTS]}
+            manifest_file, manifest = self._submit_batch(
+                chunk, start // config.BATCH_MAX_REQUESTS, self._request_kwargs(master_prompt),
+                sorted(template_fields(master_prompt))
+            )
+            self._collect_batch(manifest_file, manifest, stats)
+        
+        logging.info(
+            f"Batch mode: {stats['succeeded']}/{stats['requests']} requests succeeded, "
+            f"{stats['failed']} failed, {stats['unfinished']} still running"
+        )
+        return stats
     
-    def _clean_parsed_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Clean and normalize parsed data"""
-        cleaned = {}
+    def _submit_batch(self, chunk: Dict[str, Dict[str, Any]], part: int = 0,
+                      request_kwargs: Optional[Dict[str, Any]] = None, answer_fields: Optional[List[str]] = None):
+        """Write a JSONL request file, upload it and start a batch; returns its manifest"""
+        config.BATCH_DIR.mkdir(parents=True, exist_ok=True)
+        stem = f"batch_{time.strftime('%Y%m%d_%H%M%S')}_{part:02d}"
+        request_file = config.BATCH_DIR / f"{stem}_requests.jsonl"
         
-        for key, value in data.items():
-            # Clean key names
-            clean_key = key.strip().lower().replace(' ', '_').replace('-', '_')
-            
-            # Handle None/null values
-            if value in [None, "null", "None", "", "N/A", "n/a"]:
-                cleaned[clean_key] = None
-            
-            # Handle salary values
-            elif "salary" in clean_key and isinstance(value, str):
-                from src.utils import normalize_salary
-                cleaned[clean_key] = normalize_salary(value)
-            
-            # Handle boolean values
-            elif isinstance(value, str) and value.lower() in ["true", "false", "yes", "no"]:
-                cleaned[clean_key] = value.lower() in ["true", "yes"]
+        with open(request_file, "w", encoding="utf-8") as f:
+            for cache_key, entry in chunk.items():
+                line = {
+                    "custom_id": cache_key,
+                    "method": "POST",
+                    "url": self.BATCH_ENDPOINT,
+                    "body": dict(self._request_body(entry["messages"]), **(request_kwargs or {}))
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        
+        client = self._get_openai_client()
+        with open(request_file, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.BATCH_ENDPOINT,
+            completion_window=config.BATCH_COMPLETION_WINDOW,
+            metadata={"request_file": request_file.name}
+        )
+        logging.info(f"Submitted batch {batch.id} with {len(chunk)} requests ({request_file.name})")
+        
+        # The manifest maps answers back to URLs, even if this run is interrupted
+        manifest = {
+            "batch_id": batch.id,
+            "status": "submitted",
+            "model": self.entry_model,
+            "request_file": request_file.name,
+            "structured_output": bool(request_kwargs),
+            "answer_fields": answer_fields,  # For cascade escalation checks on the answers
+            "submitted_at": time.time(),
+            "requests": {
+                cache_key: {
+                    "url_ids": entry["url_ids"],
+                    "prompt_length": sum(len(message.content) for message in entry["messages"])
+                }
+                for cache_key, entry in chunk.items()
+            }
+        }
+        manifest_file = config.BATCH_DIR / f"{stem}_manifest.json"
+        save_json_file(manifest, manifest_file)
+        return manifest_file, manifest
+    
+    def _collect_batch(self, manifest_file: Path, manifest: Dict[str, Any], stats: Dict[str, Any]) -> None:
+        """Wait for a submitted batch and ingest its results"""
+        stats["batches"] += 1
+        stats["requests"] += len(manifest["requests"])
+        
+        batch = self._wait_for_batch(manifest["batch_id"])
+        if batch is None:
+            stats["unfinished"] += len(manifest["requests"])
+            return
+        
+        succeeded = self._ingest_batch_output(batch, manifest, manifest_file.name.replace("_manifest.json", ""))
+        stats["succeeded"] += succeeded
+        stats["failed"] += len(manifest["requests"]) - succeeded
+        
+        manifest["status"] = batch.status
+        manifest["succeeded"] = succeeded
+        save_json_file(manifest, manifest_file)
+    
+    def _wait_for_batch(self, batch_id: str):
+        """Poll a batch until it reaches a terminal state, or None if BATCH_MAX_WAIT runs out"""
+        client = self._get_openai_client()
+        deadline = time.monotonic() + config.BATCH_MAX_WAIT
+        
+        while True:
+            batch = client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            progress = f" ({counts.completed + counts.failed}/{counts.total} done)" if counts else ""
+            logging.info(f"Batch {batch_id}: {batch.status}{progress}")
             
-            # Handle lists
-            elif isinstance(value, list):
-                cleaned[clean_key] = [str(item).strip() for item in value if item]
+            if batch.status in self.BATCH_TERMINAL_STATES:
+                return batch
+            if time.monotonic() + config.BATCH_POLL_INTERVAL > deadline:
+                logging.warning(f"Batch {batch_id} not finished after {config.BATCH_MAX_WAIT}s, leaving it for the next run")
+                return None
+            time.sleep(config.BATCH_POLL_INTERVAL)
+    
+    def _ingest_batch_output(self, batch, manifest: Dict[str, Any], stem: str) -> int:
+        """Parse a finished batch's output into the LLM cache; returns the number of usable answers"""
+        client = self._get_openai_client()
+        
+        if batch.error_file_id:
+            errors = client.files.content(batch.error_file_id).text
+            save_text_file(errors, config.BATCH_DIR / f"{stem}_errors.jsonl")
+            logging.warning(f"Batch {batch.id} reported {len(errors.splitlines())} failed requests")
+        
+        if not batch.output_file_id:
+            logging.error(f"Batch {batch.id} ended as '{batch.status}' without output")
+            return 0
+        
+        output = client.files.content(batch.output_file_id).text
+        save_text_file(output, config.BATCH_DIR / f"{stem}_output.jsonl")
+        
+        succeeded = 0
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            entry = manifest["requests"].get(row.get("custom_id"))
+            if entry is None:
+                continue
             
-            # Handle nested dictionaries
-            elif isinstance(value, dict):
-                cleaned[clean_key] = self._clean_parsed_data(value)
+            cache_key = row["custom_id"]
+            url_id = entry["url_ids"][0]
+            response = row.get("response") or {}
+            if row.get("error") or response.get("status_code") != 200:
+                logging.warning(f"Batch request for {url_id} failed: {row.get('error') or response.get('status_code')}")
+                continue
             
-            # Handle strings
-            elif isinstance(value, str):
-                cleaned[clean_key] = value.strip()
+            body = response["body"]
+            response_text = (body["choices"][0]["message"]["content"] or "").strip()
+            structured = manifest.get("structured_output", False)
+            parsed_response, parse_method = self._parse_json_response_with_method(response_text, url_id)
+            if structured and parse_method == "json":
+                parse_method = "structured"
+            self._record_parse(structured, parse_method)
+            if not parsed_response:
+                continue
+            escalation = self.escalation_reason(parsed_response, manifest.get("answer_fields")) if self.is_cascade else None
+            if escalation:
+                self._record_outcome(self.entry_model, escalation[0])
+                continue  # analyze_job_ad() runs the cascade for it
             
-            else:
-                cleaned[clean_key] = value
+            usage = body.get("usage") or {}
+            record = {
+                "url_id": url_id,
+                "model": body.get("model", manifest["model"]),
+                "prompt_length": entry["prompt_length"],
+                "response_length": len(response_text),
+                "raw_response": response_text,
+                "parsed_response": parsed_response,
+                "usage": {  # Same shape as LangChain's usage_metadata
+                    "input_tokens": usage.get("prompt_tokens"),
+                    "output_tokens": usage.get("completion_tokens"),
+                    "total_tokens": usage.get("total_tokens"),
+                    "input_token_details": {
+                        "cache_read": (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+                    }
+                },
+                "batch_id": batch.id,
+                "structured_output": structured,
+                "parse_method": parse_method
+            }
+            self.ledger.record_llm_call(record["model"], record["usage"], 0.0, stage="batch",
+                                        price_factor=config.LLM_BATCH_PRICE_FACTOR)
+            self.cache.put(cache_key, record)
+            for url_id in entry["url_ids"]:
+                self._save_url_response(url_id, cache_key, record)
+            succeeded += 1
         
-        return cleaned
+        return succeeded
+    
+    def _parse_json_response(self, response_text: str, url_id: str) -> Optional[Dict[str, Any]]:
+        """Parse JSON from LLM response with improved extraction"""
+        return self._parse_json_response_with_method(response_text, url_id)[0]
+    
+    def _parse_json_response_with_method(self, response_text: str, url_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Parse JSON from LLM response, also returning how it was found ("json", "extracted", "repaired")"""
+        parsed, method = parse_json_response(response_text, url_id)
+        if parsed is None:
+            logging.error(f"No valid JSON found in response for {url_id}")
+            logging.debug(f"Response preview: {response_text.strip()[:500]}...")
+            
+            # Save the problematic response for debugging
+            self.store.put(
+                "failed_response", url_id,
+                f"Failed to parse JSON for {url_id}\n" + "="*50 + "\n" + response_text.strip()
+            )
+        return parsed, method
+    
+    def _clean_parsed_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Clean and normalize parsed data"""
+        return clean_parsed_data(data)
     
     def test_connection(self) -> bool:
         """Test LLM connection"""
@@ -518,13 +1672,13 @@ class LLMClient:
     
     def estimate_tokens(self, text: str) -> int:
         """Rough estimation of token count"""
-        # Very rough approximation: ~4 characters per token
-        return len(text) // 4
+        return estimate_tokens(text)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current model"""
         return {
             "model": self.model,
+            "cascade": self.cascade_models if self.is_cascade else None,
             "max_tokens": config.MAX_TOKENS,
             "temperature": config.TEMPERATURE,
             "timeout": config.TIMEOUT
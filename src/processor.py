@@ -4,12 +4,15 @@ Data processing module for Job Ad Analyzer
 
 import logging
 import json
+import math
+import shutil
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any, Set, Optional
+from typing import List, Dict, Any, Set, Optional, Tuple
 from collections import Counter
 import config
-from src.utils import load_json_file, save_json_file
+from src.utils import save_json_file, flatten_analysis
+from src.artifact_store import get_artifact_store
 
 
 class DataProcessor:
@@ -64,18 +67,20 @@ class DataProcessor:
     #         logging.error(f"Error creating final table: {e}")
     #         raise
     
-    def create_final_table(self, results: List[Dict[str, Any]]) -> None:
+    def create_final_table(self, results: List[Dict[str, Any]], output_name: Optional[str] = None) -> None:
         """
         Create final structured table from individual job ad results
         
         Args:
             results: List of successful processing results
+            output_name: Added to the output file names (e.g. a profile name)
         """
         try:
             logging.info(f"Processing {len(results)} job ads into final table")
             
             # Extract all job data
             job_data_list = []
+            source_lists = []  # The candidate_fit lists that flatten_analysis joins into text, for the Parquet output
             for result in results:
                 if result.get("data"):
                     # **HERE'S WHERE YOU CALL THE FLATTEN FUNCTION**
@@ -87,8 +92,11 @@ class DataProcessor:
                     # Add metadata
                     flattened_data["url_id"] = result["url_id"]
                     flattened_data["source_url"] = result["url"]
+                    if "profile" in result:
+                        flattened_data["profile"] = result["profile"]
                     
                     job_data_list.append(flattened_data)
+                    source_lists.append(self._source_lists(raw_data))
             
             if not job_data_list:
                 logging.error("No valid job data to process")
@@ -110,7 +118,7 @@ class DataProcessor:
             df = self._create_dataframe(unified_data)
             
             # Save outputs
-            self._save_outputs(df, unified_data, schema, field_analysis)
+            self._save_outputs(df, unified_data, schema, field_analysis, output_name, source_lists)
             
             logging.info("Final table creation completed successfully")
             
@@ -234,6 +242,93 @@ class DataProcessor:
         
         return df
     
+    @staticmethod
+    def _source_lists(data: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """fit_strengths and fit_gaps as the lists in the answer, before flatten_analysis joins them into text"""
+        fit = data.get('candidate_fit')
+        if not isinstance(fit, dict):
+            return {}
+        return {
+            column: fit[key] for column, key in (('fit_strengths', 'strengths'), ('fit_gaps', 'gaps'))
+            if isinstance(fit.get(key), list)
+        }
+    
+    def _create_typed_dataframe(self, unified_data: List[Dict[str, Any]],
+                                source_lists: Optional[List[Dict[str, List[Any]]]] = None) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Create a DataFrame with one real dtype per column, and the dtype names, for the Parquet output
+        
+        Columns in config.PARQUET_DTYPES get the declared type. Other columns
+        are inferred from their values: all booleans become boolean, all
+        numbers float, columns holding lists become lists of strings and
+        the rest strings. Values that don't convert become missing, so one odd answer
+        can't fail the column. source_lists (one dict per job, from
+        _source_lists) replaces the joined fit strengths and gaps with the
+        original lists, so an item containing a comma stays one item.
+        """
+        columns = list(dict.fromkeys(field for job in unified_data for field in job))
+        typed, dtypes = {}, {}
+        for col in columns:
+            values = [job.get(col) for job in unified_data]
+            if source_lists:
+                values = [lists.get(col, value) for lists, value in zip(source_lists, values)]
+            if col == config.MISC_COLUMN_NAME:
+                dtype = "json"
+            else:
+                dtype = config.PARQUET_DTYPES.get(col) or self._infer_dtype(values)
+            dtypes[col] = dtype
+            typed[col] = self._convert_column(values, dtype)
+        return pd.DataFrame(typed), dtypes
+    
+    @staticmethod
+    def _is_missing(value: Any) -> bool:
+        return value is None or (isinstance(value, float) and math.isnan(value))
+    
+    def _infer_dtype(self, values: List[Any]) -> str:
+        present = [value for value in values if not self._is_missing(value)]
+        if present and all(isinstance(value, bool) for value in present):
+            return "boolean"
+        if present and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+            return "float"
+        if any(isinstance(value, list) for value in present):
+            return "list"
+        if any(isinstance(value, dict) for value in present):
+            return "json"
+        return "string"
+    
+    def _convert_column(self, values: List[Any], dtype: str) -> pd.Series:
+        """One column's values as a Series of a dtype named in config.PARQUET_DTYPES (or "json")"""
+        convert = {"float": self._to_float, "boolean": self._to_boolean, "list": self._to_list}.get(dtype, self._to_text)
+        converted = [None if self._is_missing(value) else convert(value) for value in values]
+        if dtype == "category":
+            return pd.Series(converted, dtype="string").astype("category")  # String categories even if all missing
+        return pd.Series(converted, dtype={"float": "Float64", "boolean": "boolean", "list": object}.get(dtype, "string"))
+    
+    @staticmethod
+    def _to_float(value: Any) -> Optional[float]:
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _to_boolean(value: Any) -> Optional[bool]:
+        if isinstance(value, str):
+            return {"true": True, "yes": True, "false": False, "no": False}.get(value.strip().lower())
+        return value if isinstance(value, bool) else None
+    
+    def _to_list(self, value: Any) -> List[str]:
+        items = value if isinstance(value, list) else [value]
+        return [str(item) for item in items if not self._is_missing(item)]
+    
+    @staticmethod
+    def _to_text(value: Any) -> str:
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+    
     def _clean_dataframe_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and optimize DataFrame data types"""
         
@@ -265,57 +360,91 @@ class DataProcessor:
         return df
     
     def _save_outputs(self, df: pd.DataFrame, unified_data: List[Dict[str, Any]], 
-                     schema: Dict[str, Any], field_analysis: Dict[str, Dict[str, Any]]) -> None:
-        """Save all output files"""
+                     schema: Dict[str, Any], field_analysis: Dict[str, Dict[str, Any]],
+                     output_name: Optional[str] = None,
+                     source_lists: Optional[List[Dict[str, List[Any]]]] = None) -> None:
+        """Save the output files in config.OUTPUT_FORMATS, plus the field analysis report"""
         
         timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+        suffix = f"{output_name}_{timestamp}" if output_name else timestamp  # e.g. job_ads_analysis_alice_20250101_120000.csv
+        latest = f"{output_name}_latest" if output_name else "latest"
+        written = []  # Timestamped outputs, copied to their _latest names at the end
         
         # Save CSV with proper UTF-8 encoding for Farsi
-        csv_file = config.OUTPUT_DIR / f"job_ads_analysis_{timestamp}.csv"
-        df.to_csv(csv_file, index=False, encoding='utf-8-sig')  # BOM for Excel compatibility
-        logging.info(f"Saved CSV: {csv_file}")
+        if "csv" in config.OUTPUT_FORMATS:
+            csv_file = config.OUTPUT_DIR / f"job_ads_analysis_{suffix}.csv"
+            df.to_csv(csv_file, index=False, encoding='utf-8-sig')  # BOM for Excel compatibility
+            logging.info(f"Saved CSV: {csv_file}")
+            written.append(csv_file)
         
         # Save Excel if openpyxl is available
-        try:
-            excel_file = config.OUTPUT_DIR / f"job_ads_analysis_{timestamp}.xlsx"
-            with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=config.EXCEL_SHEET_NAME, index=False)
+        if "xlsx" in config.OUTPUT_FORMATS:
+            try:
+                excel_file = config.OUTPUT_DIR / f"job_ads_analysis_{suffix}.xlsx"
+                with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+                    df.to_excel(writer, sheet_name=config.EXCEL_SHEET_NAME, index=False)
+                    
+                    # Add field analysis sheet
+                    field_df = pd.DataFrame.from_dict(field_analysis, orient='index')
+                    field_df.to_excel(writer, sheet_name='Field_Analysis')
                 
-                # Add field analysis sheet
-                field_df = pd.DataFrame.from_dict(field_analysis, orient='index')
-                field_df.to_excel(writer, sheet_name='Field_Analysis')
-            
-            logging.info(f"Saved Excel: {excel_file}")
-        except ImportError:
-            logging.warning("openpyxl not available, skipping Excel output")
+                logging.info(f"Saved Excel: {excel_file}")
+                written.append(excel_file)
+            except ImportError:
+                logging.warning("openpyxl not available, skipping Excel output")
+        
+        # Save Parquet with declared column types if pyarrow is available
+        if "parquet" in config.OUTPUT_FORMATS:
+            try:
+                import pyarrow as pa
+                arrow_types = {
+                    "float": pa.float64(), "boolean": pa.bool_(), "category": pa.dictionary(pa.int32(), pa.string()),
+                    "list": pa.list_(pa.string()), "string": pa.string(), "json": pa.string()
+                }
+                parquet_file = config.OUTPUT_DIR / f"job_ads_analysis_{suffix}.parquet"
+                typed_df, dtypes = self._create_typed_dataframe(unified_data, source_lists)
+                # An explicit schema keeps the declared types even for columns that are empty in this run
+                arrow_schema = pa.schema([(col, arrow_types[dtype]) for col, dtype in dtypes.items()])
+                typed_df.to_parquet(parquet_file, engine='pyarrow', index=False, schema=arrow_schema)
+                logging.info(f"Saved Parquet: {parquet_file}")
+                written.append(parquet_file)
+            except ImportError:
+                logging.warning("pyarrow not available, skipping Parquet output")
         
         # Save JSON with full data
-        json_file = config.OUTPUT_DIR / f"job_ads_full_data_{timestamp}.json"
-        full_data = {
-            'metadata': {
-                'total_jobs': len(unified_data),
-                'timestamp': timestamp,
-                'schema': schema
-            },
-            'jobs': unified_data
-        }
-        save_json_file(full_data, json_file)
-        logging.info(f"Saved JSON: {json_file}")
+        if "json" in config.OUTPUT_FORMATS:
+            json_file = config.OUTPUT_DIR / f"job_ads_full_data_{suffix}.json"
+            full_data = {
+                'metadata': {
+                    'total_jobs': len(unified_data),
+                    'timestamp': timestamp,
+                    'schema': schema
+                },
+                'jobs': unified_data
+            }
+            save_json_file(full_data, json_file)
+            logging.info(f"Saved JSON: {json_file}")
+            written.append(json_file)
         
         # Save field analysis report
-        analysis_file = config.OUTPUT_DIR / f"field_analysis_report_{timestamp}.json"
+        analysis_file = config.OUTPUT_DIR / f"field_analysis_report_{suffix}.json"
         save_json_file(field_analysis, analysis_file)
         logging.info(f"Saved field analysis: {analysis_file}")
         
-        # Save latest versions (without timestamp) with proper encoding
-        latest_csv = config.OUTPUT_DIR / "job_ads_analysis_latest.csv"
-        df.to_csv(latest_csv, index=False, encoding='utf-8-sig')  # BOM for Excel compatibility
-        
-        latest_json = config.OUTPUT_DIR / "job_ads_full_data_latest.json"
-        save_json_file(full_data, latest_json)
+        # Save latest versions (without timestamp) as byte copies rather than serializing everything again
+        for output_file in written:
+            shutil.copyfile(output_file, output_file.with_name(output_file.name.replace(suffix, latest)))
         
         logging.info("Saved latest versions of outputs")
     
+    def load_final_table(self, output_name: Optional[str] = None) -> pd.DataFrame:
+        """Load the latest final table: from Parquet with its column types if it was written, otherwise from CSV"""
+        latest = f"{output_name}_latest" if output_name else "latest"
+        parquet_file = config.OUTPUT_DIR / f"job_ads_analysis_{latest}.parquet"
+        if parquet_file.exists():
+            return pd.read_parquet(parquet_file, dtype_backend='pyarrow')  # Arrow-backed columns load without conversion
+        return pd.read_csv(config.OUTPUT_DIR / f"job_ads_analysis_{latest}.csv", encoding='utf-8-sig')
+    
     def generate_summary_report(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate summary report of the processing results"""
         
@@ -366,49 +495,21 @@ class DataProcessor:
         
         return summary
     
-    def load_processed_data(self) -> List[Dict[str, Any]]:
-        """Load all processed JSON files"""
-        processed_files = list(config.PROCESSED_DATA_DIR.glob("url_*.json"))
-        results = []
-        
-        for file_path in processed_files:
-            try:
-                data = load_json_file(file_path)
-                results.append(data)
-            except Exception as e:
-                logging.error(f"Failed to load {file_path}: {e}")
+    def load_processed_data(self, profile: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Load all processed per-URL results in one bulk read (of the default profile unless one is named)"""
+        try:
+            results_by_id = get_artifact_store().get_many_json("result")
+        except Exception as e:
+            logging.error(f"Failed to load processed results: {e}")
+            return []
         
+        results = [
+            results_by_id[key] for key in sorted(results_by_id)
+            if (key.partition("@")[2] or None) == profile  # Other profiles' results are keyed url_id@profile
+        ]
         logging.info(f"Loaded {len(results)} processed files")
         return results
     
     def _flatten_nested_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Flatten nested JSON structure from LLM response"""
-        flattened = {}
-        
-        # Handle standard extraction
-        if 'standard_extraction' in data:
-            for key, value in data['standard_extraction'].items():
-                flattened[key] = value
-        
-        # Handle payment analysis
-        if 'payment_analysis' in data:
-            flattened['estimated_salary_irr'] = data['payment_analysis'].get('estimated_range_IRR')
-            flattened['salary_reasoning'] = data['payment_analysis'].get('reasoning')
-        
-        # Handle candidate fit
-        if 'candidate_fit' in data:
-            flattened['fit_tier'] = data['candidate_fit'].get('tier')
-            flattened['fit_summary'] = data['candidate_fit'].get('summary')
-            flattened['fit_strengths'] = ', '.join(data['candidate_fit'].get('strengths', []))
-            flattened['fit_gaps'] = ', '.join(data['candidate_fit'].get('gaps', []))
-        
-        # Handle overqualified assessment
-        if 'is_overqualified' in data:
-            flattened['is_overqualified'] = data['is_overqualified'].get('value')
-            flattened['overqualified_reasoning'] = data['is_overqualified'].get('reasoning')
-        
-        # Handle growth potential
-        if 'growth_potential' in data:
-            flattened['growth_potential'] = data['growth_potential']
-        
-        return flattened
\ No newline at end of file
+        return flatten_analysis(data)
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Master prompt helpers for Job Ad Analyzer
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import config
+from src.utils import flatten_analysis
+
+
+# Python types used in config.EXPECTED_DATA_TYPES -> JSON schema types
+JSON_SCHEMA_TYPES = {
+    str: "string",
+    bool: "boolean",
+    int: "number",
+    float: "number",
+    type(None): "null",
+}
+
+# A line of "=" framing a section heading in the master prompt
+BANNER_LINE = re.compile(r"^[ \t]*={3,}[ \t]*$", re.MULTILINE)
+
+# Two-phase analysis: the profile-independent half of the master prompt
+EXTRACTION_PROMPT = """You are an expert technical recruiter. Extract the facts stated in the job advertisement provided below and return them in a single JSON object in the following format.
+
+Do not add any text, markdown, or explanations outside of the final JSON object.
+
+{template}
+
+{instructions}"""
+
+SCORING_NOTE = (
+    "The job advertisement below has already been reduced to the facts extracted from it (as JSON). "
+    "Base your analysis on those facts."
+)
+
+
+def locate_json_template(master_prompt: str) -> Tuple[Optional[Dict[str, Any]], int, int]:
+    """Return the first JSON object in the master prompt with its start and end offsets"""
+    decoder = json.JSONDecoder()
+    position = master_prompt.find("{")
+    while position != -1:
+        try:
+            template, end = decoder.raw_decode(master_prompt, position)
+            if isinstance(template, dict):
+                return template, position, end
+        except json.JSONDecodeError:
+            pass
+        position = master_prompt.find("{", position + 1)
+    return None, -1, -1
+
+
+def extract_json_template(master_prompt: str) -> Optional[Dict[str, Any]]:
+    """Return the first JSON object in the master prompt (the answer format it asks for)"""
+    return locate_json_template(master_prompt)[0]
+
+
+@lru_cache(maxsize=16)
+def template_fields(master_prompt: str) -> FrozenSet[str]:
+    """Flattened column names (see config.EXPECTED_DATA_TYPES) an answer to this prompt can fill"""
+    template = extract_json_template(master_prompt)
+    return frozenset(flatten_analysis(template)) if template else frozenset()
+
+
+def split_prompt_sections(master_prompt: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split the master prompt at its banner headings
+
+    A heading is a line framed by lines of "=" above and below it, as in
+    master_prompt.txt. Text before the first heading comes back with heading None.
+
+    Returns:
+        (heading, body) pairs in prompt order
+    """
+    lines = master_prompt.splitlines()
+    sections = [(None, [])]
+    i = 0
+    while i < len(lines):
+        if i + 2 < len(lines) and BANNER_LINE.match(lines[i]) and BANNER_LINE.match(lines[i + 2]):
+            sections.append((lines[i + 1].strip(), []))
+            i += 3
+            continue
+        sections[-1][1].append(lines[i])
+        i += 1
+    return [(heading, "\n".join(body).strip()) for heading, body in sections]
+
+
+def profile_hash(master_prompt: str) -> str:
+    """Hash of the candidate profile section (the whole prompt if it has none)"""
+    profile = [body for heading, body in split_prompt_sections(master_prompt) if heading and "PROFILE" in heading.upper()]
+    text = "\n\n".join(profile) if profile else master_prompt
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=8)
+def build_phase_prompts(master_prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    Split the master prompt into a profile-independent extraction prompt and a scoring prompt
+
+    The JSON template's sections listed in config.EXTRACTION_SECTIONS go to
+    the extraction prompt, which is generic apart from the template and the
+    instructions that follow it, so it doesn't change when the profile does. The scoring prompt is the master prompt
+    with the template cut down to the remaining sections.
+
+    Returns:
+        Dict with "extraction" and "scoring" prompts, the template's "sections"
+        and each phase's, and "profile_hash", or None if the template can't be split that way
+    """
+    template, start, end = locate_json_template(master_prompt)
+    if template is None:
+        return None
+
+    extraction_sections = [name for name in template if name in config.EXTRACTION_SECTIONS]
+    scoring_sections = [name for name in template if name not in config.EXTRACTION_SECTIONS]
+    if not extraction_sections or not scoring_sections:
+        return None
+
+    # Instructions after the template, up to the next banner heading
+    instructions = BANNER_LINE.split(master_prompt[end:], maxsplit=1)[0].strip()
+    extraction = EXTRACTION_PROMPT.format(
+        template=json.dumps({name: template[name] for name in extraction_sections}, indent=4, ensure_ascii=False),
+        instructions=instructions
+    ).strip()
+    scoring = (
+        master_prompt[:start]
+        + json.dumps({name: template[name] for name in scoring_sections}, indent=4, ensure_ascii=False)
+        + master_prompt[end:]
+        + f"\n\n{SCORING_NOTE}"
+    )
+
+    return {
+        "extraction": extraction,
+        "scoring": scoring,
+        "sections": list(template),
+        "extraction_sections": extraction_sections,
+        "scoring_sections": scoring_sections,
+        "profile_hash": profile_hash(master_prompt),
+    }
+
+
+def _schema_types(key: str, example: Any) -> list:
+    """JSON types for a leaf: EXPECTED_DATA_TYPES if it names the key, else the example's type, always nullable"""
+    expected = config.EXPECTED_DATA_TYPES.get(key)
+    if expected is not None:
+        python_types = expected if isinstance(expected, tuple) else (expected,)
+    elif example is None:
+        python_types = (str,)
+    else:
+        python_types = (type(example),)
+
+    types = []
+    for python_type in python_types + (type(None),):
+        json_type = JSON_SCHEMA_TYPES.get(python_type, "string")
+        if json_type not in types:
+            types.append(json_type)
+    return types
+
+
+def _schema_for(key: str, example: Any) -> Dict[str, Any]:
+    if isinstance(example, dict):
+        return {
+            "type": "object",
+            "properties": {name: _schema_for(name, value) for name, value in example.items()},
+            "required": list(example),
+            "additionalProperties": False,
+        }
+    if isinstance(example, list):
+        item = example[0] if example else ""
+        if isinstance(item, dict):
+            items = _schema_for(key, item)
+        else:
+            items = {"type": JSON_SCHEMA_TYPES.get(type(item), "string")}
+        return {"type": "array", "items": items}
+    return {"type": _schema_types(key, example)}
+
+
+@lru_cache(maxsize=8)
+def build_response_schema(master_prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    Derive a strict JSON schema from the JSON block in the master prompt
+
+    Nesting and keys come from the template; leaf types come from
+    config.EXPECTED_DATA_TYPES where it names the key (e.g. salary_min ->
+    number or null) and from the example value otherwise. Every leaf may be
+    null, since the prompt asks for null when the ad doesn't say.
+
+    Returns:
+        The schema, or None if the prompt contains no JSON object
+    """
+    template = extract_json_template(master_prompt)
+    if template is None:
+        return None
+    return _schema_for("", template)
+
+
+def build_response_format(master_prompt: str, name: str = "job_ad_analysis") -> Optional[Dict[str, Any]]:
+    """OpenAI response_format for strict structured output, or None if no schema can be derived"""
+    schema = build_response_schema(master_prompt)
+    if schema is None:
+        return None
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
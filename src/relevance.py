@@ -0,0 +1,208 @@
+"""
+Relevance pre-filter for Job Ad Analyzer
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+import config
+from src.artifact_store import ArtifactStore, get_artifact_store
+from src.prompts import split_prompt_sections
+from src.utils import flatten_analysis
+
+
+# Words, keeping the punctuation of tech terms (c++, c#, node.js)
+TOKEN = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does each for from
+had has have he her his how i if in into is it its may more most must my no not of on or our over she should
+so such than that the their them then there these they this those through to under up us was we were what when
+where which while who will with within would you your
+""".split())
+
+# Rocchio weights: profile text, mean of ads tiered relevant, mean of ads tiered F
+PROFILE_WEIGHT, RELEVANT_WEIGHT, IRRELEVANT_WEIGHT = 1.0, 0.75, 0.25
+
+CV_FOLDS = 5  # Folds for the out-of-fold scores the threshold and recall estimate come from
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def fit_tier(data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The A/B/C/F tier of a stored analysis ("A (Perfect fit)" counts as A), or None"""
+    if not isinstance(data, dict):
+        return None
+    tier = flatten_analysis(data).get("fit_tier")
+    if not isinstance(tier, str) or not tier.strip():
+        return None
+    return tier.strip()[0].upper()
+
+
+def profile_text(master_prompt: str) -> str:
+    """The candidate profile section(s) of a master prompt, or the whole prompt without one"""
+    sections = [body for heading, body in split_prompt_sections(master_prompt) if heading and "PROFILE" in heading.upper()]
+    return "\n\n".join(sections) if sections else master_prompt
+
+
+class RelevanceDecision(NamedTuple):
+    score: float
+    threshold: Optional[float]
+    action: str  # "analyze", "downgrade" or "skip"
+
+
+class RelevanceFilter:
+    """
+    Local TF-IDF score of a scraped ad against the candidate profile, to spare the LLM obviously unrelated ads
+
+    Ads are sparse, L2-normalized TF-IDF vectors (sublinear term frequency)
+    over the vocabulary of the profile and past ads. The score is the dot
+    product with a Rocchio vector: the profile, plus the mean of past ads
+    tiered relevant (config.RELEVANCE_RELEVANT_TIERS), minus the mean of past
+    ads tiered F. The threshold is set on out-of-fold scores of the past
+    relevant ads so that RELEVANCE_TARGET_RECALL of them would have passed,
+    which is also the recall estimate reported. With fewer than
+    RELEVANCE_MIN_LABELS labeled ads, or none of either kind, there is no
+    threshold and every ad is analyzed.
+    """
+
+    def __init__(self, profile: str, documents: List[str], tiers: List[str], mode: Optional[str] = None):
+        self.mode = mode or config.RELEVANCE_FILTER
+        token_lists = [tokenize(document) for document in documents]
+        profile_tokens = tokenize(profile)
+
+        document_frequency = Counter()
+        for tokens in token_lists + [profile_tokens]:
+            document_frequency.update(set(tokens))
+        self.vocabulary = {term: index for index, term in enumerate(sorted(document_frequency))}
+        frequencies = np.array([document_frequency[term] for term in sorted(document_frequency)], dtype=np.float64)
+        self.idf = np.log((1 + len(token_lists) + 1) / (1 + frequencies)) + 1
+
+        vectors = [self._vectorize(tokens) for tokens in token_lists]
+        relevant = np.array([tier in config.RELEVANCE_RELEVANT_TIERS for tier in tiers], dtype=bool)
+        irrelevant = np.array([tier == "F" for tier in tiers], dtype=bool)
+        self.labels = {"ads": len(tiers), "relevant": int(relevant.sum()), "irrelevant": int(irrelevant.sum())}
+
+        self.profile_vector = self._dense(*self._vectorize(profile_tokens))
+        self.weights = self._rocchio(vectors, relevant, irrelevant)
+        self.threshold, self.estimated_recall, self.historical_skip_rate = self._calibrate(vectors, relevant, irrelevant)
+
+        self.stats = {"scored": 0, "below_threshold": 0, "skipped": 0, "downgraded": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_history(cls, master_prompt: str, profile: Optional[str] = None,
+                     store: Optional[ArtifactStore] = None) -> "RelevanceFilter":
+        """Build from a master prompt's profile and this profile's stored results with their cleaned text"""
+        store = store or get_artifact_store()
+        results = [
+            result for result in store.get_many_json("result").values()
+            if result.get("error") is None and result.get("profile") == profile and fit_tier(result.get("data"))
+        ]
+        texts = store.get_many("cleaned", {result["url_id"] for result in results})
+        labeled = [(texts[result["url_id"]], fit_tier(result["data"])) for result in results if texts.get(result["url_id"])]
+
+        relevance = cls(profile_text(master_prompt), [text for text, _ in labeled], [tier for _, tier in labeled])
+        name = f" for profile '{profile}'" if profile else ""
+        if relevance.threshold is None:
+            logging.info(
+                f"Relevance filter{name}: {len(labeled)} labeled ads ({relevance.labels['irrelevant']} tier F), "
+                f"need {config.RELEVANCE_MIN_LABELS} with both relevant and F ones; analyzing every ad"
+            )
+        else:
+            logging.info(
+                f"Relevance filter{name}: threshold {relevance.threshold:.3f} from {len(labeled)} labeled ads, "
+                f"estimated recall {relevance.estimated_recall:.1%}, would have skipped {relevance.historical_skip_rate:.1%}"
+            )
+        return relevance
+
+    def _vectorize(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse (indices, values) TF-IDF vector of a token list, L2-normalized"""
+        indices = np.fromiter((self.vocabulary[token] for token in tokens if token in self.vocabulary), dtype=np.int64)
+        if not len(indices):
+            return indices, np.zeros(0)
+        indices, counts = np.unique(indices, return_counts=True)
+        values = (1 + np.log(counts)) * self.idf[indices]
+        return indices, values / np.linalg.norm(values)
+
+    def _dense(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary))
+        vector[indices] = values
+        return vector
+
+    def _mean(self, vectors: List[Tuple[np.ndarray, np.ndarray]], mask: np.ndarray) -> np.ndarray:
+        total = np.zeros(len(self.vocabulary))
+        for (indices, values), selected in zip(vectors, mask):
+            if selected:
+                total[indices] += values
+        return total / max(int(mask.sum()), 1)
+
+    def _rocchio(self, vectors: List[Tuple[np.ndarray, np.ndarray]], relevant: np.ndarray,
+                 irrelevant: np.ndarray) -> np.ndarray:
+        weights = PROFILE_WEIGHT * self.profile_vector
+        if relevant.any():
+            weights = weights + RELEVANT_WEIGHT * self._mean(vectors, relevant)
+        if irrelevant.any():
+            weights = weights - IRRELEVANT_WEIGHT * self._mean(vectors, irrelevant)
+        return weights
+
+    def _calibrate(self, vectors: List[Tuple[np.ndarray, np.ndarray]], relevant: np.ndarray,
+                   irrelevant: np.ndarray) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """(threshold, estimated recall, share of past ads it would have skipped), all None without enough labels"""
+        labeled = int(relevant.sum() + irrelevant.sum())
+        if labeled < config.RELEVANCE_MIN_LABELS or not relevant.any() or not irrelevant.any():
+            return None, None, None
+
+        # Out-of-fold scores: each ad is scored by a model built without its fold
+        scores = np.zeros(len(vectors))
+        folds = np.arange(len(vectors)) % CV_FOLDS
+        for fold in range(CV_FOLDS):
+            held_out = folds == fold
+            weights = self._rocchio(vectors, relevant & ~held_out, irrelevant & ~held_out)
+            for index in np.flatnonzero(held_out):
+                indices, values = vectors[index]
+                scores[index] = values @ weights[indices]
+
+        relevant_scores = np.sort(scores[relevant])
+        allowed_misses = int(math.floor((1 - config.RELEVANCE_TARGET_RECALL) * len(relevant_scores)))
+        threshold = float(relevant_scores[allowed_misses])
+        recall = float((relevant_scores >= threshold).mean())
+        skip_rate = float((scores[relevant | irrelevant] < threshold).mean())
+        return threshold, recall, skip_rate
+
+    def score(self, text: str) -> float:
+        indices, values = self._vectorize(tokenize(text))
+        return float(values @ self.weights[indices]) if len(indices) else 0.0
+
+    def decide(self, text: str, record: bool = True) -> RelevanceDecision:
+        """Score an ad and say what to do with it; record=False leaves the run's counts alone"""
+        score = self.score(text)
+        below = self.threshold is not None and score < self.threshold
+        action = self.mode if below and self.mode in ("skip", "downgrade") else "analyze"
+        if record:
+            with self._lock:
+                self.stats["scored"] += 1
+                self.stats["below_threshold"] += 1 if below else 0
+                self.stats["skipped"] += 1 if action == "skip" else 0
+                self.stats["downgraded"] += 1 if action == "downgrade" else 0
+        return RelevanceDecision(score, self.threshold, action)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Run counts, skip rate and the calibration they rest on, for the run report"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update(
+            mode=self.mode,
+            labels=self.labels,
+            threshold=round(self.threshold, 4) if self.threshold is not None else None,
+            estimated_recall=round(self.estimated_recall, 3) if self.estimated_recall is not None else None,
+            historical_skip_rate=round(self.historical_skip_rate, 3) if self.historical_skip_rate is not None else None,
+            skip_rate=round(stats["skipped"] / stats["scored"], 3) if stats["scored"] else 0.0,
+        )
+        return stats
@@ -0,0 +1,241 @@
+"""
+LLM response parsing for Job Ad Analyzer
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, Optional, Tuple
+from src.utils import normalize_salary
+from src.validation import get_path, leaf_paths, set_path
+
+
+# One token of (possibly broken) JSON per match; the salvage scanner only loops over tokens
+JSON_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+    # A quote ends a single-quoted string only before a separator, so apostrophes inside (the ad's text) survive
+  | '(?P<single>[^'\\]*(?:(?:\\.|'(?!\s*[,:}\]]))[^'\\]*)*)'(?=\s*[,:}\]])
+  | (?P<open>[{\[])
+  | (?P<close>[}\]])
+  | (?P<comma>,)
+  | (?P<colon>:)
+  | (?P<word>[A-Za-z_$][\w$\-]*)
+  | (?P<other>[^"'{}\[\],:A-Za-z_$\s]+)
+  | (?P<broken>["'])
+""", re.VERBOSE | re.DOTALL)
+
+SINGLE_QUOTED_ESCAPES = re.compile(r'\\.|"', re.DOTALL)  # What changes when a single-quoted string becomes double-quoted
+
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def _single_to_double_quoted(body: str) -> str:
+    """A single-quoted string's body as a JSON string"""
+    return '"' + SINGLE_QUOTED_ESCAPES.sub(
+        lambda match: "'" if match.group() == "\\'" else ('\\"' if match.group() == '"' else match.group()), body
+    ) + '"'
+
+
+def _scan_object(text: str, start: int) -> Tuple[Optional[str], int, bool]:
+    """
+    Copy the JSON object opening at text[start] up to its closing brace, repairing it on the way
+
+    Double-quoted strings are single tokens, so braces, commas and quotes
+    inside them don't count. Single-quoted strings become double-quoted,
+    unquoted keys get quotes, Python's True/False/None become JSON literals
+    and commas before a closing bracket are dropped.
+
+    Returns:
+        (repaired object text or None if it never closes, index after it, whether anything was repaired)
+    """
+    out, stack = [], []
+    trailing_comma = None  # Index in out of a comma with nothing after it yet
+    expecting_key = False
+    repaired = False
+
+    for match in JSON_TOKEN.finditer(text, start):
+        kind = match.lastgroup
+        token = match.group()
+
+        if kind == "space":
+            out.append(token)
+            continue
+        if kind == "string":
+            out.append(token)
+        elif kind == "single":
+            out.append(_single_to_double_quoted(match.group("single")))
+            repaired = True
+        elif kind == "open":
+            stack.append("}" if token == "{" else "]")
+            out.append(token)
+            expecting_key = token == "{"
+        elif kind == "close":
+            if not stack or stack.pop() != token:
+                return None, match.end(), repaired  # Mismatched bracket
+            if trailing_comma is not None:
+                out[trailing_comma] = ""
+                repaired = True
+            out.append(token)
+            expecting_key = False
+            if not stack:
+                return "".join(out), match.end(), repaired
+        elif kind == "comma":
+            out.append(token)
+            trailing_comma = len(out) - 1
+            expecting_key = stack[-1] == "}"
+            continue
+        elif kind == "colon":
+            out.append(token)
+            expecting_key = False
+        elif kind == "word":
+            if expecting_key:
+                token, repaired = f'"{token}"', True
+            elif token in PYTHON_LITERALS:
+                token, repaired = PYTHON_LITERALS[token], True
+            out.append(token)
+        elif kind == "other":
+            out.append(token)
+        else:
+            return None, len(text), repaired  # Unterminated string
+        trailing_comma = None
+
+    return None, len(text), repaired  # Never closed (e.g. a truncated response)
+
+
+def salvage_json_object(text: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Find and load the first JSON object in free text, in one pass
+
+    Prose and code fences around the object are skipped, and a valid object
+    is decoded directly; a broken one is repaired by _scan_object(). A candidate that
+    still doesn't load (e.g. "{placeholder}" in prose) is passed over
+    together with everything nested in it.
+
+    Returns:
+        (object or None, whether it needed repairs)
+    """
+    decoder = json.JSONDecoder()
+    position = text.find("{")
+    while position != -1:
+        # Valid JSON wrapped in prose or fences decodes at C speed; only broken JSON needs the scan
+        try:
+            parsed, end = decoder.raw_decode(text, position)
+            if isinstance(parsed, dict):
+                return parsed, False
+        except json.JSONDecodeError:
+            pass
+
+        candidate, end, repaired = _scan_object(text, position)
+        if candidate is None and end >= len(text):
+            return None, False
+        if candidate is not None:
+            try:
+                parsed = json.loads(candidate)
+                if isinstance(parsed, dict):
+                    return parsed, repaired
+            except json.JSONDecodeError:
+                pass
+        position = text.find("{", end)
+    return None, False
+
+
+def parse_json_response(response_text: str, label: str = "response") -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Extract and clean the JSON object in an LLM response
+
+    Has no side effects, so stored responses can be parsed again offline.
+
+    Returns:
+        (cleaned data, how it was found: "json" for a bare object, "extracted"
+        from surrounding text or fences, "repaired" if it needed fixing),
+        or (None, None) if the response holds no usable JSON object
+    """
+    try:
+        # Clean the response text
+        response_text = response_text.strip()
+
+        # Fast path: the whole response is the object
+        if response_text.startswith("{"):
+            try:
+                parsed = json.loads(response_text)
+                if isinstance(parsed, dict):
+                    logging.debug(f"Parsed entire response as JSON for {label}")
+                    return clean_parsed_data(parsed), "json"
+            except json.JSONDecodeError:
+                pass
+
+        parsed, repaired = salvage_json_object(response_text)
+        if parsed is None:
+            return None, None
+        method = "repaired" if repaired else "extracted"
+        logging.debug(f"Salvaged JSON ({method}) for {label}")
+        return clean_parsed_data(parsed), method
+
+    except Exception as e:
+        logging.error(f"Unexpected error parsing response for {label}: {e}")
+        return None, None
+
+
+def clean_parsed_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Clean and normalize parsed data"""
+    cleaned = {}
+
+    for key, value in data.items():
+        # Clean key names
+        clean_key = key.strip().lower().replace(' ', '_').replace('-', '_')
+
+        # Handle None/null values
+        if value in [None, "null", "None", "", "N/A", "n/a"]:
+            cleaned[clean_key] = None
+
+        # Handle salary values
+        elif "salary" in clean_key and isinstance(value, str):
+            cleaned[clean_key] = normalize_salary(value)
+
+        # Handle boolean values
+        elif isinstance(value, str) and value.lower() in ["true", "false", "yes", "no"]:
+            cleaned[clean_key] = value.lower() in ["true", "yes"]
+
+        # Handle lists
+        elif isinstance(value, list):
+            cleaned[clean_key] = [str(item).strip() for item in value if item]
+
+        # Handle nested dictionaries
+        elif isinstance(value, dict):
+            cleaned[clean_key] = clean_parsed_data(value)
+
+        # Handle strings
+        elif isinstance(value, str):
+            cleaned[clean_key] = value.strip()
+
+        else:
+            cleaned[clean_key] = value
+
+    return cleaned
+
+
+def reparse_record(record: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Parse a stored LLM response record's raw_response again
+
+    Answers to follow-up requests (the "reask" and "delta" entries) are
+    cleaned again and merged over it in the order they were made.
+
+    Returns:
+        (parsed response, parse method) as parse_json_response() gives them
+    """
+    parsed, method = parse_json_response(record.get("raw_response") or "", record.get("url_id") or "response")
+    if parsed is None:
+        return None, None
+    if record.get("structured_output") and method == "json":
+        method = "structured"
+
+    follow_ups = [record.get("reask")] + list(record.get("delta") or [])
+    for follow_up in follow_ups:
+        if not follow_up or not isinstance(follow_up.get("answer"), dict):
+            continue
+        answer = clean_parsed_data(follow_up["answer"])
+        for path in leaf_paths(answer):
+            set_path(parsed, path, get_path(answer, path)[1])
+    return parsed, method
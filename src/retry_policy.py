@@ -0,0 +1,201 @@
+"""
+Retry policy for LLM calls in Job Ad Analyzer
+"""
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+import openai
+from tenacity import Retrying, RetryCallState, retry_if_exception
+import config
+from src.ledger import get_ledger
+
+
+class ResponseParseError(ValueError):
+    """The model answered, but no usable JSON could be extracted from the answer"""
+
+
+# Error classes that are worth another attempt; anything else fails immediately
+RETRYABLE_ERRORS = ("rate_limit", "server", "timeout", "connection", "parse")
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Sort an LLM call failure into a retry class
+
+    Returns:
+        "rate_limit", "server", "timeout", "connection", "parse", "auth",
+        "bad_request" or "other"
+    """
+    if isinstance(error, ResponseParseError):
+        return "parse"
+    if isinstance(error, openai.APITimeoutError) or isinstance(error, TimeoutError) or "Timeout" in type(error).__name__:
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError) or isinstance(error, ConnectionError):
+        return "connection"
+
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        return "rate_limit"
+    if status in (401, 403):
+        return "auth"
+    if status is not None and status >= 500:
+        return "server"
+    if status is not None and 400 <= status < 500:
+        return "bad_request"
+    return "other"
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay the server asked for in Retry-After / retry-after-ms, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Classified retries with full-jitter backoff and a retry budget shared by a whole run
+
+    Rate limits, server errors, timeouts, connection drops and unparseable
+    answers are retried, each class up to its own attempt limit from
+    LLM_RETRY_ATTEMPTS; authentication and other client errors fail at once.
+    The wait before retry n is uniform in [0, min(LLM_RETRY_MAX_DELAY,
+    RETRY_DELAY * 2**n)], or the server's uncapped Retry-After if that is
+    longer. Once the run's LLM_RETRY_BUDGET retries are spent, or a wait would
+    not fit in what is left of its LLM_RETRY_WAIT_BUDGET seconds, failures are
+    no longer retried, so an outage can't multiply the run time.
+    """
+
+    def __init__(self, budget: Optional[int] = None, max_attempts: Optional[Dict[str, int]] = None,
+                 base_delay: Optional[float] = None, max_delay: Optional[float] = None,
+                 wait_budget: Optional[float] = None):
+        self.budget = config.LLM_RETRY_BUDGET if budget is None else budget
+        self.max_attempts = config.LLM_RETRY_ATTEMPTS if max_attempts is None else max_attempts
+        self.base_delay = config.RETRY_DELAY if base_delay is None else base_delay
+        self.max_delay = config.LLM_RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.wait_budget = config.LLM_RETRY_WAIT_BUDGET if wait_budget is None else wait_budget
+
+        self._lock = threading.Lock()
+        # retried: error class -> failures that were retried; failed: error class -> calls given up on
+        self.stats = {"retries": 0, "waited": 0.0, "budget_exhausted": 0, "gave_up": 0, "recovered": 0,
+                      "retried": {}, "failed": {}}
+
+    def call(self, func: Callable[[], Any], label: str, no_retry: Tuple[str, ...] = ()) -> Any:
+        """
+        Run func, retrying per this policy; re-raises the last error if it never succeeds
+
+        Error classes in no_retry fail at once for this call (e.g. "parse" when
+        a stronger model is waiting to take over).
+        """
+        failures = {}  # error class -> failed attempts in this call
+        planned = {}  # attempt number -> wait before the retry that follows it
+        retrying = Retrying(
+            retry=retry_if_exception(
+                lambda error: classify_error(error) in RETRYABLE_ERRORS and classify_error(error) not in no_retry
+            ),
+            stop=lambda retry_state: self._should_stop(retry_state, failures, planned),
+            wait=lambda retry_state: self._planned_wait(retry_state, planned),
+            before_sleep=lambda retry_state: self._log_retry(retry_state, label, failures),
+            reraise=True
+        )
+
+        retried = False
+        try:
+            for attempt in retrying:
+                with attempt:
+                    result = func()
+                retried = retried or attempt.retry_state.attempt_number > 1
+        except Exception as e:
+            error_class = classify_error(e)
+            with self._lock:
+                self.stats["failed"][error_class] = self.stats["failed"].get(error_class, 0) + 1
+                self.stats["gave_up"] += 1
+            logging.error(f"LLM call for {label} failed ({error_class}): {e}")
+            raise
+
+        if retried:
+            with self._lock:
+                self.stats["recovered"] += 1
+        return result
+
+    def _should_stop(self, retry_state: RetryCallState, failures: Dict[str, int], planned: Dict[int, float]) -> bool:
+        error_class = classify_error(retry_state.outcome.exception())
+        failures[error_class] = failures.get(error_class, 0) + 1
+        if failures[error_class] >= self.max_attempts.get(error_class, config.MAX_RETRIES):
+            return True
+
+        wait = self._planned_wait(retry_state, planned)
+        with self._lock:
+            if self.stats["retries"] >= self.budget:
+                self.stats["budget_exhausted"] += 1
+                logging.warning(f"Run retry budget of {self.budget} spent, not retrying {error_class} error")
+                return True
+            remaining = self.wait_budget - self.stats["waited"]
+            if wait > remaining:
+                self.stats["budget_exhausted"] += 1
+                logging.warning(
+                    f"Waiting {wait:.1f}s would exceed the {remaining:.1f}s left of the run's retry wait budget, "
+                    f"not retrying {error_class} error"
+                )
+                return True
+            self.stats["retried"][error_class] = self.stats["retried"].get(error_class, 0) + 1
+            self.stats["retries"] += 1
+            self.stats["waited"] += wait
+        get_ledger().record_retry(error_class)
+        return False
+
+    def _planned_wait(self, retry_state: RetryCallState, planned: Dict[int, float]) -> float:
+        """The jittered wait is drawn once per attempt, so the budget check and the sleep agree"""
+        if retry_state.attempt_number not in planned:
+            planned[retry_state.attempt_number] = self._wait_time(retry_state)
+        return planned[retry_state.attempt_number]
+
+    def _wait_time(self, retry_state: RetryCallState) -> float:
+        ceiling = min(self.max_delay, self.base_delay * 2 ** retry_state.attempt_number)
+        wait = random.uniform(0, ceiling)
+        retry_after = retry_after_seconds(retry_state.outcome.exception())
+        if retry_after is not None:
+            wait = max(wait, retry_after)
+        return wait
+
+    def _log_retry(self, retry_state: RetryCallState, label: str, failures: Dict[str, int]) -> None:
+        error = retry_state.outcome.exception()
+        error_class = classify_error(error)
+        logging.warning(
+            f"LLM call for {label} failed ({error_class}: {error}); retry "
+            f"{failures[error_class]}/{self.max_attempts.get(error_class, config.MAX_RETRIES) - 1} "
+            f"for this error class in {retry_state.next_action.sleep:.1f}s"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retry counts for the run report"""
+        with self._lock:
+            stats = dict(self.stats, retried=dict(self.stats["retried"]), failed=dict(self.stats["failed"]))
+        stats["waited"] = round(stats["waited"], 3)
+        stats["budget"] = self.budget
+        stats["wait_budget"] = self.wait_budget
+        return stats
@@ -0,0 +1,86 @@
+"""
+Host-aware scheduling for Job Ad Analyzer
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+import config
+
+
+class HostScheduler:
+    """
+    Hand out work items so that each host is hit at most once per its minimum spacing
+
+    Every host keeps a ready time. `next()` always returns the earliest-queued item
+    whose host is ready, so a run of URLs on one slow-to-revisit host does not hold
+    up URLs on other hosts. Items queued with host=None (e.g. served from cache)
+    never touch the network and are always ready.
+    """
+
+    def __init__(self, default_delay: Optional[float] = None,
+                 host_delays: Optional[Dict[str, float]] = None):
+        self.default_delay = config.SCRAPING_DELAY if default_delay is None else default_delay
+        self.host_delays = config.HOST_MIN_DELAYS if host_delays is None else host_delays
+
+        self._queues = {}  # host -> deque of (sequence, item)
+        self._ready_at = {}  # host -> earliest time the host may be hit again
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    def add(self, item: Any, host: Optional[str]) -> None:
+        """Queue an item for a host (None for items that need no network access)"""
+        with self._condition:
+            self._queues.setdefault(host, deque()).append((self._sequence, item))
+            self._sequence += 1
+            self._condition.notify()
+
+    def delay_for(self, host: str) -> float:
+        """Minimum spacing between requests to a host"""
+        for suffix, delay in self.host_delays.items():
+            if host == suffix or host.endswith("." + suffix):
+                return delay
+        return self.default_delay
+
+    def __len__(self) -> int:
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def next(self) -> Optional[Any]:
+        """
+        Return the next item whose host may be hit now, waiting if none is ready
+
+        Returns:
+            The next work item, or None once every queue is empty
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                best_host, best_queue = None, None
+                earliest_ready = None
+
+                for host, queue in self._queues.items():
+                    if not queue:
+                        continue
+                    ready_at = self._ready_at.get(host, 0.0)
+                    if ready_at <= now:
+                        # Among ready hosts, keep input order
+                        if best_queue is None or queue[0][0] < best_queue[0][0]:
+                            best_host, best_queue = host, queue
+                    elif earliest_ready is None or ready_at < earliest_ready:
+                        earliest_ready = ready_at
+
+                if best_queue is not None:
+                    _, item = best_queue.popleft()
+                    if best_host is not None:
+                        self._ready_at[best_host] = now + self.delay_for(best_host)
+                    return item
+
+                if earliest_ready is None:
+                    return None  # Nothing left to hand out
+
+                wait_time = earliest_ready - now
+                logging.debug(f"All pending hosts cooling down, waiting {wait_time:.2f}s")
+                self._condition.wait(timeout=wait_time)
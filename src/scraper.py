@@ -3,6 +3,7 @@ Web scraping module for Job Ad Analyzer
 """
 
 import logging
+import threading
 import time
 import requests
 from bs4 import BeautifulSoup
@@ -10,22 +11,36 @@ from pathlib import Path
 from typing import Optional
 import html2text
 import config
-from src.utils import save_text_file, clean_text, truncate_text, load_text_file
+from src.utils import clean_text, truncate_text
+from src.artifact_store import get_artifact_store
+from src.ledger import get_ledger
 
 
 class WebScraper:
     """Web scraper for job advertisements"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(config.get_headers())
-        self.h = html2text.HTML2Text()
-        self.h.ignore_links = True
-        self.h.ignore_images = True
-        self.h.body_width = 0  # Don't wrap lines
+        # Pages are scraped by MAX_WORKERS threads; requests.Session is not thread-safe, so each thread gets its own
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        self.store = get_artifact_store()
+        self.ledger = get_ledger()
         
         logging.debug("WebScraper initialized")
     
+    @property
+    def session(self) -> requests.Session:
+        """This thread's HTTP session"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(config.get_headers())
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
     # def scrape_url(self, url: str, url_id: str) -> Optional[str]:
     #     """
     #     Scrape content from a URL and return cleaned text
@@ -41,19 +56,21 @@ class WebScraper:
     def _check_cached_content(self, url_id: str) -> Optional[str]:
         """Check if we have cached scraped content"""
         
-        # Check for cleaned text file
-        text_file = config.RAW_DATA_DIR / f"{url_id}_cleaned.txt"
-        if text_file.exists():
-            try:
-                content = load_text_file(text_file)
-                if content and len(content.strip()) > 100:  # Ensure it's substantial content
-                    logging.debug(f"Found cached cleaned content for {url_id}")
-                    return content
-            except Exception as e:
-                logging.warning(f"Error reading cached content for {url_id}: {e}")
+        # Check for cleaned text artifact
+        try:
+            content = self.store.get("cleaned", url_id)
+            if content and len(content.strip()) > 100:  # Ensure it's substantial content
+                logging.debug(f"Found cached cleaned content for {url_id}")
+                return content.strip()
+        except Exception as e:
+            logging.warning(f"Error reading cached content for {url_id}: {e}")
         
         return None
 
+    def has_cached_content(self, url_id: str) -> bool:
+        """Whether scraping this URL would be served from cache"""
+        return self._check_cached_content(url_id) is not None
+
     def scrape_url(self, url: str, url_id: str, force: bool = False) -> Optional[str]:
         """
         Scrape content from URL with caching support
@@ -67,12 +84,22 @@ class WebScraper:
             Cleaned text content or None if failed
         """
         
+        start = time.perf_counter()
+        
         # Check cache first (unless force=True)
         if not force:
             cached_content = self._check_cached_content(url_id)
             if cached_content:
                 logging.info(f"Using cached content for {url_id}")
+                self.ledger.record_scrape(url, url_id, time.perf_counter() - start, cached=True, ok=True)
                 return cached_content
+        
+        content = self._fetch_content(url, url_id)
+        self.ledger.record_scrape(url, url_id, time.perf_counter() - start, cached=False, ok=content is not None)
+        return content
+    
+    def _fetch_content(self, url: str, url_id: str) -> Optional[str]:
+        """Download, extract and clean a page, saving the artifacts; None if it fails"""
         try:
             logging.debug(f"Scraping {url}")
             
@@ -86,8 +113,7 @@ class WebScraper:
             
             # Save raw HTML if configured
             if config.SAVE_RAW_HTML:
-                raw_file = config.RAW_DATA_DIR / f"{url_id}.html"
-                save_text_file(response.text, raw_file)
+                self.store.put("html", url_id, response.text)
             
             # Extract content
             content = self._extract_content(response.text, url)
@@ -96,14 +122,14 @@ class WebScraper:
                 logging.warning(f"No content extracted from {url}")
                 return None
             
-            # Clean and truncate content
+            # Clean content; without trimming, the only size control is a hard cut
             content = clean_text(content)
-            content = truncate_text(content, config.MAX_CONTENT_LENGTH)
+            if not config.TRIM_CONTENT:
+                content = truncate_text(content, config.MAX_CONTENT_LENGTH)
             
             # Save cleaned text if configured
             if config.SAVE_CLEANED_TEXT:
-                clean_file = config.RAW_DATA_DIR / f"{url_id}_cleaned.txt"
-                save_text_file(content, clean_file)
+                self.store.put("cleaned", url_id, content)
             
             logging.debug(f"Extracted {len(content)} characters from {url}")
             return content
@@ -115,21 +141,39 @@ class WebScraper:
             logging.error(f"Scraping failed for {url}: {e}")
             return None
     
+    # Containers that commonly hold the job ad, tried in order
+    JOB_SELECTORS = [
+        '[class*="job-description"]',
+        '[class*="job-detail"]',
+        '[class*="job-content"]',
+        '[id*="job-description"]',
+        '[id*="job-detail"]',
+        '.job-description',
+        '.job-details',
+        '.job-content',
+        '.description',
+        'article',
+        '[role="main"]',
+        'main'
+    ]
+    
+    # Extraction strategies in the order _extract_content tries them
+    EXTRACTION_STRATEGIES = ["job_selectors", "largest_text_block", "site_specific", "full_body"]
+    
+    # Backends for converting the selected HTML element to text
+    TEXT_BACKENDS = ["html2text", "bs4_text"]
+    
     def _extract_content(self, html: str, url: str) -> Optional[str]:
         """Extract main content from HTML"""
         try:
-            soup = BeautifulSoup(html, 'lxml')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
+            soup = self._prepare_soup(html)
             
             # Try different content extraction strategies
             content = self._try_content_extraction_strategies(soup, url)
             
             if not content:
                 # Fallback: convert entire body
-                content = self.h.handle(str(soup.body or soup))
+                content = self._extract_full_body(soup, url, self._html_to_text)
             
             return content
             
@@ -137,34 +181,82 @@ class WebScraper:
             logging.error(f"Content extraction failed: {e}")
             return None
     
+    def _prepare_soup(self, html: str) -> BeautifulSoup:
+        """Parse HTML and drop elements that never hold ad content"""
+        soup = BeautifulSoup(html, 'lxml')
+        
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "footer", "header"]):
+            script.decompose()
+        
+        return soup
+    
+    def _html_to_text(self, element) -> str:
+        """Convert an HTML element to Markdown-ish text"""
+        # A new converter per call: HTML2Text keeps parser state, so a shared one garbles concurrent pages
+        h = html2text.HTML2Text()
+        h.ignore_links = True
+        h.ignore_images = True
+        h.body_width = 0  # Don't wrap lines
+        return h.handle(str(element))
+    
+    def _get_text_backend(self, backend: str):
+        """Return the element-to-text converter for a backend name"""
+        if backend == "html2text":
+            return self._html_to_text
+        if backend == "bs4_text":
+            return lambda element: element.get_text("\n", strip=True)
+        raise ValueError(f"Unknown text backend: {backend}")
+    
+    def run_extraction_strategy(self, strategy: str, soup: BeautifulSoup, url: str,
+                                backend: str = "html2text") -> Optional[str]:
+        """
+        Run a single named extraction strategy
+        
+        Args:
+            strategy: One of EXTRACTION_STRATEGIES
+            soup: Soup prepared by _prepare_soup (not modified)
+            url: Page URL, used for site-specific rules
+            backend: One of TEXT_BACKENDS
+        
+        Returns:
+            Extracted text or None if the strategy found nothing
+        """
+        extractors = {
+            "job_selectors": self._extract_with_job_selectors,
+            "largest_text_block": self._extract_largest_text_block,
+            "site_specific": self._site_specific_extraction,
+            "full_body": self._extract_full_body,
+        }
+        if strategy not in extractors:
+            raise ValueError(f"Unknown extraction strategy: {strategy}")
+        
+        return extractors[strategy](soup, url, self._get_text_backend(backend))
+    
     def _try_content_extraction_strategies(self, soup: BeautifulSoup, url: str) -> Optional[str]:
         """Try multiple strategies to extract main content"""
         
-        # Strategy 1: Look for common job ad containers
-        job_selectors = [
-            '[class*="job-description"]',
-            '[class*="job-detail"]',
-            '[class*="job-content"]',
-            '[id*="job-description"]',
-            '[id*="job-detail"]',
-            '.job-description',
-            '.job-details',
-            '.job-content',
-            '.description',
-            'article',
-            '[role="main"]',
-            'main'
-        ]
+        for strategy in self.EXTRACTION_STRATEGIES[:-1]:  # full_body is the caller's fallback
+            content = self.run_extraction_strategy(strategy, soup, url)
+            if content:
+                return content
         
-        for selector in job_selectors:
+        return None
+    
+    def _extract_with_job_selectors(self, soup: BeautifulSoup, url: str, convert) -> Optional[str]:
+        """Strategy 1: Look for common job ad containers"""
+        for selector in self.JOB_SELECTORS:
             elements = soup.select(selector)
             if elements:
-                content = self.h.handle(str(elements[0]))
+                content = convert(elements[0])
                 if len(content.strip()) > 100:  # Minimum content length
                     logging.debug(f"Used selector: {selector}")
                     return content
         
-        # Strategy 2: Look for largest text block
+        return None
+    
+    def _extract_largest_text_block(self, soup: BeautifulSoup, url: str, convert) -> Optional[str]:
+        """Strategy 2: Look for largest text block"""
         text_elements = soup.find_all(['div', 'section', 'article'], 
                                      string=lambda text: text and len(text.strip()) > 50)
         
@@ -176,28 +268,28 @@ class WebScraper:
             # Get parent element for more context
             parent = best_element.parent
             if parent:
-                content = self.h.handle(str(parent))
+                content = convert(parent)
                 if len(content.strip()) > 100:
                     logging.debug("Used largest text block strategy")
                     return content
         
-        # Strategy 3: Site-specific extraction
-        content = self._site_specific_extraction(soup, url)
-        if content:
-            return content
-        
         return None
     
-    def _site_specific_extraction(self, soup: BeautifulSoup, url: str) -> Optional[str]:
-        """Site-specific content extraction rules"""
+    def _extract_full_body(self, soup: BeautifulSoup, url: str, convert) -> Optional[str]:
+        """Fallback: convert entire body"""
+        return convert(soup.body or soup)
+    
+    def _site_specific_extraction(self, soup: BeautifulSoup, url: str, convert=None) -> Optional[str]:
+        """Strategy 3: Site-specific content extraction rules"""
         
+        convert = convert or self._html_to_text
         domain = url.lower()
         
         # LinkedIn
         if 'linkedin.com' in domain:
             job_desc = soup.find('div', {'class': lambda x: x and 'jobs-description' in x})
             if job_desc:
-                return self.h.handle(str(job_desc))
+                return convert(job_desc)
         
         # Indeed
         elif 'indeed.com' in domain:
@@ -205,25 +297,25 @@ class WebScraper:
             if not job_desc:
                 job_desc = soup.find('div', {'class': lambda x: x and 'jobsearch-jobDescriptionText' in x})
             if job_desc:
-                return self.h.handle(str(job_desc))
+                return convert(job_desc)
         
         # Glassdoor
         elif 'glassdoor.com' in domain:
             job_desc = soup.find('div', {'class': lambda x: x and 'jobDescriptionContent' in x})
             if job_desc:
-                return self.h.handle(str(job_desc))
+                return convert(job_desc)
         
         # Monster
         elif 'monster.com' in domain:
             job_desc = soup.find('div', {'class': lambda x: x and 'job-description' in x})
             if job_desc:
-                return self.h.handle(str(job_desc))
+                return convert(job_desc)
         
         # AngelList/Wellfound
         elif 'angel.co' in domain or 'wellfound.com' in domain:
             job_desc = soup.find('div', {'class': lambda x: x and 'job-description' in x})
             if job_desc:
-                return self.h.handle(str(job_desc))
+                return convert(job_desc)
         
         return None
     
@@ -233,40 +325,21 @@ class WebScraper:
             response = self.session.get(url, timeout=config.REQUEST_TIMEOUT)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Remove scripts/styles
-            for script in soup(["script", "style"]):
-                script.decompose()
+            soup = self._prepare_soup(response.text)
             
             # Get basic info
             title = soup.title.string if soup.title else "No title"
             
-            # Try different extraction methods
+            # Try each extraction strategy on its own (same ones the pipeline uses)
             strategies = {}
-            
-            # Method 1: Job-specific selectors
-            job_selectors = [
-                '[class*="job-description"]', '[class*="job-detail"]', 
-                '.job-description', '.description', 'article', 'main'
-            ]
-            
-            for selector in job_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content = self.h.handle(str(elements[0]))
-                    strategies[f"selector_{selector}"] = {
+            for strategy in self.EXTRACTION_STRATEGIES:
+                content = self.run_extraction_strategy(strategy, soup, url)
+                if content:
+                    strategies[strategy] = {
                         "length": len(content),
                         "preview": content[:200] + "..." if len(content) > 200 else content
                     }
             
-            # Method 2: Full body
-            body_content = self.h.handle(str(soup.body or soup))
-            strategies["full_body"] = {
-                "length": len(body_content),
-                "preview": body_content[:200] + "..." if len(body_content) > 200 else body_content
-            }
-            
             return {
                 "url": url,
                 "status_code": response.status_code,
@@ -284,10 +357,13 @@ class WebScraper:
             }
     
     def close(self):
-        """Close the session"""
-        if self.session:
-            self.session.close()
-            logging.debug("WebScraper session closed")
+        """Close every thread's session"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+        logging.debug(f"WebScraper sessions closed ({len(sessions)})")
     
     def __enter__(self):
         return self
@@ -0,0 +1,273 @@
+"""
+Token-budget-aware content trimming for Job Ad Analyzer
+
+Shrinks cleaned job ad text before it is sent to the LLM: drops lines that recur
+across many pages of the same site (menus, cookie banners, "similar jobs"),
+removes repeated paragraphs, and if the ad is still over budget keeps the
+sections most likely to describe the job instead of chopping off the tail.
+"""
+
+import logging
+import hashlib
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import config
+from src.artifact_store import get_artifact_store
+from src.utils import estimate_tokens, extract_domain
+
+
+# Words that mark job-relevant sections, with weights (English and Farsi)
+RELEVANCE_KEYWORDS = {
+    "requirement": 3, "qualification": 3, "responsibilit": 3, "experience": 2,
+    "skill": 2, "salary": 3, "compensation": 3, "benefit": 2, "pay": 1,
+    "remote": 2, "hybrid": 2, "location": 1, "degree": 2, "education": 2,
+    "years": 1, "must": 1, "role": 1, "duties": 2, "you will": 2, "we offer": 2,
+    "about the job": 2, "job description": 3, "full-time": 1, "part-time": 1, "contract": 1,
+    "حقوق": 3, "مزایا": 2, "شرایط": 2, "مهارت": 2, "تجربه": 2, "سابقه": 2,
+    "وظایف": 3, "نیازمندی": 3, "تحصیلات": 2, "دورکاری": 2, "شرح شغل": 3,
+}
+
+MIN_PARTIAL_SECTION_TOKENS = 32  # Smallest leftover budget worth filling with a section's beginning
+
+HEADING_PATTERN = re.compile(r"^(#{1,6}\s|\*\*[^*]+\*\*:?$|[^.!?]{2,60}:$)")
+
+
+def _line_hash(line: str) -> str:
+    normalized = re.sub(r"\s+", " ", line.strip().lower())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class ContentTrimmer:
+    """
+    Fit job ad content into a token budget without losing the parts that matter
+
+    Boilerplate is judged against each site's index as it was stored when the
+    run first saw the site, so a page trims the same however many pages of
+    the site come before it and in whatever order threads get to them. Pages
+    new to the index are collected on the side and merged into it by save()
+    at the end of the run.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget or config.LLM_INPUT_TOKEN_BUDGET
+        self.store = get_artifact_store()
+        self._snapshots = {}  # domain -> stored index frozen for this run: {"documents": set, "line_counts": {...}}
+        self._learned = {}  # domain -> {url_id: line hashes} of pages not in the stored index yet
+        self._lock = threading.Lock()
+        self.stats = {
+            "ads_trimmed": 0,
+            "tokens_before": 0,
+            "tokens_after": 0,
+            "boilerplate_lines_removed": 0,
+            "duplicate_paragraphs_removed": 0,
+            "sections_dropped": 0,
+        }
+        logging.debug(f"ContentTrimmer initialized with budget: {self.token_budget} tokens")
+
+    def trim(self, content: str, url: str, url_id: str) -> str:
+        """
+        Trim job ad content to the configured token budget
+
+        Args:
+            content: Cleaned job ad text
+            url: Source URL, used to learn per-site boilerplate
+            url_id: Unique identifier, so a page is only counted once per site
+
+        Returns:
+            Trimmed content
+        """
+        tokens_before = estimate_tokens(content)
+        domain = extract_domain(url)
+
+        line_hashes = {_line_hash(line) for line in content.split("\n") if line.strip()}
+        boilerplate = self._get_boilerplate(domain, url_id, line_hashes)
+        text, boilerplate_removed = self._remove_boilerplate(content, boilerplate)
+        text, duplicates_removed = self._dedup_paragraphs(text)
+
+        sections_dropped = 0
+        if estimate_tokens(text) > self.token_budget:
+            text, sections_dropped = self._fit_budget(text)
+
+        tokens_after = estimate_tokens(text)
+
+        with self._lock:
+            self.stats["ads_trimmed"] += 1
+            self.stats["tokens_before"] += tokens_before
+            self.stats["tokens_after"] += tokens_after
+            self.stats["boilerplate_lines_removed"] += boilerplate_removed
+            self.stats["duplicate_paragraphs_removed"] += duplicates_removed
+            self.stats["sections_dropped"] += sections_dropped
+
+        logging.debug(
+            f"Trimmed {url_id} from {tokens_before} to {tokens_after} tokens "
+            f"({boilerplate_removed} boilerplate lines, {duplicates_removed} duplicate paragraphs, "
+            f"{sections_dropped} sections dropped)"
+        )
+        return text
+
+    def _snapshot(self, domain: str) -> Dict[str, Any]:
+        """The site's stored index, loaded once per run (callers hold the lock)"""
+        index = self._snapshots.get(domain)
+        if index is None:
+            index = self.store.get_json("boilerplate", domain) or {"documents": [], "line_counts": {}}
+            index["documents"] = set(index["documents"])
+            self._snapshots[domain] = index
+        return index
+
+    def _get_boilerplate(self, domain: str, url_id: str, line_hashes: set) -> set:
+        """Note the page for save() if the site's index lacks it and return its lines common enough to be boilerplate"""
+        with self._lock:
+            index = self._snapshot(domain)
+            if url_id not in index["documents"]:
+                self._learned.setdefault(domain, {})[url_id] = line_hashes
+
+            documents = len(index["documents"])
+            if documents < config.TRIM_BOILERPLATE_MIN_DOCS:
+                return set()
+
+            threshold = max(config.TRIM_BOILERPLATE_MIN_DOCS, config.TRIM_BOILERPLATE_MIN_RATIO * documents)
+            return {
+                line_hash for line_hash in line_hashes
+                if index["line_counts"].get(line_hash, 0) >= threshold
+            }
+
+    def save(self) -> int:
+        """
+        Merge the pages trimmed this run into the stored indexes, one write per site
+
+        The stored index is read again first, so pages another run added in
+        the meantime are kept and not counted twice. Trimming in this run
+        keeps using the indexes as they were loaded.
+
+        Returns:
+            Number of pages added
+        """
+        with self._lock:
+            learned, self._learned = self._learned, {}
+
+        added = 0
+        for domain, pages in learned.items():
+            index = self.store.get_json("boilerplate", domain) or {"documents": [], "line_counts": {}}
+            documents = set(index["documents"])
+            for url_id, line_hashes in pages.items():
+                if url_id in documents:
+                    continue
+                documents.add(url_id)
+                for line_hash in line_hashes:
+                    index["line_counts"][line_hash] = index["line_counts"].get(line_hash, 0) + 1
+                added += 1
+            self.store.put_json("boilerplate", domain, {"documents": sorted(documents), "line_counts": index["line_counts"]})
+
+        if added:
+            logging.info(f"Added {added} pages to the boilerplate indexes of {len(learned)} sites")
+        return added
+
+    def _remove_boilerplate(self, content: str, boilerplate: set) -> Tuple[str, int]:
+        if not boilerplate:
+            return content, 0
+
+        kept, removed = [], 0
+        for line in content.split("\n"):
+            if line.strip() and _line_hash(line) in boilerplate and not self._is_protected_line(line):
+                removed += 1
+            else:
+                kept.append(line)
+
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip(), removed
+
+    def _is_protected_line(self, line: str) -> bool:
+        """
+        Headings and lines naming requirements, duties or pay are kept even if many
+        ads on the site share them (headings are needed to split sections later)
+        """
+        if HEADING_PATTERN.match(line.strip()):
+            return True
+        lowered = line.lower()
+        return any(weight >= 3 and keyword in lowered for keyword, weight in RELEVANCE_KEYWORDS.items())
+
+    def _dedup_paragraphs(self, content: str) -> Tuple[str, int]:
+        seen = set()
+        kept, removed = [], 0
+
+        for paragraph in content.split("\n\n"):
+            key = _line_hash(paragraph)
+            if paragraph.strip() and key in seen:
+                removed += 1
+                continue
+            seen.add(key)
+            kept.append(paragraph)
+
+        return "\n\n".join(kept), removed
+
+    def _split_sections(self, content: str) -> List[str]:
+        """Split into sections at headings, or at paragraphs if there are none"""
+        sections, current = [], []
+
+        for line in content.split("\n"):
+            if current and HEADING_PATTERN.match(line.strip()):
+                sections.append("\n".join(current))
+                current = []
+            current.append(line)
+        if current:
+            sections.append("\n".join(current))
+
+        if len(sections) <= 1:
+            sections = content.split("\n\n")
+        if len(sections) <= 1:
+            # Flattened text from older caches: fall back to sentence groups
+            sentences = re.split(r"(?<=[.!?؟])\s+", content)
+            sections = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+
+        return [section for section in sections if section.strip()]
+
+    def _score_section(self, section: str, position: int) -> float:
+        lowered = section.lower()
+        keyword_score = sum(weight for keyword, weight in RELEVANCE_KEYWORDS.items() if keyword in lowered)
+
+        # The opening section usually holds title, company and location
+        position_bonus = 3 if position == 0 else 0
+
+        # Navigation leftovers are many very short lines
+        lines = [line for line in section.split("\n") if line.strip()]
+        short_ratio = sum(1 for line in lines if len(line.split()) <= 3) / len(lines) if lines else 1
+        nav_penalty = 3 * short_ratio if len(lines) > 3 else 0
+
+        return (keyword_score + position_bonus - nav_penalty) / math.sqrt(max(estimate_tokens(section), 1))
+
+    def _fit_budget(self, content: str) -> Tuple[str, int]:
+        """Keep the highest-scoring sections that fit the budget, in their original order"""
+        sections = self._split_sections(content)
+        ranked = sorted(
+            range(len(sections)),
+            key=lambda i: self._score_section(sections[i], i),
+            reverse=True
+        )
+
+        selected = {}
+        remaining = self.token_budget
+        for i in ranked:
+            tokens = estimate_tokens(sections[i])
+            if tokens <= remaining:
+                selected[i] = sections[i]
+                remaining -= tokens
+            elif remaining >= MIN_PARTIAL_SECTION_TOKENS:
+                # Doesn't fit whole: keep its beginning with the budget that is left
+                ratio = remaining / tokens
+                selected[i] = sections[i][:int(len(sections[i]) * ratio)].rsplit(" ", 1)[0] + "..."
+                remaining = 0
+
+            if remaining <= 0:
+                break
+
+        kept = [selected[i] for i in sorted(selected)]
+        return "\n\n".join(kept), len(sections) - len(kept)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals for the run report"""
+        with self._lock:
+            stats = dict(self.stats)
+        if stats["tokens_before"]:
+            stats["token_reduction"] = round(1 - stats["tokens_after"] / stats["tokens_before"], 3)
+        return stats
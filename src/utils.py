@@ -5,6 +5,8 @@ Utility functions for Job Ad Analyzer
 import logging
 import os
 import json
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from logging.handlers import RotatingFileHandler
@@ -52,6 +54,7 @@ def ensure_directories():
         config.RAW_DATA_DIR,
         config.PROCESSED_DATA_DIR,
         config.OUTPUT_DIR,
+        config.BATCH_DIR,
         config.LOGS_DIR
     ]
     
@@ -104,15 +107,25 @@ def save_json_file(data: Any, file_path: Path, indent: int = 2):
         raise
 
 
+def touch_file(file_path: Path):
+    """Record an access on a cached file without changing its modification time"""
+    try:
+        stat = file_path.stat()
+        os.utime(file_path, (time.time(), stat.st_mtime))
+    except OSError as e:
+        logging.debug(f"Could not update access time for {file_path}: {e}")
+
+
 def clean_text(text: str) -> str:
     """Clean and normalize text content"""
     if not text:
         return ""
     
-    # Remove excessive whitespace
+    # Remove excessive whitespace, keeping line and paragraph breaks
     import re
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r'[^\S\n]+', ' ', text)
+    text = re.sub(r' *\n *', '\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
     
     # Remove HTML entities that might have been missed
     import html
@@ -136,6 +149,56 @@ def truncate_text(text: str, max_length: int) -> str:
         return truncated + "..."
 
 
+@lru_cache(maxsize=8)
+def _get_tokenizer(model: str):
+    """Load the tiktoken encoding for a model, or None if unavailable"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")  # Unknown model (e.g. a local one): the newest OpenAI encoding
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails offline
+        logging.debug(f"Tokenizer unavailable for {model}: {e}")
+        return None
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with the model's tokenizer, falling back to ~4 characters per token"""
+    tokenizer = _get_tokenizer(model or config.LLM_MODEL)
+    if tokenizer is None:
+        return len(text) // 4
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+
+def estimate_cost(model: str, usage: Optional[Dict[str, Any]]) -> Optional[float]:
+    """
+    USD cost of one LLM call from its usage metadata and config.LLM_MODEL_PRICES
+    
+    Prices are looked up by the longest key the model name starts with, so
+    dated snapshots (gpt-4o-2024-08-06) use their family's price. Returns None
+    for models without a price.
+    """
+    matches = [name for name in config.LLM_MODEL_PRICES if model.startswith(name)]
+    if not matches or not usage:
+        return None
+    
+    prices = config.LLM_MODEL_PRICES[max(matches, key=len)]
+    cached = ((usage.get("input_token_details") or {}).get("cache_read") or 0)
+    uncached = (usage.get("input_tokens") or 0) - cached
+    cost = (
+        uncached * prices["input"]
+        + cached * prices.get("cached_input", prices["input"])
+        + (usage.get("output_tokens") or 0) * prices["output"]
+    )
+    return cost / 1_000_000
+
+
 def extract_domain(url: str) -> str:
     """Extract domain from URL"""
     try:
@@ -146,18 +209,33 @@ def extract_domain(url: str) -> str:
         return "unknown"
 
 
-def validate_json_structure(data: Dict[str, Any], required_fields: List[str] = None) -> bool:
-    """Validate JSON data structure"""
+def validate_json_structure(data: Dict[str, Any], required_fields: List[str] = None,
+                            master_prompt: Optional[str] = None) -> bool:
+    """
+    Validate an LLM answer against REQUIRED_JSON_FIELDS and EXPECTED_DATA_TYPES
+    
+    Args:
+        data: Parsed (cleaned) answer
+        required_fields: Overrides config.REQUIRED_JSON_FIELDS
+        master_prompt: Prompt the answer is for; its JSON template locates nested fields
+    """
+    from src.prompts import extract_json_template
+    from src.validation import ResponseValidator, get_validator
+    
     if not isinstance(data, dict):
         return False
     
-    if required_fields:
-        for field in required_fields:
-            if field not in data:
-                logging.warning(f"Missing required field: {field}")
-                return False
+    if required_fields is None:
+        validator = get_validator(master_prompt)
+    else:
+        validator = ResponseValidator(
+            extract_json_template(master_prompt) if master_prompt else None, required_fields=required_fields
+        )
     
-    return True
+    issues = validator.validate(data)
+    for issue in issues:
+        logging.warning(f"Invalid field {issue.field}: {issue.problem} ({issue.detail})")
+    return not issues
 
 
 def safe_get_nested(data: Dict[str, Any], keys: List[str], default: Any = None) -> Any:
@@ -171,6 +249,42 @@ def safe_get_nested(data: Dict[str, Any], keys: List[str], default: Any = None)
     return current
 
 
+def flatten_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten the nested LLM analysis into the columns named in config.EXPECTED_DATA_TYPES"""
+    flattened = {}
+    
+    # Handle standard extraction
+    if isinstance(data.get('standard_extraction'), dict):
+        for key, value in data['standard_extraction'].items():
+            flattened[key] = value
+    
+    # Handle payment analysis (keys are lowercased when the response is cleaned)
+    payment = data.get('payment_analysis')
+    if isinstance(payment, dict):
+        flattened['estimated_salary_irr'] = payment.get('estimated_range_irr', payment.get('estimated_range_IRR'))
+        flattened['salary_reasoning'] = payment.get('reasoning')
+    
+    # Handle candidate fit
+    fit = data.get('candidate_fit')
+    if isinstance(fit, dict):
+        flattened['fit_tier'] = fit.get('tier')
+        flattened['fit_summary'] = fit.get('summary')
+        flattened['fit_strengths'] = ', '.join(fit.get('strengths') or [])
+        flattened['fit_gaps'] = ', '.join(fit.get('gaps') or [])
+    
+    # Handle overqualified assessment
+    overqualified = data.get('is_overqualified')
+    if isinstance(overqualified, dict):
+        flattened['is_overqualified'] = overqualified.get('value')
+        flattened['overqualified_reasoning'] = overqualified.get('reasoning')
+    
+    # Handle growth potential
+    if 'growth_potential' in data:
+        flattened['growth_potential'] = data['growth_potential']
+    
+    return flattened
+
+
 def normalize_salary(salary_str: str) -> Optional[float]:
     """Normalize salary string to float"""
     if not salary_str:
@@ -305,6 +419,18 @@ def get_file_size_mb(file_path: Path) -> float:
         return 0.0
 
 
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile (pct in 0-100) of a list of numbers"""
+    if not values:
+        return None
+    
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
 def format_duration(seconds: float) -> str:
     """Format duration in human readable format"""
     if seconds < 60:
@@ -0,0 +1,188 @@
+"""
+Response validation for Job Ad Analyzer
+"""
+
+import copy
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import config
+from src.prompts import extract_json_template
+from src.utils import flatten_analysis
+
+
+class FieldRule(NamedTuple):
+    """What a valid answer looks like for one field"""
+    field: str  # Flattened name (EXPECTED_DATA_TYPES) or top-level section name
+    path: Optional[Tuple[str, ...]]  # Where the field lives in the nested answer, if the template says
+    types: Tuple[type, ...]  # Allowed types of a non-null value
+    required: bool  # Null or empty counts as missing
+    container: Optional[type] = None  # list or dict when the template has one there
+
+
+class FieldIssue(NamedTuple):
+    field: str
+    path: Optional[Tuple[str, ...]]
+    problem: str  # "missing" or "wrong_type"
+    detail: str
+
+
+def _normalize_keys(template: Any) -> Any:
+    """Template with keys normalized the way LLMClient._clean_parsed_data normalizes answers"""
+    if not isinstance(template, dict):
+        return template
+    return {
+        key.strip().lower().replace(' ', '_').replace('-', '_'): _normalize_keys(value)
+        for key, value in template.items()
+    }
+
+
+def _walk_leaves(template: Any, path: Tuple[str, ...] = ()):
+    """Yield (path, value) for every leaf of a JSON template; lists are leaves"""
+    if isinstance(template, dict) and template:
+        for key, value in template.items():
+            yield from _walk_leaves(value, path + (key,))
+    else:
+        yield path, template
+
+
+def leaf_paths(data: Any) -> List[Tuple[str, ...]]:
+    """Paths of every leaf of a template or answer, in order; lists, nulls and empty objects are leaves"""
+    return [path for path, _ in _walk_leaves(data) if path]
+
+
+def set_path(data: Dict[str, Any], path: Tuple[str, ...], value: Any) -> None:
+    """Set a nested key, replacing anything on the way that isn't an object"""
+    for key in path[:-1]:
+        if not isinstance(data.get(key), dict):
+            data[key] = {}
+        data = data[key]
+    data[path[-1]] = value
+
+
+def get_path(data: Any, path: Tuple[str, ...]) -> Tuple[bool, Any]:
+    """(present, value) of a nested key"""
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return False, None
+        data = data[key]
+    return True, data
+
+
+def _find_path(data: Any, target: Any, path: Tuple[str, ...] = ()) -> Optional[Tuple[str, ...]]:
+    """Path of the object that is target (by identity)"""
+    if data is target:
+        return path
+    if isinstance(data, dict):
+        for key, value in data.items():
+            found = _find_path(value, target, path + (key,))
+            if found is not None:
+                return found
+    return None
+
+
+class ResponseValidator:
+    """
+    Checks a parsed analysis against config.EXPECTED_DATA_TYPES and config.REQUIRED_JSON_FIELDS
+
+    The rules are compiled once per master prompt: the template is probed
+    with a marker in every leaf and run through flatten_analysis(), which
+    tells where each flattened column comes from in the nested answer. A
+    field is missing if its key is absent (or null/empty when it is
+    required), and of the wrong type if a non-null value doesn't match
+    EXPECTED_DATA_TYPES. Fields from lists or sections in the template
+    (fit_strengths, growth_potential) must be a list or an object there.
+    Without a template, the flattened answer is checked instead.
+    """
+
+    def __init__(self, template: Optional[Dict[str, Any]] = None,
+                 expected_types: Optional[Dict[str, Any]] = None,
+                 required_fields: Optional[List[str]] = None):
+        self.template = _normalize_keys(template) if template else None
+        self.expected_types = config.EXPECTED_DATA_TYPES if expected_types is None else expected_types
+        self.required_fields = config.REQUIRED_JSON_FIELDS if required_fields is None else required_fields
+        self.rules = self._compile()
+
+    def _compile(self) -> List[FieldRule]:
+        paths, containers = {}, {}
+        if self.template:
+            probe = copy.deepcopy(self.template)
+            markers = {}
+            for index, (path, example) in enumerate(list(_walk_leaves(probe))):
+                marker = f"\x00field{index}\x00"
+                markers[marker] = (path, type(example) if isinstance(example, (list, dict)) else None)
+                set_path(probe, path, [marker] if isinstance(example, list) else marker)
+
+            for field, value in flatten_analysis(probe).items():
+                if isinstance(value, str) and value in markers:
+                    paths[field], containers[field] = markers[value]
+                elif isinstance(value, (dict, list)):
+                    paths[field], containers[field] = _find_path(probe, value), type(value)
+
+        rules = []
+        for field, expected in self.expected_types.items():
+            if self.template and field not in paths:
+                continue  # This prompt doesn't ask for it
+            rules.append(FieldRule(
+                field=field,
+                path=paths.get(field),
+                types=expected if isinstance(expected, tuple) else (expected,),
+                required=field in self.required_fields,
+                container=containers.get(field)
+            ))
+
+        for field in self.required_fields:
+            if field in self.expected_types:
+                continue
+            section = self.template.get(field) if self.template else None
+            rules.append(FieldRule(
+                field=field,
+                path=(field,),
+                types=(type(section),) if section is not None else (object,),
+                required=True,
+                container=type(section) if isinstance(section, (list, dict)) else None
+            ))
+        return rules
+
+    def validate(self, data: Any) -> List[FieldIssue]:
+        """Every missing or wrongly typed field in a parsed answer (empty if it is valid)"""
+        if not isinstance(data, dict):
+            return [FieldIssue("", (), "wrong_type", "answer is not a JSON object")]
+
+        flattened = flatten_analysis(data)
+        issues = []
+        for rule in self.rules:
+            if rule.path:
+                present, value = get_path(data, rule.path)
+            else:
+                present, value = rule.field in flattened, flattened.get(rule.field)
+
+            if not present:
+                if rule.path or rule.required:  # Without a template, absent just means not asked for
+                    issues.append(FieldIssue(rule.field, rule.path, "missing", "absent"))
+            elif value is None or value == "" or value == [] or value == {}:
+                if rule.required:
+                    issues.append(FieldIssue(rule.field, rule.path, "missing", "null or empty"))
+            elif not self._type_ok(rule, value):
+                expected = rule.container.__name__ if rule.container else "/".join(t.__name__ for t in rule.types)
+                issues.append(FieldIssue(rule.field, rule.path, "wrong_type", f"expected {expected}, got {type(value).__name__}"))
+        return issues
+
+    @staticmethod
+    def _type_ok(rule: FieldRule, value: Any) -> bool:
+        if rule.container is list:
+            return isinstance(value, list)
+        if rule.container is dict:
+            return isinstance(value, dict) or isinstance(value, rule.types)
+        if isinstance(value, bool) and str in rule.types:
+            return True  # clean_parsed_data() turns the strings "yes"/"no"/"true"/"false" into booleans
+        if isinstance(value, bool) and bool not in rule.types:
+            return False  # bool is an int subclass, but True isn't a salary
+        if isinstance(value, int) and float in rule.types:
+            return True
+        return isinstance(value, rule.types)
+
+
+@lru_cache(maxsize=16)
+def get_validator(master_prompt: Optional[str] = None) -> ResponseValidator:
+    """Validator compiled for a master prompt's JSON template (or for the flattened fields without one)"""
+    return ResponseValidator(extract_json_template(master_prompt) if master_prompt else None)
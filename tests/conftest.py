@@ -0,0 +1,27 @@
+"""
+Shared test setup for Job Ad Analyzer
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "test")  # config refuses to load without one; no test calls the API
+
+import config
+
+
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    """Point the data directories (and with them the file artifact store) at a temporary one"""
+    monkeypatch.setattr(config, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(config, "RAW_DATA_DIR", tmp_path / "raw")
+    monkeypatch.setattr(config, "PROCESSED_DATA_DIR", tmp_path / "processed")
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(config, "ARTIFACT_DB_FILE", tmp_path / "artifacts.sqlite3")
+    for directory in ("raw", "processed", "output"):
+        (tmp_path / directory).mkdir()
+    return tmp_path
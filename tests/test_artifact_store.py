@@ -0,0 +1,94 @@
+"""
+Tests for the artifact stores
+"""
+
+import sqlite3
+
+from src import artifact_store
+from src.artifact_store import ARTIFACT_KINDS, FileArtifactStore, SQLiteArtifactStore, copy_artifacts
+
+
+def blob_count(store):
+    return sqlite3.connect(str(store.db_path)).execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+
+
+def test_put_get_round_trip(tmp_path):
+    store = SQLiteArtifactStore(tmp_path / "artifacts.sqlite3")
+    store.put("cleaned", "url_001", "متن آگهی\nSenior engineer")
+    store.put_json("result", "url_001", {"url_id": "url_001", "data": {"salary_min": 1.5}})
+
+    assert store.get("cleaned", "url_001") == "متن آگهی\nSenior engineer"
+    assert store.get_json("result", "url_001") == {"url_id": "url_001", "data": {"salary_min": 1.5}}
+    assert store.get("cleaned", "url_002") is None
+    assert store.get("html", "url_001") is None  # Same key, other kind
+    assert store.keys("cleaned") == ["url_001"]
+    assert store.get_many("cleaned", ["url_001", "url_002"]) == {"url_001": "متن آگهی\nSenior engineer"}
+
+    store.put("cleaned", "url_001", "changed")
+    assert store.get("cleaned", "url_001") == "changed"
+
+
+def test_identical_contents_are_stored_once(tmp_path):
+    store = SQLiteArtifactStore(tmp_path / "artifacts.sqlite3")
+    store.put_many("html", {"url_001": "<p>same</p>", "url_002": "<p>same</p>"})
+    store.put("cleaned", "url_003", "<p>same</p>")
+    assert blob_count(store) == 1
+    assert len(store.entries()) == 3
+
+    store.put("html", "url_002", "<p>other</p>")
+    assert blob_count(store) == 2
+
+
+def test_delete_collects_orphaned_blobs(tmp_path):
+    store = SQLiteArtifactStore(tmp_path / "artifacts.sqlite3")
+    store.put_many("html", {"url_001": "shared", "url_002": "shared", "url_003": "own"})
+
+    assert store.delete("html", "url_003")
+    assert blob_count(store) == 1
+    assert store.delete("html", "url_001")
+    assert blob_count(store) == 1  # Still referenced by url_002
+    assert store.get("html", "url_002") == "shared"
+    assert store.delete("html", "url_002")
+    assert blob_count(store) == 0
+    assert not store.delete("html", "url_002")
+
+    store.put("html", "url_004", "first")
+    store.put("html", "url_004", "second")  # Overwriting orphans the first content too
+    assert blob_count(store) == 1
+
+
+def test_import_and_export_keep_the_file_layout(tmp_path, monkeypatch):
+    files = FileArtifactStore(tmp_path / "raw", tmp_path / "processed")
+    artifacts = {
+        "html": {"url_001": "<html>ad</html>"},
+        "cleaned": {"url_001": "ad text"},
+        "result": {"url_001": '{"url_id": "url_001"}', "url_002_alice": '{"url_id": "url_002"}'},
+        "llm_response": {"url_001": "{}"},
+        "failed_response": {"url_002": "not json"},
+        "boilerplate": {"jobs.example": '{"documents": []}'},
+        "llm_cache": {"ab12": "{}"},
+        "fingerprint": {"cd34": "{}"},
+    }
+    assert sorted(artifacts) == sorted(ARTIFACT_KINDS)
+    for kind, items in artifacts.items():
+        files.put_many(kind, items)
+
+    monkeypatch.setattr(artifact_store, "COPY_CHUNK_SIZE", 1)  # Several chunks per kind
+    database = SQLiteArtifactStore(tmp_path / "artifacts.sqlite3")
+    counts = copy_artifacts(files, database)
+    assert counts == {kind: len(items) for kind, items in artifacts.items()}
+
+    exported = FileArtifactStore(tmp_path / "export_raw", tmp_path / "export_processed")
+    copy_artifacts(database, exported)
+    for kind, items in artifacts.items():
+        assert database.get_many(kind) == items
+        assert exported.get_many(kind) == items
+    assert (tmp_path / "export_raw" / "url_001_cleaned.txt").read_text(encoding="utf-8") == "ad text"
+    assert (tmp_path / "export_processed" / "llm_cache" / "ab12.json").exists()
+    assert sorted(
+        (entry["kind"], entry["path"].relative_to(tmp_path / "export_processed").as_posix())
+        for entry in exported.entries() if entry["path"].is_relative_to(tmp_path / "export_processed")
+    ) == sorted(
+        (entry["kind"], entry["path"].relative_to(tmp_path / "processed").as_posix())
+        for entry in files.entries() if entry["path"].is_relative_to(tmp_path / "processed")
+    )
@@ -0,0 +1,35 @@
+"""
+Tests for cache eviction
+"""
+
+import os
+import time
+
+import config
+from src.artifact_store import get_artifact_store
+from src.cache_manager import CacheManager
+
+
+def test_failed_responses_survive_ttl_and_quota(data_dirs):
+    store = get_artifact_store()
+    store.put("failed_response", "url_001", "not json " * 1000)
+    store.put("html", "url_001", "<html>" + "x" * 10000 + "</html>")
+    year_ago = time.time() - 365 * 24 * 3600
+    for path in (config.PROCESSED_DATA_DIR / "url_001_failed_response.txt", config.RAW_DATA_DIR / "url_001.html"):
+        os.utime(path, (year_ago, year_ago))
+
+    CacheManager(max_bytes=1).enforce_quota()
+
+    assert store.get("failed_response", "url_001", touch=False) is not None
+    assert store.get("html", "url_001", touch=False) is None
+
+
+def test_results_are_never_evicted(data_dirs):
+    store = get_artifact_store()
+    store.put_json("result", "url_001", {"url_id": "url_001", "data": {"summary": "x" * 10000}})
+    store.put("cleaned", "url_001", "y" * 10000)
+
+    CacheManager(max_bytes=1).enforce_quota()
+
+    assert store.get("result", "url_001", touch=False) is not None
+    assert store.get("cleaned", "url_001", touch=False) is None
@@ -0,0 +1,54 @@
+"""
+Tests for repost detection
+"""
+
+from src.artifact_store import get_artifact_store
+from src.fingerprint import RepostIndex, content_fingerprint, normalize_content
+
+AD = """Senior Data Engineer
+Job ID: REQ-20931 | Posted 3 days ago | 120 applicants
+Apply at https://jobs.example/apply?utm_source=board&ref=abc123
+Closing date: 15 May 2024
+Salary: 90,000 - 110,000 EUR. Python, SQL and Spark required."""
+
+REPOST = """Senior  Data Engineer
+Job ID: REQ-31877 | Posted today | 4 applicants
+Apply at https://jobs.example/apply?utm_source=mail&ref=zz9
+Closing date: 2024-06-30
+Salary: 90,000 - 110,000 EUR.  Python, SQL and Spark required."""
+
+
+def test_reposts_with_new_ids_dates_and_links_share_a_fingerprint():
+    assert normalize_content(AD) == normalize_content(REPOST)
+    assert content_fingerprint(AD) == content_fingerprint(REPOST)
+
+
+def test_changed_terms_change_the_fingerprint():
+    assert content_fingerprint(AD) != content_fingerprint(AD.replace("90,000", "95,000"))
+    assert content_fingerprint(AD) != content_fingerprint(AD.replace("Spark", "Kafka"))
+
+
+def test_ads_differing_only_in_salary_range_differ():
+    ad = "Backend developer\nJob ID: {} | tracking 3f2a9c1d-7e6b-4a0c-9d8e-1b2c3d4e5f60\nSalary: {} IRR per month"
+    low = ad.format("REQ-20931", "15000000-20000000")
+    high = ad.format("REQ-31877", "25000000-30000000")
+    assert content_fingerprint(low) != content_fingerprint(high)
+    assert content_fingerprint(low) == content_fingerprint(ad.format("REQ-31877", "15000000-20000000"))
+    assert content_fingerprint("job 15000000-20000000") != content_fingerprint("job 25000000-30000000")
+
+
+def test_lookup_finds_only_matching_successful_results(data_dirs):
+    store = get_artifact_store()
+    store.put_json("result", "old", {"url_id": "old", "data": {"job_title": "X"}, "analysis_signature": "sig"})
+    store.put_json("result", "failed", {"url_id": "failed", "data": None, "analysis_signature": "sig"})
+    index = RepostIndex(store)
+    fingerprint = content_fingerprint(AD)
+
+    index.remember(fingerprint, "sig", "old")
+    assert index.lookup(content_fingerprint(REPOST), "sig")["url_id"] == "old"
+    assert index.lookup(fingerprint, "other prompt") is None
+    assert index.lookup(fingerprint, "sig", exclude_key="old") is None
+
+    index.remember(fingerprint, "sig", "failed")
+    assert index.lookup(fingerprint, "sig") is None
+    assert index.get_stats() == {"lookups": 4, "reused": 1, "indexed": 2, "reuse_rate": 0.25}
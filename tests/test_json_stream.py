@@ -0,0 +1,88 @@
+"""
+Tests for incremental parsing of streamed JSON
+"""
+
+import json
+
+import pytest
+
+from src.json_stream import IncrementalJSONParser, MalformedStreamError
+
+ANSWER = json.dumps({
+    "job_title": "Backend \"Python\" dev, {remote}",
+    "path": "C:\\jobs\\new",
+    "standard_extraction": {"skills": ["SQL", "a,b", "}]"], "salary": {"min": 1, "max": 2}},
+    "remote_work": True,
+    "note": "آگهی \u0634\u063a\u0644\u06cc \\\" done",
+}, ensure_ascii=False)
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    fields = []
+    for start in range(0, len(text), size):
+        fields.extend(parser.feed(text[start:start + size]))
+    return parser, fields
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(ANSWER)])
+def test_any_chunking_gives_the_same_fields(size):
+    parser, fields = feed_in_chunks(ANSWER, size)
+    expected = json.loads(ANSWER)
+    assert fields == list(expected.items())
+    assert parser.result() == expected
+    assert parser.done
+
+
+def test_fields_are_emitted_as_soon_as_they_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"title": "Dev", "fit": {"tier": "A", ') == [("title", "Dev")]
+    assert parser.feed('"gaps": ["x, y"]}') == []  # The nested object is still open at top level
+    assert parser.feed(', "remote"') == [("fit", {"tier": "A", "gaps": ["x, y"]})]
+    assert parser.result() is None
+    assert parser.feed(': false}') == [("remote", False)]
+    assert parser.result() == {"title": "Dev", "fit": {"tier": "A", "gaps": ["x, y"]}, "remote": False}
+
+
+def test_escaped_quote_split_across_chunks():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": "say \\') == []
+    assert parser.feed('", still a string, "') == []
+    assert parser.feed(', "b": 2}') == [("a", 'say ", still a string, '), ("b", 2)]
+
+
+def test_code_fence_and_trailing_text_are_allowed():
+    parser, fields = feed_in_chunks('```json\n{"a": 1}\n```\nHope this helps!', 4)
+    assert fields == [("a", 1)]
+    assert parser.result() == {"a": 1}
+
+
+@pytest.mark.parametrize("text", [
+    "Sure! Here is the analysis: {",
+    "`x",
+    "```json\nThe ad says",
+])
+def test_prose_instead_of_an_object_aborts_early(text):
+    parser = IncrementalJSONParser()
+    with pytest.raises(MalformedStreamError):
+        for char in text:
+            parser.feed(char)
+    assert parser.error
+
+
+def test_malformed_field_aborts_and_stays_aborted():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": 1, ') == [("a", 1)]
+    with pytest.raises(MalformedStreamError, match="Malformed field"):
+        parser.feed('"b": undefined, "c": 3}')
+    with pytest.raises(MalformedStreamError):
+        parser.feed("}")
+    assert parser.fields == {"a": 1}
+
+
+def test_waits_while_only_whitespace_or_a_fence_line_arrived():
+    parser = IncrementalJSONParser()
+    assert parser.feed("  \n") == []
+    assert parser.feed("```js") == []
+    assert parser.feed("on\n") == []
+    assert parser.feed('{"a": [1, 2]}') == [("a", [1, 2])]
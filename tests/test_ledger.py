@@ -0,0 +1,69 @@
+"""
+Tests for the run ledger
+"""
+
+import json
+
+import pytest
+
+import config
+from src.ledger import RunLedger
+
+
+@pytest.fixture
+def prices(monkeypatch):
+    monkeypatch.setattr(config, "LLM_MODEL_PRICES", {
+        "cheap": {"input": 1.0, "cached_input": 0.5, "output": 2.0},
+        "big": {"input": 10.0, "output": 30.0},
+    })
+
+
+def usage(input_tokens, output_tokens, cached=0):
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "input_token_details": {"cache_read": cached}}
+
+
+def test_rollup_totals(prices):
+    ledger = RunLedger()
+    with ledger.context(domain="a.example", url_id="url_001"):
+        ledger.record_scrape("https://a.example/1", "url_001", 0.5, cached=False, ok=True)
+        with ledger.context(stage="extraction"):
+            ledger.record_llm_call("cheap-2024", usage(1_000_000, 500_000, cached=400_000), 2.0)
+            ledger.record_retry("rate_limit")
+        ledger.record_llm_call("big", usage(100_000, 10_000), 3.0)
+    with ledger.context(domain="b.example", url_id="url_002"):
+        ledger.record_scrape("https://b.example/2", "url_002", 0.25, cached=True, ok=True)
+        ledger.record_llm_call("big", usage(200_000, 20_000), 1.0, stage="batch", price_factor=0.5)
+        ledger.record_llm_call("unknown-model", usage(1_000, 100), 0.5)
+
+    summary = ledger.get_summary()
+    # cheap-2024: 0.6M uncached * $1 + 0.4M cached * $0.5 + 0.5M output * $2 = $1.8
+    # big: 0.1M * $10 + 0.01M * $30 = $1.3; batch at half price: (2 + 0.6) / 2 = $1.3
+    assert summary["entries"] == 7
+    assert summary["totals"] == {
+        "llm_calls": 4, "scrapes": 2, "scrape_cache_hits": 1, "retries": 1,
+        "input_tokens": 1_301_000, "cached_input_tokens": 400_000, "output_tokens": 530_100,
+        "wall_seconds": 7.25, "cost_usd": 4.4, "unpriced_calls": 1
+    }
+    assert {stage: bucket["llm_calls"] for stage, bucket in summary["by_stage"].items()} == {
+        "scrape": 0, "extraction": 1, "analysis": 2, "batch": 1
+    }
+    assert summary["by_stage"]["extraction"]["retries"] == 1
+    assert list(summary["by_domain"]) == ["a.example", "b.example"]  # Costliest first
+    assert summary["by_domain"]["a.example"]["cost_usd"] == 3.1
+    assert summary["by_domain"]["b.example"]["stages"]["batch"]["cost_usd"] == 1.3
+    assert {model: bucket["cost_usd"] for model, bucket in summary["by_model"].items()} == {
+        "cheap-2024": 1.8, "big": 2.6, "unknown-model": 0.0
+    }
+
+
+def test_reset_and_save(prices, tmp_path):
+    ledger = RunLedger()
+    ledger.record_llm_call("cheap", usage(10, 5), 0.1)
+    ledger.save(tmp_path / "run_ledger.jsonl")
+    lines = (tmp_path / "run_ledger.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["model"] for line in lines] == ["cheap"]
+
+    ledger.reset()
+    summary = ledger.get_summary()
+    assert summary["entries"] == 0
+    assert summary["totals"]["llm_calls"] == 0
@@ -0,0 +1,36 @@
+"""
+Tests for the LLM response cache
+"""
+
+from src.llm_cache import LLMResponseCache
+
+
+def test_make_key_depends_on_every_input():
+    messages = [("system", "prompt"), ("human", "ad")]
+    key = LLMResponseCache.make_key(messages, "gpt-4", {"temperature": 0})
+    assert key == LLMResponseCache.make_key(list(messages), "gpt-4", {"temperature": 0})
+    assert key != LLMResponseCache.make_key(messages, "gpt-4o", {"temperature": 0})
+    assert key != LLMResponseCache.make_key(messages, "gpt-4", {"temperature": 0.5})
+
+
+def test_callers_cannot_change_cached_records(data_dirs):
+    cache = LLMResponseCache(max_memory_entries=4)
+    record = {"parsed_response": {"candidate_fit": {"tier": "B"}}}
+    cache.put("k", record)
+    record["parsed_response"]["candidate_fit"]["tier"] = "changed after put"
+
+    hit = cache.get("k")
+    assert hit["parsed_response"]["candidate_fit"]["tier"] == "B"
+    hit["parsed_response"]["candidate_fit"]["tier"] = "merged follow-up"
+    assert cache.get("k")["parsed_response"]["candidate_fit"]["tier"] == "B"
+    assert cache.get_stats()["memory_hits"] == 2
+
+
+def test_disk_hits_after_memory_eviction(data_dirs):
+    cache = LLMResponseCache(max_memory_entries=1)
+    cache.put("a", {"parsed_response": {"x": 1}})
+    cache.put("b", {"parsed_response": {"x": 2}})
+    assert cache.get("a") == {"parsed_response": {"x": 1}}
+    assert cache.get("missing") is None
+    stats = cache.get_stats()
+    assert (stats["disk_hits"], stats["misses"]) == (1, 1)
@@ -0,0 +1,291 @@
+"""
+Tests for the LLM client
+"""
+
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from src import llm_client as llm_client_module
+from src.llm_client import LLMClient
+
+
+PROMPT = """Analyze the ad against the profile.
+
+```json
+{"standard_extraction": {"job_title": "The exact job title"}, "candidate_fit": {"tier": "A, B, C, or F", "summary": "Why"}}
+```"""
+
+
+class NoCalls:
+    """Chat model stand-in that fails the test if a request is sent"""
+
+    def invoke(self, messages, **kwargs):
+        pytest.fail("The LLM was called for an answer that was already cached")
+
+
+class FakeChat:
+    """Chat model stand-in: each request gets the next reply, a string or a function of the messages"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def invoke(self, messages, **kwargs):
+        self.requests.append(messages)
+        assert self.replies, "More requests than expected"
+        reply = self.replies.pop(0)
+        return SimpleNamespace(content=reply(messages) if callable(reply) else reply, usage_metadata=None)
+
+
+def make_client(monkeypatch, cascade):
+    monkeypatch.setattr(config, "LLM_CASCADE_MODELS", cascade)
+    monkeypatch.setattr(config, "LLM_DELTA_ANALYSIS", False)
+    monkeypatch.setattr(config, "LLM_REASK_INVALID_FIELDS", False)
+    llm_client = LLMClient()
+    llm_client.analysis_mode = "single"
+    llm_client.client = NoCalls()
+    return llm_client
+
+
+@pytest.fixture
+def client(data_dirs, monkeypatch):
+    return make_client(monkeypatch, ["small-model", "large-model"])
+
+
+@pytest.fixture
+def single_client(data_dirs, monkeypatch):
+    return make_client(monkeypatch, [])
+
+
+def test_downgraded_analysis_reuses_pack_and_batch_answers(client):
+    content = "Senior Python Engineer at Acme, remote."
+    answer = {"standard_extraction": {"job_title": "Senior Python Engineer"}, "candidate_fit": {"tier": "B"}}
+    # Pack and batch mode cache their answers under the full cascade's key
+    full_key = client._cache_key(client._build_messages(content, PROMPT))
+    client.cache.put(full_key, {"url_id": "url_001", "model": "large-model", "parsed_response": answer})
+
+    downgraded = [client.entry_model]
+    assert client._cache_key(client._build_messages(content, PROMPT), downgraded) != full_key
+    assert client.analyze_job_ad(content, PROMPT, "url_001", models=downgraded) == answer
+
+
+def answer(title="Python Engineer", tier="B"):
+    return {"standard_extraction": {"job_title": title}, "candidate_fit": {"tier": tier, "summary": "Solid match"}}
+
+
+def test_pack_items_respects_budget_and_ad_limits(single_client, monkeypatch):
+    monkeypatch.setattr(llm_client_module, "estimate_tokens", lambda text, *args, **kwargs: len(text.split()))
+    monkeypatch.setattr(config, "LLM_PACK_TOKEN_BUDGET", 100)
+    monkeypatch.setattr(config, "LLM_PACK_MAX_ADS", 3)
+    monkeypatch.setattr(config, "LLM_PACK_MAX_AD_TOKENS", 50)
+    items = [{"url_id": f"url_{size}", "content": "word " * size} for size in (10, 60, 30, 50, 20, 40, 11)]
+
+    packs = single_client.pack_items(items)
+    assert [[item["url_id"] for item in pack] for pack in packs] == [
+        ["url_50", "url_40", "url_10"], ["url_30", "url_20", "url_11"], ["url_60"]  # 50 + 40 + 11 is over budget
+    ]
+    for pack in packs[:-1]:
+        assert sum(len(item["content"].split()) for item in pack) <= 100
+
+
+def test_parse_packed_response_shapes(single_client):
+    rows = [{"ad_id": "ad_1", "Job Title": " Dev "}, {"ad_id": "ad_2", "remote": "yes"}, {"no_id": 1}]
+    text = "Here you go:\n" + json.dumps(rows)
+    assert single_client._parse_packed_response(text, "pack") == {
+        "ad_1": {"job_title": "Dev"}, "ad_2": {"remote": True}
+    }
+
+    keyed = '```json\n{"ad_1": {"job_title": "Dev"}, "ad_2": {"job_title": "QA"}}\n```'
+    assert single_client._parse_packed_response(keyed, "pack") == {
+        "ad_1": {"job_title": "Dev"}, "ad_2": {"job_title": "QA"}
+    }
+    assert single_client._parse_packed_response('{"job_title": "Dev"}', "pack") is None
+    assert single_client._parse_packed_response("Sorry, I can't help with that.", "pack") is None
+
+
+def test_unparseable_pack_is_split_in_half(single_client, monkeypatch):
+    monkeypatch.setattr(config, "LLM_PACK_MAX_ADS", 4)
+    contents = [f"Ad {number}: Python engineer wanted for team {number}." for number in range(1, 5)]
+
+    def answer_every_ad(messages):
+        ads = re.findall(r"=== (ad_\d+) ===\n(Ad \d+)", messages[1].content)
+        return json.dumps({ad_id: answer(title) for ad_id, title in ads})
+
+    single_client.client = FakeChat("I could not do that, sorry.", answer_every_ad, answer_every_ad)
+    stats = single_client.analyze_packed(
+        [{"url_id": f"url_00{number}", "content": content} for number, content in enumerate(contents, 1)], PROMPT
+    )
+    assert {key: stats[key] for key in ("ads", "packs", "requests", "splits", "analyzed")} == {
+        "ads": 4, "packs": 1, "requests": 3, "splits": 1, "analyzed": 4
+    }
+    assert [len(re.findall("=== ad_", request[1].content)) for request in single_client.client.requests] == [4, 2, 2]
+
+    # The answers are cached under the keys of single-ad requests
+    single_client.client = NoCalls()
+    for number, content in enumerate(contents, 1):
+        assert single_client.analyze_job_ad(content, PROMPT, f"url_00{number}") == answer(f"Ad {number}")
+
+
+def use_models(llm_client, **fakes):
+    """Answer each cascade model's requests with its own FakeChat (model names with "-" become "_")"""
+    llm_client._chat_client = lambda model=None: fakes[model.replace("-", "_")]
+
+
+@pytest.mark.parametrize("entry_reply, reason", [
+    (json.dumps(answer(tier="C")), "borderline_tier"),
+    (json.dumps({"candidate_fit": {"tier": "A", "summary": "Solid match"}}), "missing_fields"),
+    ("Sorry, I can only answer questions about jobs.", "parse_failure"),
+])
+def test_cascade_escalates_doubtful_answers(client, entry_reply, reason):
+    small, large = FakeChat(entry_reply), FakeChat(json.dumps(answer(tier="B")))
+    use_models(client, small_model=small, large_model=large)
+
+    assert client.analyze_job_ad("Python engineer at Acme.", PROMPT, "url_001") == answer(tier="B")
+    assert (len(small.requests), len(large.requests)) == (1, 1)  # Unparseable answers aren't retried on the way up
+    tiers = client.get_cascade_stats()["tiers"]
+    assert tiers["small-model"]["escalated"] == {reason: 1}
+    assert tiers["large-model"]["accepted"] == 1
+    record = client.store.get_json("llm_response", "url_001")
+    assert (record["model"], record["escalations"]) == ("large-model", [{"model": "small-model", "reason": reason}])
+
+
+def test_cascade_accepts_a_confident_entry_answer_and_the_last_models_answer(client):
+    small = FakeChat(json.dumps(answer(tier="A")), json.dumps(answer(tier="C")))
+    large = FakeChat(json.dumps(answer(tier="C")))
+    use_models(client, small_model=small, large_model=large)
+
+    assert client.analyze_job_ad("Python engineer at Acme.", PROMPT, "url_001") == answer(tier="A")
+    assert client.analyze_job_ad("Go engineer at Initech.", PROMPT, "url_002") == answer(tier="C")
+    assert (len(small.requests), len(large.requests)) == (2, 1)
+    tiers = client.get_cascade_stats()["tiers"]
+    assert (tiers["small-model"]["accepted"], tiers["large-model"]["accepted"]) == (1, 1)
+
+
+PROFILE_PROMPT = """Analyze the ad for the candidate below.
+
+===
+CANDIDATE PROFILE
+===
+Senior Python developer.
+
+===
+ANALYSIS
+===
+{template}
+"""
+OLD_TEMPLATE = {"standard_extraction": {"job_title": "The exact job title"}, "candidate_fit": {"tier": "A, B, C, or F"}}
+NEW_TEMPLATE = {"standard_extraction": {"job_title": "The exact job title", "remote_work": False},
+                "candidate_fit": {"tier": "A, B, C, or F"}}
+
+
+def test_delta_analysis_requests_only_the_new_fields(single_client, monkeypatch):
+    content = "Python engineer at Acme, fully remote."
+    old_prompt = PROFILE_PROMPT.format(template=json.dumps(OLD_TEMPLATE))
+    new_prompt = PROFILE_PROMPT.format(template=json.dumps(NEW_TEMPLATE))
+    first = {"standard_extraction": {"job_title": "Python Engineer"}, "candidate_fit": {"tier": "B"}}
+    single_client.client = FakeChat(json.dumps(first))
+    assert single_client.analyze_job_ad(content, old_prompt, "url_001") == first
+
+    monkeypatch.setattr(config, "LLM_DELTA_ANALYSIS", True)
+    single_client.client = FakeChat('{"standard_extraction": {"remote_work": true}, "candidate_fit": {"tier": "F"}}')
+    merged = {"standard_extraction": {"job_title": "Python Engineer", "remote_work": True}, "candidate_fit": {"tier": "B"}}
+    assert single_client.analyze_job_ad(content, new_prompt, "url_001") == merged
+
+    request = single_client.client.requests[0][1].content
+    fields = request.split("Fields to return:\n", 1)[1].split("\n\nPrevious answer:", 1)[0]
+    assert json.loads(fields) == {"standard_extraction": {"remote_work": False}}
+    assert content in request
+    assert single_client.get_delta_stats() == {
+        "requests": 1, "analyzed": 1, "failed": 0, "fields_requested": 1, "fields_filled": 1
+    }
+
+    # The merged answer is cached under the new prompt's key
+    single_client.client = NoCalls()
+    assert single_client.analyze_job_ad(content, new_prompt, "url_001") == merged
+
+
+def test_delta_analysis_needs_the_same_ad_text_and_profile(single_client):
+    content = "Python engineer at Acme, fully remote."
+    old_prompt = PROFILE_PROMPT.format(template=json.dumps(OLD_TEMPLATE))
+    new_prompt = PROFILE_PROMPT.format(template=json.dumps(NEW_TEMPLATE))
+    single_client.client = FakeChat(json.dumps({"standard_extraction": {"job_title": "Dev"}, "candidate_fit": {"tier": "B"}}))
+    single_client.analyze_job_ad(content, old_prompt, "url_001")
+    previous = single_client.store.get_json("llm_response", "url_001")
+
+    assert single_client._delta_fields(content, new_prompt, previous) == [("standard_extraction", "remote_work")]
+    assert single_client._delta_fields(content + " Apply now!", new_prompt, previous) == []
+    assert single_client._delta_fields(content, new_prompt.replace("Senior Python", "Junior Go"), previous) == []
+    assert single_client._delta_fields(content, old_prompt, previous) == []
+    assert single_client._delta_fields(content, 'Return {"other": {"x": 1}}', previous) == []
+
+
+class SlowFirstChat:
+    """Chat model stand-in whose first request takes `slow` seconds; later ones answer at once"""
+
+    def __init__(self, slow):
+        self.slow = slow
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(self.slow)
+        return SimpleNamespace(content=f"answer {call}", usage_metadata=None)
+
+
+@pytest.fixture
+def hedging_client(single_client, monkeypatch):
+    monkeypatch.setattr(config, "LLM_HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(config, "LLM_HEDGE_PERCENTILE", 95)
+    monkeypatch.setattr(config, "LLM_HEDGE_MAX_FRACTION", 1.0)
+    single_client.hedging = True
+    return single_client
+
+
+def test_hedged_call_fires_after_the_latency_percentile(hedging_client):
+    for _ in range(5):
+        hedging_client._record_call(None, 0.05)
+    hedging_client.client = SlowFirstChat(slow=1.0)
+
+    start = time.perf_counter()
+    response, latency = hedging_client._invoke(hedging_client._build_messages("ad", PROMPT))
+    assert response.content == "answer 2"  # The duplicate's answer; the slow one is discarded
+    assert 0.05 <= latency < 0.5 and time.perf_counter() - start < 0.5
+    assert {key: value for key, value in hedging_client.get_hedge_stats().items() if key != "enabled"} == {
+        "calls": 1, "fired": 1, "won": 1, "capped": 0, "fire_rate": 1.0, "win_rate": 1.0
+    }
+
+    hedging_client._hedge_pool.shutdown(wait=True)  # The loser still finishes and is booked
+    assert hedging_client.get_usage_stats()["calls"] == 5 + 2
+
+
+def test_no_hedging_without_enough_latencies_or_for_fast_calls(hedging_client):
+    hedging_client.client = SlowFirstChat(slow=0.2)
+    response, _ = hedging_client._invoke(hedging_client._build_messages("ad", PROMPT))
+    assert response.content == "answer 1"  # Too few latencies known to hedge
+
+    for _ in range(5):
+        hedging_client._record_call(None, 1.0)
+    response, _ = hedging_client._invoke(hedging_client._build_messages("ad", PROMPT))
+    assert response.content == "answer 2"  # Finished well within the percentile
+    stats = hedging_client.get_hedge_stats()
+    assert (stats["calls"], stats["fired"]) == (2, 0)
+
+
+def test_hedging_is_capped_at_the_allowed_fraction(hedging_client, monkeypatch):
+    monkeypatch.setattr(config, "LLM_HEDGE_MAX_FRACTION", 0.5)
+    for _ in range(5):
+        hedging_client._record_call(None, 0.01)
+    hedging_client.client = SlowFirstChat(slow=0.2)
+    response, _ = hedging_client._invoke(hedging_client._build_messages("ad", PROMPT))
+    assert response.content == "answer 1"  # One duplicate per call would exceed half of all calls
+    assert hedging_client.get_hedge_stats()["capped"] == 1
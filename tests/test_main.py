@@ -0,0 +1,87 @@
+"""
+Tests for the pipeline's per-URL processing
+"""
+
+import pytest
+
+import main
+from src.relevance import RelevanceDecision
+
+CLEANED = "Nurse wanted for night shifts.\nHome | Jobs | Sign in"
+TRIMMED = "Nurse wanted for night shifts."
+
+
+class StubScraper:
+    def scrape_url(self, url, url_id, force=False):
+        return CLEANED
+
+
+class StubTrimmer:
+    def trim(self, content, url, url_id):
+        return TRIMMED
+
+
+class StubLLM:
+    """Signatures name the models; every analysis is counted"""
+
+    entry_model = "small-model"
+
+    def __init__(self):
+        self.analyses = []
+
+    def analysis_signature(self, master_prompt, models=None):
+        return f"{master_prompt}|{models or 'cascade'}"
+
+    def analyze_job_ad(self, content, master_prompt, key, force=False, models=None):
+        self.analyses.append((content, models))
+        return {"candidate_fit": {"tier": "C"}}
+
+
+class LowRelevance:
+    """Relevance filter stand-in that downgrades every ad and remembers what it scored"""
+
+    def __init__(self):
+        self.scored = []
+
+    def decide(self, text, record=True):
+        self.scored.append(text)
+        return RelevanceDecision(0.1, 0.5, "downgrade")
+
+
+@pytest.fixture
+def run(data_dirs):
+    llm, relevance = StubLLM(), LowRelevance()
+
+    def process():
+        return main.process_url_profiles("https://jobs.example/1", "url_001", StubScraper(), llm, {None: "prompt"},
+                                         trimmer=StubTrimmer(), relevance={None: relevance})[None]
+    return process, llm, relevance
+
+
+def test_relevance_scores_the_untrimmed_text_it_was_trained_on(run):
+    process, llm, relevance = run
+    process()
+    assert relevance.scored == [CLEANED]
+    assert llm.analyses == [(TRIMMED, ["small-model"])]
+
+
+def test_downgraded_results_are_fresh_on_the_next_run(run):
+    process, llm, relevance = run
+    first = process()
+    assert first["analysis_signature"] == "prompt|['small-model']"
+    assert first["downgraded_from"] == "prompt|cascade"
+
+    assert process()["data"] == first["data"]
+    assert len(llm.analyses) == 1
+    assert main.has_fresh_results("url_001", {None: "prompt|cascade"})
+    assert not main.has_fresh_results("url_001", {None: "edited prompt|cascade"})
+
+
+def test_is_fresh_result():
+    result = {"data": {"x": 1}, "analysis_signature": "a"}
+    assert main.is_fresh_result(result, "a")
+    assert main.is_fresh_result(result, None)
+    assert not main.is_fresh_result(result, "b")
+    assert main.is_fresh_result(dict(result, downgraded_from="b"), "b")
+    assert not main.is_fresh_result({"data": None, "analysis_signature": "a"}, "a")
+    assert not main.is_fresh_result(None, "a")
@@ -0,0 +1,34 @@
+"""
+Tests for the final table outputs
+"""
+
+import config
+from src.processor import DataProcessor
+
+
+def result(url_id, strengths, gaps, salary_min=None):
+    return {
+        "url_id": url_id,
+        "url": f"https://jobs.example/{url_id}",
+        "data": {
+            "standard_extraction": {"job_title": "Data Engineer", "salary_min": salary_min, "remote_work": True},
+            "candidate_fit": {"tier": "B", "summary": "Solid", "strengths": strengths, "gaps": gaps},
+        },
+    }
+
+
+def test_parquet_keeps_list_items_that_contain_commas(data_dirs, monkeypatch):
+    monkeypatch.setattr(config, "OUTPUT_FORMATS", ["csv", "parquet"])
+    processor = DataProcessor()
+    processor.create_final_table([
+        result("a", ["Python, SQL and Spark", "Mentoring"], ["Kubernetes"], salary_min=90000),
+        result("b", [], ["Go, Rust"]),
+    ])
+
+    df = processor.load_final_table()
+    assert list(df["fit_strengths"][0]) == ["Python, SQL and Spark", "Mentoring"]
+    assert list(df["fit_strengths"][1]) == []
+    assert list(df["fit_gaps"][1]) == ["Go, Rust"]
+    assert df["salary_min"][0] == 90000.0
+    assert bool(df["remote_work"][1]) is True
+    assert (data_dirs / "output" / "job_ads_analysis_latest.csv").exists()
@@ -0,0 +1,85 @@
+"""
+Tests for the master prompt helpers
+"""
+
+import json
+
+import pytest
+
+import config
+from src.prompts import build_phase_prompts, build_response_format, build_response_schema, extract_json_template
+
+MASTER_PROMPT = (config.BASE_DIR / "data" / "input" / "master_prompt.txt").read_text(encoding="utf-8")
+
+
+def assert_schema_matches(schema, example, path="template"):
+    """Every object in the schema has exactly the template's keys, all required and nothing else allowed"""
+    if isinstance(example, dict):
+        assert schema["type"] == "object", path
+        assert list(schema["properties"]) == list(example), path
+        assert schema["required"] == list(example), path
+        assert schema["additionalProperties"] is False, path
+        for key, value in example.items():
+            assert_schema_matches(schema["properties"][key], value, f"{path}.{key}")
+    elif isinstance(example, list):
+        assert schema == {"type": "array", "items": {"type": "string"}}, path
+    else:
+        assert "null" in schema["type"], path
+
+
+def test_response_schema_matches_the_template():
+    template = extract_json_template(MASTER_PROMPT)
+    schema = build_response_schema(MASTER_PROMPT)
+    assert_schema_matches(schema, template)
+
+    extraction = schema["properties"]["standard_extraction"]["properties"]
+    assert extraction["salary_min"]["type"] == ["number", "null"]  # From EXPECTED_DATA_TYPES, the example is null
+    assert extraction["remote_work"]["type"] == ["boolean", "null"]
+    assert extraction["job_title"]["type"] == ["string", "null"]
+    assert schema["properties"]["is_overqualified"]["properties"]["value"]["type"] == ["boolean", "null"]
+
+
+def test_response_format_wraps_the_schema():
+    response_format = build_response_format(MASTER_PROMPT)
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["strict"] is True
+    assert response_format["json_schema"]["schema"] == build_response_schema(MASTER_PROMPT)
+    assert build_response_format("No template here.") is None
+
+
+@pytest.mark.parametrize("example, expected", [
+    ("text", ["string", "null"]),
+    (3, ["number", "null"]),
+    (True, ["boolean", "null"]),
+])
+def test_leaf_types_follow_the_example_outside_expected_types(example, expected):
+    prompt = "Return " + json.dumps({"extra": {"note": example}})
+    assert build_response_schema(prompt)["properties"]["extra"]["properties"]["note"]["type"] == expected
+
+
+def test_phase_split_of_the_master_prompt():
+    phases = build_phase_prompts(MASTER_PROMPT)
+    assert phases["extraction_sections"] == ["standard_extraction", "payment_analysis"]
+    assert phases["scoring_sections"] == ["candidate_fit", "is_overqualified", "growth_potential"]
+    assert phases["sections"] == list(extract_json_template(MASTER_PROMPT))
+
+    # Extraction leaves out the profile, so editing it doesn't invalidate cached extractions
+    assert "CANDIDATE PROFILE" not in phases["extraction"]
+    assert list(extract_json_template(phases["extraction"])) == phases["extraction_sections"]
+    assert "Use `null` for any information" in phases["extraction"]
+    assert "CANDIDATE PROFILE" in phases["scoring"]
+    assert list(extract_json_template(phases["scoring"])) == phases["scoring_sections"]
+
+
+def test_profile_edits_only_change_the_scoring_prompt():
+    edited = MASTER_PROMPT.replace("Expert in Go and Python", "Expert in Rust")
+    original, changed = build_phase_prompts(MASTER_PROMPT), build_phase_prompts(edited)
+    assert changed["extraction"] == original["extraction"]
+    assert changed["scoring"] != original["scoring"]
+    assert changed["profile_hash"] != original["profile_hash"]
+
+
+def test_templates_without_both_kinds_of_sections_are_not_split():
+    assert build_phase_prompts('Return {"standard_extraction": {"job_title": "x"}}') is None
+    assert build_phase_prompts('Return {"candidate_fit": {"tier": "A"}}') is None
+    assert build_phase_prompts("No template here.") is None
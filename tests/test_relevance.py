@@ -0,0 +1,68 @@
+"""
+Tests for the relevance pre-filter and its calibration
+"""
+
+import random
+
+import config
+from src.relevance import RelevanceFilter, fit_tier, tokenize
+
+PROFILE = "Data engineer with Python, SQL, Spark and Airflow; builds pipelines and warehouses."
+
+RELEVANT_WORDS = "python sql spark airflow pipelines warehouse etl kafka dbt analytics engineer data".split()
+IRRELEVANT_WORDS = "nurse patient ward shifts clinic care hospital medication rota bedside".split()
+COMMON_WORDS = "team role company benefits office apply experience hybrid growth".split()
+
+
+def ads(words, count, seed):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(words, k=12) + rng.choices(COMMON_WORDS, k=8)) for _ in range(count)]
+
+
+def test_tokenize_keeps_tech_terms_and_drops_stopwords():
+    assert tokenize("The C++ and Node.js role, with C# in it") == ["c++", "node.js", "role", "c#"]
+
+
+def test_fit_tier_reads_the_first_letter():
+    assert fit_tier({"candidate_fit": {"tier": "a (Perfect fit)"}}) == "A"
+    assert fit_tier({"candidate_fit": {"tier": " "}}) is None
+    assert fit_tier(None) is None
+
+
+def test_no_threshold_without_enough_labels():
+    count = config.RELEVANCE_MIN_LABELS // 2 - 1
+    documents = ads(RELEVANT_WORDS, count, 1) + ads(IRRELEVANT_WORDS, count, 2)
+    relevance = RelevanceFilter(PROFILE, documents, ["B"] * count + ["F"] * count, mode="skip")
+    assert relevance.threshold is None
+    assert relevance.decide(ads(IRRELEVANT_WORDS, 1, 3)[0]).action == "analyze"
+
+
+def test_no_threshold_without_any_tier_f_ads():
+    documents = ads(RELEVANT_WORDS, config.RELEVANCE_MIN_LABELS, 1)
+    assert RelevanceFilter(PROFILE, documents, ["A"] * len(documents)).threshold is None
+
+
+def test_calibrated_threshold_meets_the_target_recall():
+    documents = ads(RELEVANT_WORDS, 40, 1) + ads(IRRELEVANT_WORDS, 40, 2)
+    tiers = [random.Random(index).choice("ABC") for index in range(40)] + ["F"] * 40
+    relevance = RelevanceFilter(PROFILE, documents, tiers, mode="skip")
+
+    assert relevance.threshold is not None
+    assert relevance.estimated_recall >= config.RELEVANCE_TARGET_RECALL
+    assert 0.4 <= relevance.historical_skip_rate <= 0.6
+
+    fresh_relevant, fresh_irrelevant = ads(RELEVANT_WORDS, 50, 3), ads(IRRELEVANT_WORDS, 50, 4)
+    kept = sum(relevance.decide(text).action == "analyze" for text in fresh_relevant)
+    skipped = sum(relevance.decide(text).action == "skip" for text in fresh_irrelevant)
+    assert kept / 50 >= config.RELEVANCE_TARGET_RECALL
+    assert skipped == 50
+    assert relevance.get_stats()["skipped"] == 50
+
+
+def test_report_mode_never_skips():
+    documents = ads(RELEVANT_WORDS, 20, 1) + ads(IRRELEVANT_WORDS, 20, 2)
+    relevance = RelevanceFilter(PROFILE, documents, ["A"] * 20 + ["F"] * 20, mode="report")
+    decision = relevance.decide(ads(IRRELEVANT_WORDS, 1, 5)[0])
+    assert decision.score < decision.threshold
+    assert decision.action == "analyze"
+    assert relevance.get_stats()["below_threshold"] == 1
@@ -0,0 +1,63 @@
+"""
+Tests for LLM response parsing and the JSON salvage scanner
+"""
+
+import pytest
+
+from src.response_parser import _scan_object, parse_json_response, salvage_json_object
+
+
+def test_bare_object_parses_directly():
+    assert parse_json_response('{"job_title": "Data Engineer"}') == ({"job_title": "Data Engineer"}, "json")
+
+
+def test_fenced_json_is_extracted_without_repairs():
+    text = 'Here is the analysis:\n```json\n{"job_title": "Data Engineer", "skills": ["SQL", "Python"]}\n```\nThanks!'
+    assert salvage_json_object(text) == ({"job_title": "Data Engineer", "skills": ["SQL", "Python"]}, False)
+    assert parse_json_response(text)[1] == "extracted"
+
+
+def test_trailing_commas_are_dropped():
+    text = '{"skills": ["SQL", "Python",], "remote": true,}'
+    assert salvage_json_object(text) == ({"skills": ["SQL", "Python"], "remote": True}, True)
+
+
+def test_single_quoted_strings_keep_apostrophes():
+    text = "{'summary': 'Meets the team's bar, mostly', 'title': 'Engineer'}"
+    assert salvage_json_object(text) == ({"summary": "Meets the team's bar, mostly", "title": "Engineer"}, True)
+
+
+def test_unquoted_keys_and_python_literals_are_repaired():
+    text = '{job_title: "Data Engineer", remote_work: True, salary_min: None, level-2: 3}'
+    parsed, repaired = salvage_json_object(text)
+    assert parsed == {"job_title": "Data Engineer", "remote_work": True, "salary_min": None, "level-2": 3}
+    assert repaired
+    assert parse_json_response(text) == (
+        {"job_title": "Data Engineer", "remote_work": True, "salary_min": None, "level_2": 3}, "repaired"
+    )
+
+
+def test_braces_and_quotes_inside_strings_do_not_count():
+    text = 'Result: {"note": "use {braces}, \\"quotes\\" and ] freely", "n": 1,} done'
+    assert salvage_json_object(text) == ({"note": 'use {braces}, "quotes" and ] freely', "n": 1}, True)
+
+
+@pytest.mark.parametrize("text", [
+    '{"job_title": "Data Engineer", "skills": ["SQL", "Pyt',
+    '```json\n{"job_title": "Data Engineer", "candidate_fit": {"tier": "B"',
+    'no JSON at all',
+])
+def test_truncated_or_missing_object_gives_nothing(text):
+    assert salvage_json_object(text) == (None, False)
+    assert parse_json_response(text) == (None, None)
+
+
+def test_placeholder_in_prose_before_the_real_object_is_skipped():
+    text = 'Fill in the {placeholder} fields as asked.\n{"job_title": "Data Engineer", "tier": "A",}'
+    assert salvage_json_object(text) == ({"job_title": "Data Engineer", "tier": "A"}, True)
+
+
+def test_scan_object_reports_where_the_object_ends():
+    text = 'x {a: 1} y'
+    assert _scan_object(text, 2) == ('{"a": 1}', 8, True)
+    assert _scan_object('{"a": [1}', 0)[0] is None  # Mismatched bracket
@@ -0,0 +1,119 @@
+"""
+Tests for the LLM retry policy
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.retry_policy import ResponseParseError, RetryPolicy, classify_error, retry_after_seconds
+
+
+class StatusError(Exception):
+    """Stands in for an API error: a status code and optionally response headers"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ResponseParseError("no JSON"), "parse"),
+    (TimeoutError(), "timeout"),
+    (ConnectionError(), "connection"),
+    (StatusError(429), "rate_limit"),
+    (StatusError(401), "auth"),
+    (StatusError(503), "server"),
+    (StatusError(400), "bad_request"),
+    (ValueError(), "other"),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(StatusError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(StatusError(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(StatusError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(StatusError(429)) is None
+
+
+def policy(budget=10, wait_budget=60):
+    return RetryPolicy(budget=budget, max_attempts={"rate_limit": 3, "parse": 2}, base_delay=0, max_delay=0,
+                       wait_budget=wait_budget)
+
+
+def failing(errors, result="ok"):
+    """A call that raises the given errors in turn, then returns result"""
+    errors = list(errors)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+    return call, calls
+
+
+def test_retryable_errors_recover():
+    retry = policy()
+    call, calls = failing([StatusError(429), StatusError(429)])
+    assert retry.call(call, "ad") == "ok"
+    assert len(calls) == 3
+    stats = retry.get_stats()
+    assert (stats["retries"], stats["recovered"], stats["retried"], stats["failed"]) == (2, 1, {"rate_limit": 2}, {})
+
+
+def test_each_error_class_has_its_own_attempt_limit():
+    call, calls = failing([ResponseParseError("a"), ResponseParseError("b"), ResponseParseError("c")])
+    with pytest.raises(ResponseParseError):
+        policy().call(call, "ad")
+    assert len(calls) == 2
+
+
+def test_client_errors_and_no_retry_classes_fail_at_once():
+    retry = policy()
+    call, calls = failing([StatusError(401)])
+    with pytest.raises(StatusError):
+        retry.call(call, "ad")
+    call, calls_parse = failing([ResponseParseError("a")])
+    with pytest.raises(ResponseParseError):
+        retry.call(call, "ad", no_retry=("parse",))
+    assert (len(calls), len(calls_parse)) == (1, 1)
+    assert retry.get_stats()["gave_up"] == 2
+
+
+def test_budget_is_shared_across_calls():
+    retry = policy(budget=1)
+    assert retry.call(failing([StatusError(429)])[0], "first") == "ok"
+    call, calls = failing([StatusError(429)])
+    with pytest.raises(StatusError):
+        retry.call(call, "second")
+    assert len(calls) == 1
+    assert retry.get_stats()["budget_exhausted"] == 1
+
+
+def test_retried_and_failed_errors_are_counted_apart():
+    retry = policy()
+    with pytest.raises(ResponseParseError):
+        retry.call(failing([ResponseParseError("a"), ResponseParseError("b")])[0], "ad")
+    stats = retry.get_stats()
+    assert (stats["retried"], stats["failed"], stats["gave_up"]) == ({"parse": 1}, {"parse": 1}, 1)
+
+
+def test_retry_after_is_honored_beyond_the_backoff_cap():
+    retry = policy()
+    assert retry.call(failing([StatusError(429, {"retry-after-ms": "50"})])[0], "ad") == "ok"
+    assert retry.get_stats()["waited"] == 0.05
+
+
+def test_retry_after_longer_than_the_wait_budget_gives_up():
+    retry = policy(wait_budget=1)
+    call, calls = failing([StatusError(429, {"retry-after": "5"})])
+    with pytest.raises(StatusError):
+        retry.call(call, "ad")
+    stats = retry.get_stats()
+    assert len(calls) == 1
+    assert (stats["budget_exhausted"], stats["waited"], stats["failed"]) == (1, 0, {"rate_limit": 1})
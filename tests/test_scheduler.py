@@ -0,0 +1,63 @@
+"""
+Tests for host-aware scheduling
+"""
+
+import threading
+import time
+
+from src.scheduler import HostScheduler
+
+DELAY = 0.15
+
+
+def drain(scheduler, workers=3):
+    """Hand out every item from several threads; returns (item, time handed out) in order"""
+    handed_out, lock = [], threading.Lock()
+
+    def worker():
+        while True:
+            item = scheduler.next()
+            if item is None:
+                return
+            with lock:
+                handed_out.append((item, time.monotonic()))
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return handed_out
+
+
+def test_hosts_keep_their_spacing_while_interleaving():
+    scheduler = HostScheduler(default_delay=DELAY, host_delays={"slow.example": 2 * DELAY})
+    for item, host in [("a1", "a.example"), ("a2", "a.example"), ("a3", "a.example"),
+                       ("s1", "jobs.slow.example"), ("s2", "jobs.slow.example"),
+                       ("b1", "b.example"), ("cached", None), ("b2", "b.example")]:
+        scheduler.add(item, host)
+
+    start = time.monotonic()
+    handed_out = drain(scheduler)
+    order = [item for item, _ in handed_out]
+
+    # Everything ready goes out at once in input order; repeat visits wait for their host
+    assert order[:4] == ["a1", "s1", "b1", "cached"]
+    assert sorted(order) == sorted(["a1", "a2", "a3", "s1", "s2", "b1", "b2", "cached"])
+    assert order.index("b2") < order.index("a3")
+
+    times = dict(handed_out)
+    for first, second, spacing in [("a1", "a2", DELAY), ("a2", "a3", DELAY), ("b1", "b2", DELAY),
+                                   ("s1", "s2", 2 * DELAY)]:
+        assert times[second] - times[first] >= spacing - 0.01
+    # Hosts cool down in parallel: the run takes as long as the busiest host, not the sum
+    assert time.monotonic() - start < 4 * DELAY
+    assert len(scheduler) == 0
+    assert scheduler.next() is None
+
+
+def test_delay_for_matches_host_suffixes():
+    scheduler = HostScheduler(default_delay=1.0, host_delays={"linkedin.com": 5.0})
+    assert scheduler.delay_for("linkedin.com") == 5.0
+    assert scheduler.delay_for("www.linkedin.com") == 5.0
+    assert scheduler.delay_for("notlinkedin.com") == 1.0
@@ -0,0 +1,42 @@
+"""
+Tests for the web scraper's content extraction
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_llm_server import synthetic_job_page
+from src.scraper import WebScraper
+
+
+def long_page(i: int) -> str:
+    """A synthetic job page with a long description, so concurrent conversions overlap"""
+    description = "<p>Line <b>bold</b> <i>italic</i></p>" * 400
+    return synthetic_job_page(f"job-{i:04d}").replace(
+        "</body>", f'<div class="job-description">{description}</div></body>'
+    )
+
+
+def test_concurrent_extraction_matches_serial():
+    scraper = WebScraper()
+    pages = [long_page(i) for i in range(16)]
+    serial = [scraper._extract_content(page, f"https://jobs.example.com/{i}") for i, page in enumerate(pages)]
+
+    assert all(serial)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for _ in range(5):
+            concurrent = list(pool.map(
+                lambda item: scraper._extract_content(item[1], f"https://jobs.example.com/{item[0]}"), enumerate(pages)
+            ))
+            assert concurrent == serial
+    scraper.close()
+
+
+def test_each_thread_gets_its_own_session():
+    scraper = WebScraper()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        sessions = list(pool.map(lambda _: scraper.session, range(30)))
+    assert scraper.session is scraper.session
+    assert len({id(session) for session in sessions}) <= 3
+    assert len(scraper._sessions) == len({id(session) for session in sessions}) + 1
+    scraper.close()
+    assert scraper._sessions == []
@@ -0,0 +1,50 @@
+"""
+Tests for content trimming
+"""
+
+import config
+from src.trimmer import ContentTrimmer
+
+NAV = "Home\nJobs\nCompanies\nSign in"
+
+
+def page(number):
+    return f"{NAV}\n\nAd number {number} for a backend developer.\n\nTeam {number} uses Python and Postgres."
+
+
+def trim_site(trimmer, numbers):
+    return {number: trimmer.trim(page(number), f"https://jobs.example/ad/{number}", f"url_{number:03d}")
+            for number in numbers}
+
+
+def test_trimmed_text_does_not_depend_on_pages_seen_earlier_in_the_run(data_dirs):
+    trimmer = ContentTrimmer(token_budget=10_000)
+    first = trim_site(trimmer, [1])[1]
+    trim_site(trimmer, range(2, 12))
+    assert trim_site(trimmer, [1])[1] == first
+
+    reverse = ContentTrimmer(token_budget=10_000)
+    assert trim_site(reverse, reversed(range(1, 12))) == trim_site(trimmer, range(1, 12))
+
+
+def test_save_merges_the_run_into_the_index_with_one_write_per_site(data_dirs, monkeypatch):
+    trimmer = ContentTrimmer(token_budget=10_000)
+    writes = []
+    put_json = trimmer.store.put_json
+    monkeypatch.setattr(trimmer.store, "put_json", lambda kind, key, data: (writes.append(key), put_json(kind, key, data)))
+
+    trim_site(trimmer, range(1, 12))
+    assert writes == []
+    assert trimmer.save() == 11
+    assert writes == ["jobs.example"]
+    assert trimmer.save() == 0
+
+    next_run = ContentTrimmer(token_budget=10_000)
+    trimmed = trim_site(next_run, [1, 12])
+    assert trimmed[1] == "Ad number 1 for a backend developer.\n\nTeam 1 uses Python and Postgres."
+    assert NAV not in trimmed[12]
+    assert next_run.save() == 1
+    index = next_run.store.get_json("boilerplate", "jobs.example")
+    assert len(index["documents"]) == 12
+    assert max(index["line_counts"].values()) == 12
+    assert config.TRIM_BOILERPLATE_MIN_DOCS < 12
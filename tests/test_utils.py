@@ -0,0 +1,32 @@
+"""
+Tests for the shared helpers
+"""
+
+import sys
+import types
+
+from src import utils
+
+
+def offline_tiktoken():
+    """A tiktoken stand-in whose encodings can't be downloaded, as when running offline"""
+    def get_encoding(name):
+        raise ConnectionError(f"cannot download {name}")
+
+    def encoding_for_model(model):
+        if model.startswith("gpt-"):
+            return get_encoding("cl100k_base")
+        raise KeyError(model)
+
+    return types.SimpleNamespace(get_encoding=get_encoding, encoding_for_model=encoding_for_model)
+
+
+def test_unknown_model_offline_falls_back_to_characters(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tiktoken", offline_tiktoken())
+    utils._get_tokenizer.cache_clear()
+    try:
+        assert utils._get_tokenizer("llama3") is None
+        assert utils.estimate_tokens("hello world", "llama3") == len("hello world") // 4
+        assert utils.estimate_tokens("hello world", "gpt-4") == len("hello world") // 4
+    finally:
+        utils._get_tokenizer.cache_clear()
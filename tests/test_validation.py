@@ -0,0 +1,60 @@
+"""
+Tests for response validation
+"""
+
+from src.response_parser import parse_json_response
+from src.validation import ResponseValidator, get_path, leaf_paths, set_path
+
+
+TEMPLATE = {
+    "standard_extraction": {
+        "job_title": "The exact job title",
+        "salary_min": None,
+        "remote_work": False,
+        "required_skills": ["skill1", "skill2"],
+    },
+    "candidate_fit": {"tier": "A, B, C, or F", "strengths": ["strength"]},
+    "is_overqualified": {"value": False, "reasoning": "Explain briefly"},
+}
+
+
+def answer(**overrides):
+    data = {
+        "standard_extraction": {
+            "job_title": "Engineer", "salary_min": 50000, "remote_work": True, "required_skills": ["python"]
+        },
+        "candidate_fit": {"tier": "B", "strengths": ["python"]},
+        "is_overqualified": {"value": False, "reasoning": "Matches the level"},
+    }
+    for dotted, value in overrides.items():
+        set_path(data, tuple(dotted.split("__")), value)
+    return data
+
+
+def problems(data):
+    return {(issue.field, issue.problem) for issue in ResponseValidator(TEMPLATE, required_fields=[]).validate(data)}
+
+
+def test_valid_answer_has_no_issues():
+    assert problems(answer()) == set()
+
+
+def test_wrong_types_and_missing_fields_are_reported():
+    data = answer(standard_extraction__salary_min=True, candidate_fit__strengths="python")
+    del data["candidate_fit"]["tier"]
+    assert problems(data) == {("salary_min", "wrong_type"), ("fit_strengths", "wrong_type"), ("fit_tier", "missing")}
+
+
+def test_booleanized_yes_no_strings_are_accepted():
+    # The parser's cleaning turns a well-formed "no" into False; that isn't the model's mistake
+    data, _ = parse_json_response('{"is_overqualified": {"value": false, "reasoning": "no"}}')
+    assert data["is_overqualified"]["reasoning"] is False
+    assert problems(answer(is_overqualified__reasoning=data["is_overqualified"]["reasoning"])) == set()
+
+
+def test_path_helpers():
+    data = {}
+    set_path(data, ("a", "b"), 1)
+    assert get_path(data, ("a", "b")) == (True, 1)
+    assert get_path(data, ("a", "c")) == (False, None)
+    assert leaf_paths(TEMPLATE)[0] == ("standard_extraction", "job_title")